@@ -0,0 +1,211 @@
+"""
+Benchmarks of runner.py's post-processing on synthetic runs.
+
+Every stage runs against the synthetic output of a run of each size (see
+synthetic.py): its time is the best of --repeat runs, and its peak Python
+heap comes from one more run under tracemalloc (--no-memory skips it). The
+results go to reports/bench.json. A size's first run (or --update-baseline)
+also stores them in session/bench_baseline.json, like the perf baseline;
+later runs fail when a stage got slower or hungrier than the baseline by more
+than --budget percent.
+
+    python benchmarks/bench_postprocess.py --sizes 100,10000
+"""
+import contextlib
+import io
+import json
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import click
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(BENCH_DIR))
+
+from cli import paths  # noqa: E402
+from cli.reporting import inject_videos_into_pytest_html, make_pie_chart  # noqa: E402
+from cli.results import NodeidIndex, collect_videos_map, failed_nodeids_from_junit, parse_junit  # noqa: E402
+from cli.summaries import _fmt_bytes  # noqa: E402
+from synthetic import make_run  # noqa: E402
+
+BASELINE = paths.SESSION_DIR / "bench_baseline.json"
+RESULTS = paths.REPORTS / "bench.json"
+# absolute slack on top of the relative budget, so tiny stages don't fail on noise
+TIME_SLACK = 0.025
+MEMORY_SLACK = 256 * 1024
+
+
+@contextlib.contextmanager
+def _rooted(root: Path):
+    """Point the runner's output directories at a synthetic run."""
+    names = ("ROOT", "REPORTS", "LOGS", "SESSION_DIR", "STORE")
+    saved = {name: getattr(paths, name) for name in names}
+    paths.ROOT, paths.REPORTS, paths.LOGS = root, root / "reports", root / "logs"
+    paths.SESSION_DIR, paths.STORE = root / "session", root / "artifacts"
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(paths, name, value)
+
+
+def _stages(run: dict):
+    """(name, setup, fn) per stage; setup's return value is passed to fn and is not measured."""
+    root = run["root"]
+    cache = root / "session" / "nodeid_index.json"
+    pristine = run["html"].with_name("report.pristine.html")
+    shutil.copyfile(run["html"], pristine)
+    state = {}
+
+    def cold_index():
+        cache.unlink(missing_ok=True)
+
+    def index(_):
+        state["index"] = NodeidIndex(root=root, cache_file=cache).refresh()
+
+    def parse(_):
+        state["stats"] = parse_junit(run["junit"])
+
+    def failed(_):
+        state["failed"] = failed_nodeids_from_junit(run["junit"], state["index"])
+
+    def videos(_):
+        state["videos"] = collect_videos_map(run["manifest"])
+
+    def fresh_report():
+        shutil.copyfile(pristine, run["html"])
+
+    def inject(_):
+        inject_videos_into_pytest_html(run["html"], state["videos"], state["failed"])
+
+    def chart(_):
+        make_pie_chart(state["stats"], root / "reports" / "chart.png", title="bench")
+
+    return [
+        ("nodeid_index", cold_index, index),
+        ("parse_junit", None, parse),
+        ("failed_nodeids_from_junit", None, failed),
+        ("collect_videos_map", None, videos),
+        ("inject_videos_into_pytest_html", fresh_report, inject),
+        ("make_pie_chart", None, chart),
+    ]
+
+
+def _measure(setup, fn, repeat: int, memory: bool = True):
+    best = None
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        started = time.perf_counter()
+        fn(arg)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    if not memory:
+        return best, None
+    arg = setup() if setup else None
+    tracemalloc.start()
+    try:
+        fn(arg)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def bench_size(n: int, repeat: int, workdir: Path, memory: bool = True):
+    root = workdir / f"run_{n}"
+    started = time.perf_counter()
+    run = make_run(root, n)
+    generated = time.perf_counter() - started
+    html_bytes = run["html"].stat().st_size
+    print(f"{n} tests ({run['failed']} failed): synthetic run written in {generated:.1f}s, "
+          f"report {_fmt_bytes(html_bytes)}")
+    results = {}
+    with _rooted(root):
+        for name, setup, fn in _stages(run):
+            # the stages print progress meant for a real run
+            with contextlib.redirect_stdout(io.StringIO()):
+                seconds, peak = _measure(setup, fn, repeat, memory)
+            results[name] = {"seconds": round(seconds, 5), "peak_bytes": peak}
+            print(f"  {name:<32} {seconds * 1000:>10.1f}ms" + (f"  peak {_fmt_bytes(peak):>9}" if memory else ""))
+    shutil.rmtree(root, ignore_errors=True)
+    return {"tests": n, "failed": run["failed"], "report_bytes": html_bytes, "stages": results}
+
+
+def compare(results: dict, baseline: dict, budget: float):
+    """Stages over budget against the baseline, as (size, stage, metric, value, baseline)."""
+    regressions = []
+    for size, res in results.items():
+        base_stages = baseline.get(size, {}).get("stages", {})
+        for stage, m in res["stages"].items():
+            base = base_stages.get(stage)
+            if base is None:
+                continue
+            if m["seconds"] > base["seconds"] * (1 + budget / 100.0) + TIME_SLACK:
+                regressions.append((size, stage, "seconds", m["seconds"], base["seconds"]))
+            if m["peak_bytes"] is not None and base["peak_bytes"] is not None and \
+                    m["peak_bytes"] > base["peak_bytes"] * (1 + budget / 100.0) + MEMORY_SLACK:
+                regressions.append((size, stage, "peak_bytes", m["peak_bytes"], base["peak_bytes"]))
+    return regressions
+
+
+@click.command()
+@click.option("--sizes", default="100,10000,100000", help="Comma-separated numbers of tests per synthetic run")
+@click.option("--repeat", default=3, type=int, help="Timed runs per stage; the best one counts")
+@click.option("--budget", default=25.0, type=float, help="Percent a stage may exceed its baseline time or peak memory")
+@click.option("--memory/--no-memory", default=True,
+              help="Measure each stage's peak memory in one more run under tracemalloc (several times slower)")
+@click.option("--update-baseline", is_flag=True, default=False, help="Store this run's results as the new baseline")
+@click.option("--workdir", default=None, type=click.Path(file_okay=False, path_type=Path),
+              help="Where to write the synthetic runs (Default: a temporary directory)")
+def main(sizes, repeat, budget, memory, update_baseline, workdir):
+    sizes = [int(s) for s in sizes.split(",") if s.strip()]
+    tmp = None
+    if workdir is None:
+        tmp = tempfile.TemporaryDirectory(prefix="sauce-bench-")
+        workdir = Path(tmp.name)
+    try:
+        results = {str(n): bench_size(n, repeat, workdir, memory) for n in sizes}
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+    RESULTS.parent.mkdir(parents=True, exist_ok=True)
+    RESULTS.write_text(json.dumps({"env": {"platform": platform.platform(), "python": platform.python_version()},
+                                   "repeat": repeat, "results": results}, indent=2))
+    print(f"Results: {RESULTS}")
+
+    baseline = {}
+    if BASELINE.exists():
+        try:
+            baseline = json.loads(BASELINE.read_text()).get("results", {})
+        except Exception as e:
+            print(f"Ignoring unreadable benchmark baseline {BASELINE}. Reason: {e}")
+    # sizes without a baseline yet (or all of them, when updating) become the baseline
+    stored = [size for size in results if update_baseline or size not in baseline]
+    if stored:
+        baseline.update({size: results[size] for size in stored})
+        BASELINE.parent.mkdir(parents=True, exist_ok=True)
+        BASELINE.write_text(json.dumps({"env": {"platform": platform.platform(), "python": platform.python_version()},
+                                        "results": baseline}, indent=2))
+        print(f"Stored benchmark baseline for {', '.join(stored)} tests in {BASELINE}")
+    regressions = compare({size: r for size, r in results.items() if size not in stored}, baseline, budget)
+    for size, stage, metric, value, base in regressions:
+        shown = (f"{value * 1000:.1f}ms > {base * 1000:.1f}ms" if metric == "seconds"
+                 else f"{_fmt_bytes(value)} > {_fmt_bytes(base)}")
+        print(f"  REGRESSION: {stage} at {size} tests: {shown} (budget +{budget:g}%)")
+    if regressions:
+        print(f"Failing: {len(regressions)} stage(s) over budget against {BASELINE}")
+        sys.exit(1)
+    if len(stored) < len(results):
+        print(f"All stages within +{budget:g}% of {BASELINE}")
+
+
+if __name__ == "__main__":
+    main()
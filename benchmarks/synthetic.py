@@ -0,0 +1,135 @@
+"""
+Synthetic output of a run of n tests, shaped like what pytest, pytest-html and
+the conftest leave behind, for the post-processing benchmarks:
+
+    src/tests/bench/test_mod_<k>.py   test modules for the nodeid index
+    reports/report.xml                JUnit report (pytest's layout)
+    reports/report.html               pytest-html 4 report with its data blob
+    logs/artifacts.jsonl              artifact manifest
+    videos/<id>/<hash>.webm           one video per failed test
+
+The same n and seed always give the same files. Nothing needs a browser or
+the network.
+"""
+import json
+import random
+from pathlib import Path
+from xml.sax.saxutils import quoteattr, escape
+
+TESTS_PER_FILE = 100
+FAIL_RATE = 0.1
+# every tenth test is parametrized, as test_x[p<i>]
+PARAM_EVERY = 10
+VIDEO_BYTES = 2048
+# stand-ins for pytest-html's inline CSS and JS around the data blob
+_HEAD_PAD = 12 * 1024
+_SCRIPT_PAD = 24 * 1024
+TRACEBACK = ("self = <pages.Inventory.Inventory object at 0x7f>\n\n    def click_addremove_to_cart(self, product):\n"
+             ">       self.page.locator(f\"//div[text()='{product}']\").click()\n"
+             "E       playwright._impl._errors.TimeoutError: Locator.click: Timeout 30000ms exceeded.\n\n"
+             "pages/Inventory.py:21: TimeoutError")
+
+
+def _markup_escape(text: str) -> str:
+    # what jinja/markupsafe does to the blob attribute in pytest-html
+    return (text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+            .replace('"', "&#34;").replace("'", "&#39;"))
+
+
+def _tests(n: int, seed: int):
+    rng = random.Random(seed)
+    for i in range(n):
+        module = f"test_mod_{i // TESTS_PER_FILE}"
+        func = f"test_{i % TESTS_PER_FILE}"
+        name = f"{func}[p{i}]" if i % PARAM_EVERY == 0 else func
+        yield {"module": module, "func": func, "name": name, "failed": rng.random() < FAIL_RATE,
+               "time": round(rng.uniform(0.2, 8.0), 3), "uid": f"{rng.getrandbits(32):08x}",
+               "video": f"{rng.getrandbits(64):016x}"}
+
+
+def _write_modules(tests_dir: Path, n: int):
+    tests_dir.mkdir(parents=True, exist_ok=True)
+    for k in range(-(-n // TESTS_PER_FILE)):
+        count = min(TESTS_PER_FILE, n - k * TESTS_PER_FILE)
+        lines = ["import pytest", ""]
+        for j in range(count):
+            if (k * TESTS_PER_FILE + j) % PARAM_EVERY == 0:
+                lines.append(f"@pytest.mark.parametrize('p', ['p{k * TESTS_PER_FILE + j}'])")
+                lines.append(f"def test_{j}(p):\n    pass\n")
+            else:
+                lines.append(f"def test_{j}():\n    pass\n")
+        (tests_dir / f"test_mod_{k}.py").write_text("\n".join(lines), encoding="utf-8")
+
+
+def _write_junit(path: Path, tests):
+    failures = sum(t["failed"] for t in tests)
+    total = sum(t["time"] for t in tests)
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write('<?xml version="1.0" encoding="utf-8"?><testsuites><testsuite name="pytest" errors="0" '
+                 f'failures="{failures}" skipped="0" tests="{len(tests)}" time="{total:.3f}" '
+                 'timestamp="2024-01-01T00:00:00.000000" hostname="bench">')
+        for t in tests:
+            attrs = f'classname="tests.bench.{t["module"]}" name={quoteattr(t["name"])} time="{t["time"]:.3f}"'
+            if t["failed"]:
+                fh.write(f'<testcase {attrs}><failure message="TimeoutError">{escape(TRACEBACK)}</failure></testcase>')
+            else:
+                fh.write(f"<testcase {attrs} />")
+        fh.write("</testsuite></testsuites>")
+
+
+def _write_html(path: Path, tests):
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write('<!DOCTYPE html>\n<html>\n  <head>\n    <meta charset="utf-8"/>\n    <title>report.html</title>\n'
+                 f'    <style>{"/* css */ " * (_HEAD_PAD // 10)}</style>\n  </head>\n  <body>\n'
+                 f'    <p class="run-count">{len(tests)} tests took 00:00:00.</p>\n'
+                 '  </body>\n  <footer>\n    <div id="data-container" data-jsonblob="')
+        head = {"environment": {"Python": "3.11", "Platform": "bench", "Packages": {"pytest": "8.2.2"},
+                                "Plugins": {"html": "4.1.1"}, "Base URL": ""}}
+        fh.write(_markup_escape(json.dumps(head)[:-1] + ', "tests": {'))
+        for i, t in enumerate(tests):
+            nodeid = f"tests/bench/{t['module']}.py::{t['name']}"
+            result = "Failed" if t["failed"] else "Passed"
+            entry = [{"extras": [], "result": result, "testId": nodeid, "duration": f"{int(t['time'] * 1000)} ms",
+                      "resultsTableRow": [f'<td class="col-result">{result}</td>',
+                                          f'<td class="col-testId">{nodeid}</td>',
+                                          f'<td class="col-duration">{int(t["time"] * 1000)} ms</td>',
+                                          '<td class="col-links"></td>'],
+                      "log": TRACEBACK if t["failed"] else "No log output captured."}]
+            fh.write(_markup_escape(("" if i == 0 else ", ") + json.dumps(nodeid) + ": " + json.dumps(entry)))
+        fh.write(_markup_escape('}, "renderCollapsed": ["passed"], "initialSort": "result", "title": "report.html"}'))
+        fh.write(f'"></div>\n    <script>{"/* js */ " * (_SCRIPT_PAD // 9)}</script>\n  </footer>\n</html>\n')
+
+
+def _write_artifacts(root: Path, tests):
+    manifest = root / "logs" / "artifacts.jsonl"
+    manifest.parent.mkdir(parents=True, exist_ok=True)
+    payload = b"\x1a\x45\xdf\xa3" + b"\0" * (VIDEO_BYTES - 4)
+    with open(manifest, "w", encoding="utf-8") as fh:
+        for t in tests:
+            video = []
+            if t["failed"]:
+                path = root / "videos" / t["uid"] / f"{t['video']}.webm"
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_bytes(payload)
+                video = [f"videos/{t['uid']}/{t['video']}.webm"]
+            fh.write(json.dumps({"nodeid": f"tests/bench/{t['module']}.py::{t['name']}",
+                                 "file": f"src/tests/bench/{t['module']}.py", "worker": "gw0", "attempt": 0,
+                                 "outcome": "failed" if t["failed"] else "passed", "video": video,
+                                 "trace": None, "screenshot": None, "mask": [], "blocked": None},
+                                separators=(",", ":")) + "\n")
+    return manifest
+
+
+def make_run(root: Path, n: int, seed: int = 0) -> dict:
+    """Write a synthetic run of n tests under root; returns the paths the stages read."""
+    root = Path(root)
+    tests = list(_tests(n, seed))
+    (root / "reports").mkdir(parents=True, exist_ok=True)
+    _write_modules(root / "src" / "tests" / "bench", n)
+    junit = root / "reports" / "report.xml"
+    html = root / "reports" / "report.html"
+    _write_junit(junit, tests)
+    _write_html(html, tests)
+    manifest = _write_artifacts(root, tests)
+    return {"root": root, "junit": junit, "html": html, "manifest": manifest,
+            "tests": n, "failed": sum(t["failed"] for t in tests)}
@@ -0,0 +1 @@
+"""The runner.py command line, one module per feature."""
@@ -0,0 +1,128 @@
+"""
+The `daemon` commands that keep one Chromium warm between runs, and `watch`,
+which reruns the tests each edit affects against it.
+"""
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import click
+
+from cli import paths
+from cli.execute import start_stand_in
+from cli.paths import _rel, ensure_dirs
+
+@click.group()
+def daemon():
+    """Keep one Chromium running between runs; runs and `watch` connect to it over CDP."""
+
+@daemon.command('start')
+@click.option('--headed', is_flag=True, default=False, help='Show the browser window')
+def daemon_start(headed):
+    from support.daemon import read_state
+    ensure_dirs()
+    state = read_state(paths.DAEMON_STATE)
+    if state:
+        print(f"Daemon already running (pid {state['pid']}) at {state['endpoint']}")
+        return
+    cmd = [sys.executable, str(paths.ROOT / 'runner.py'), 'daemon', 'serve'] + (['--headed'] if headed else [])
+    with open(paths.SESSION_DIR / 'daemon.log', 'a') as log:
+        proc = subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT, start_new_session=True)
+    deadline = time.time() + 30
+    while time.time() < deadline and proc.poll() is None:
+        state = read_state(paths.DAEMON_STATE)
+        if state:
+            print(f"Daemon started (pid {state['pid']}): Chromium {state['version']} at {state['endpoint']}")
+            return
+        time.sleep(0.1)
+    print(f"Daemon did not start; see {paths.SESSION_DIR / 'daemon.log'}")
+    sys.exit(1)
+
+@daemon.command('serve', hidden=True)
+@click.option('--headed', is_flag=True, default=False)
+def daemon_serve(headed):
+    from support.daemon import serve
+    serve(paths.DAEMON_STATE, headless=not headed)
+
+@daemon.command('stop')
+def daemon_stop():
+    from support.daemon import stop
+    print('Daemon stopped' if stop(paths.DAEMON_STATE) else 'No daemon running')
+
+@daemon.command('status')
+def daemon_status():
+    from support.daemon import read_state
+    state = read_state(paths.DAEMON_STATE)
+    if not state:
+        print('No daemon running')
+        return
+    print(f"pid {state['pid']}: Chromium {state['version']} at {state['endpoint']}, "
+          f"up {time.time() - state['started']:.0f}s")
+
+def _py_mtimes(root: Path):
+    return {p: p.stat().st_mtime for p in root.rglob('*.py') if '__pycache__' not in p.parts}
+
+def _forget_modules(root: Path, names):
+    """Drop edited modules and their importers so the next in-process pytest run imports them afresh."""
+    for name in names:
+        mod = sys.modules.get(name)
+        if mod is not None and str(getattr(mod, '__file__', '') or '').startswith(str(root)):
+            del sys.modules[name]
+
+@click.command()
+@click.option('--path', '-p', default=str(paths.TESTS), type=click.Path(exists=True, file_okay=False, path_type=Path),
+              help='Tests directory to watch')
+@click.option('--poll', default=0.2, type=float, help='Seconds between checks for edited files')
+@click.option('--target', type=click.Choice(['local', 'remote']), default='local', help='Run against the local stand-in or www.saucedemo.com')
+@click.option('--base-url', default=None, help='Site under test (overrides --target)')
+@click.option('--all', 'run_all', is_flag=True, default=False, help='Run every test once before watching')
+def watch(path, poll, target, base_url, run_all):
+    """Rerun the tests affected by each edit, in this process, against the daemon's warm browser."""
+    import pytest
+    from support.daemon import read_state
+    from support.impact import ImportGraph, module_name
+    ensure_dirs()
+    root = path.resolve()
+    if target == 'local' and not base_url:
+        base_url = start_stand_in()
+    args = ['-q', '-p', 'no:cacheprovider', '-o', 'addopts=-s']
+    if base_url:
+        args.append(f'--base-url={base_url}')
+    state = read_state(paths.DAEMON_STATE)
+    if state:
+        args.append(f"--browser-endpoint={state['endpoint']}")
+        print(f"Using warm browser at {state['endpoint']}")
+    else:
+        print('No daemon running; every run launches its own browser (start one with `runner.py daemon start`)')
+
+    graph = ImportGraph(root, paths.SESSION_DIR / 'import_graph.json').build()
+    mtimes = _py_mtimes(root)
+
+    def run(tests, reason):
+        started = time.perf_counter()
+        rc = pytest.main([str(t) for t in tests] + args)
+        print(f"{reason}: {len(tests)} test file(s), exit {int(rc)}, {time.perf_counter() - started:.2f}s")
+
+    if run_all:
+        run(sorted(p for p in graph.modules.values() if p.match('test_*.py')), 'All tests')
+    print(f'Watching {root} (Ctrl-C to stop)')
+    try:
+        while True:
+            time.sleep(poll)
+            current = _py_mtimes(root)
+            changed = [p for p, m in current.items() if mtimes.get(p) != m]
+            if not changed:
+                continue
+            mtimes = current
+            graph.build()
+            tests = graph.affected_tests(changed)
+            names = graph.dependents({module_name(p, root) for p in changed})
+            _forget_modules(root, names | {module_name(t, root) for t in tests})
+            edited = ', '.join(_rel(p) for p in changed)
+            if tests:
+                run(tests, f'Edited {edited}')
+            else:
+                print(f'Edited {edited}: no tests affected')
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,176 @@
+"""
+Starting pytest for a run, with its event stream feeding the live dashboard,
+and the `dashboard` command that follows the events of a plain pytest run.
+"""
+import atexit
+import html as _html
+import json
+import os
+import subprocess
+import time
+from pathlib import Path
+
+import click
+
+from cli import paths
+from cli.paths import ensure_dirs
+from cli.reporting import _video_src
+
+def run_pytest(test_args, html_path: Path, junit_path: Path, parallel: int = 0, extra_args=None,
+               self_contained: bool = True):
+    report_args = [f"--html={html_path}", f"--junitxml={junit_path}"]
+    if self_contained:
+        report_args.insert(1, "--self-contained-html")
+    cmd = ["pytest"] + test_args + report_args
+    if parallel and parallel > 0:
+        cmd = ["pytest", f"-n", str(parallel)] + test_args + report_args
+    cmd += list(extra_args or [])
+    print("Running:", " ".join(cmd))
+    start = time.time()
+    res = subprocess.run(cmd)
+    duration = time.time() - start
+    return res.returncode, duration
+
+# --- LIVE DASHBOARD ---
+# pytest streams per-test events to the runner over a local socket (--events);
+# the dashboard echoes them to the console, keeps reports/live_<run_id>.html
+# up to date and feeds the ResultFeed the end-of-run stages read from.
+LIVE_HTML_EVERY = 1.0
+_OUTCOME_COLORS = {'passed': '#2ecc71', 'failed': '#e74c3c', 'error': '#c0392b', 'skipped': '#f1c40f',
+                   'xfailed': '#95a5a6', 'xpassed': '#e67e22'}
+
+class LiveDashboard:
+    def __init__(self, feed, html_path: Path, log_path: Path = None, console: bool = True):
+        self.feed = feed
+        self.html_path = html_path
+        self.console = console
+        self._log = open(log_path, 'a', encoding='utf-8') if log_path else None
+        self._written = 0.0
+
+    def on_event(self, event: dict):
+        if self._log is not None:
+            self._log.write(json.dumps(event, separators=(',', ':')) + '\n')
+        self.feed.feed(event)
+        kind = event.get('event')
+        if self.console and kind == 'finish':
+            total = self.feed.total or '?'
+            worker = f", {event['worker']}" if event.get('worker') else ''
+            print(f"[{self.feed.done:>4}/{total}] {event['outcome'].upper():<7} {event['nodeid']} "
+                  f"({event['duration']:.1f}s{worker})", flush=True)
+        elif self.console and kind == 'rerun':
+            print(f"[rerun] {event['nodeid']} failed attempt {event.get('attempt', 0) + 1}, retrying", flush=True)
+        if kind == 'session_finish' or time.time() - self._written >= LIVE_HTML_EVERY:
+            self.write_html()
+
+    def write_html(self):
+        self._written = time.time()
+        feed, esc = self.feed, _html.escape
+        now = feed.finished_at or time.time()
+        elapsed = now - feed.started
+        done, total = feed.done, feed.total or 0
+        eta = ''
+        if feed.finished_at is None and done and total > done:
+            eta = f', ~{elapsed / done * (total - done):.0f}s left'
+        refresh = '' if feed.finished_at else '<meta http-equiv="refresh" content="2">'
+        parts = [f'<!DOCTYPE html><html><head><meta charset="utf-8">{refresh}<title>Live run</title><style>',
+                 'body{font-family:sans-serif;font-size:13px;margin:20px}table{border-collapse:collapse;margin-bottom:24px}',
+                 'td,th{border:1px solid #ddd;padding:3px 8px;text-align:left}.bar{display:flex;height:16px;'
+                 'background:#eee;margin:8px 0 16px}.bar span{height:16px}</style></head><body>',
+                 f"<h2>{'Finished' if feed.finished_at else 'Running'}: {done}/{total or '?'} tests, "
+                 f"{elapsed:.0f}s{eta}</h2><div class=\"bar\">"]
+        for outcome, count in sorted(feed.counts.items()):
+            width = 100.0 * count / max(total, done, 1)
+            parts.append(f'<span style="width:{width:.2f}%;background:{_OUTCOME_COLORS.get(outcome, "#999")}" '
+                         f'title="{count} {outcome}"></span>')
+        parts.append('</div><p>' + ', '.join(f'{c} {o}' for o, c in sorted(feed.counts.items())) + '</p>')
+        if feed.running:
+            parts.append('<h3>Running</h3><table><tr><th>test</th><th>for</th></tr>')
+            for nodeid, started in sorted(feed.running.items(), key=lambda kv: kv[1]):
+                parts.append(f'<tr><td>{esc(nodeid)}</td><td>{now - started:.0f}s</td></tr>')
+            parts.append('</table>')
+        failures = [r for r in feed.results if r['outcome'] in ('failed', 'error', 'xpassed')]
+        if failures:
+            parts.append('<h3>Failures</h3><table><tr><th>test</th><th>worker</th><th>s</th><th>artifacts</th></tr>')
+            for r in failures:
+                artifacts = r.get('artifacts') or {}
+                links = [(f'video {i + 1}', v) for i, v in enumerate(artifacts.get('video') or [])]
+                links += [(kind, artifacts[kind]) for kind in ('trace', 'screenshot') if artifacts.get(kind)]
+                cells = ' '.join(f'<a href="{esc(_video_src(paths.ROOT / rel))}">{kind}</a>' for kind, rel in links)
+                parts.append(f"<tr><td>{esc(r['nodeid'])}</td><td>{esc(r.get('worker') or '')}</td>"
+                             f"<td>{r['duration']:.1f}</td><td>{cells}</td></tr>")
+            parts.append('</table>')
+        if feed.reruns:
+            parts.append('<h3>Reruns</h3><table><tr><th>test</th><th>failed attempts</th></tr>')
+            parts += [f'<tr><td>{esc(n)}</td><td>{len(r)}</td></tr>' for n, r in feed.reruns.items()]
+            parts.append('</table>')
+        parts.append('</body></html>')
+        tmp = self.html_path.with_name(self.html_path.name + '.tmp')
+        tmp.write_text(''.join(parts), encoding='utf-8')
+        os.replace(tmp, self.html_path)
+
+    def close(self):
+        self.write_html()
+        if self._log is not None:
+            self._log.close()
+
+def run_pytest_live(test_args, html_path: Path, junit_path: Path, run_id: str, parallel: int = 0, extra_args=None,
+                    self_contained: bool = True, console: bool = True):
+    """run_pytest() with the event stream wired to a LiveDashboard; returns (rc, duration, feed)."""
+    from support.events import EventListener, ResultFeed
+    feed = ResultFeed(paths.ROOT)
+    dashboard = LiveDashboard(feed, paths.REPORTS / f'live_{run_id}.html', paths.REPORTS / f'events_{run_id}.jsonl', console)
+    listener = EventListener(dashboard.on_event).start()
+    print(f'Live dashboard: {dashboard.html_path}')
+    try:
+        rc, duration = run_pytest(test_args, html_path, junit_path, parallel,
+                                  list(extra_args or []) + [f'--events={listener.spec}'], self_contained)
+    finally:
+        # waits for the stream to be read to the end
+        listener.stop()
+        dashboard.close()
+    return rc, duration, feed
+
+def start_stand_in():
+    """Serve the bundled saucedemo stand-in for the rest of this process and return its URL."""
+    from support.stand_in import StandInServer
+    stand_in = StandInServer().start()
+    atexit.register(stand_in.stop)
+    print(f'Serving local stand-in at {stand_in.url}')
+    return stand_in.url
+
+@click.command()
+@click.argument('events', type=click.Path(dir_okay=False, path_type=Path))
+@click.option('--html', 'html_path', default=None, type=click.Path(dir_okay=False, path_type=Path),
+              help='Where to keep the live HTML page (default reports/live_<events stem>.html)')
+@click.option('--poll', default=0.5, type=float, help='Seconds between checks for new events')
+def dashboard(events, html_path, poll):
+    """Follow an --events JSONL file written by a plain pytest run until its session finishes."""
+    from support.events import ResultFeed
+    ensure_dirs()
+    board = LiveDashboard(ResultFeed(paths.ROOT), html_path or paths.REPORTS / f'live_{events.stem}.html')
+    print(f'Following {events}; live dashboard: {board.html_path}')
+    while not events.exists():
+        time.sleep(poll)
+    pending = ''
+    try:
+        with open(events, encoding='utf-8') as fh:
+            while board.feed.finished_at is None:
+                chunk = fh.readline()
+                if not chunk:
+                    board.write_html()
+                    time.sleep(poll)
+                    continue
+                pending += chunk
+                # a line still being written has no newline yet
+                if not pending.endswith('\n'):
+                    continue
+                line, pending = pending, ''
+                try:
+                    board.on_event(json.loads(line))
+                except ValueError:
+                    continue
+    except KeyboardInterrupt:
+        pass
+    board.close()
+    counts = ', '.join(f'{c} {o}' for o, c in sorted(board.feed.counts.items())) or 'no results'
+    print(f'{board.feed.done} tests: {counts}')
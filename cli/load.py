@@ -0,0 +1,46 @@
+"""
+The `load` command: the place-order journey as concurrent virtual users.
+"""
+import json
+import uuid
+
+import click
+
+from cli import paths
+from cli.execute import start_stand_in
+from cli.paths import ensure_dirs
+
+def print_load_summary(summary):
+    def ms(v):
+        return f"{v * 1000:.0f}" if v is not None else '-'
+    print(f"Load: {summary['journeys']} journeys in {summary['elapsed']:.1f}s "
+          f"({summary['throughput']:.2f}/s), {summary['failed']} failed")
+    print(f"  {'step':<18}{'count':>7}{'per s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for name, st in summary['steps'].items():
+        print(f"  {name:<18}{st['count']:>7}{st['throughput']:>8.2f}{ms(st['p50']):>9}{ms(st['p95']):>9}"
+              f"{ms(st['p99']):>9}{ms(st['max']):>9}")
+    for error, count in sorted(summary['errors'].items(), key=lambda kv: -kv[1]):
+        print(f"  {count} x {error}")
+
+@click.command()
+@click.option('--users', '-u', default=10, type=int, help='Concurrent virtual users, one context each')
+@click.option('--ramp-up', default=0.0, type=float, help='Seconds over which the users are started')
+@click.option('--duration', '-d', default=60.0, type=float, help='Seconds to keep all users running after the ramp-up')
+@click.option('--rate', default=0.0, type=float, help='Cap on journeys started per second across all users (0 = as fast as possible)')
+@click.option('--target', type=click.Choice(['local', 'remote']), default='local', help='Load the bundled local stand-in or www.saucedemo.com')
+@click.option('--base-url', default=None, help='Site under load (overrides --target)')
+def load(users, ramp_up, duration, rate, target, base_url):
+    """Run the place-order journey as concurrent virtual users and report per-step latency."""
+    from support.load import LoadRunner
+    ensure_dirs()
+    if not base_url:
+        base_url = start_stand_in() if target == 'local' else 'https://www.saucedemo.com/'
+    print(f'Load: {users} users, ramp-up {ramp_up}s, duration {duration}s'
+          f'{f", {rate}/s cap" if rate else ""} against {base_url}')
+    summary = LoadRunner(base_url, users=users, ramp_up=ramp_up, duration=duration, rate=rate).run()
+    print_load_summary(summary)
+    out = paths.SESSION_DIR / f'load_{uuid.uuid4().hex[:8]}.json'
+    with open(out, 'w') as fh:
+        json.dump(dict(summary, users=users, ramp_up=ramp_up, duration=duration, rate=rate, base_url=base_url),
+                  fh, indent=2)
+    print(f'Load results: {out}')
@@ -0,0 +1,159 @@
+"""
+The run's options, grouped by feature.
+
+Each OptionGroup decorates the command with its options and hands their
+values to it as one namespace argument named after the group, without the
+group's prefix: --perf-budget arrives as perf.budget, and the option named
+like its group (--perf) as perf.enabled. FeatureGroup lists them in --help
+under one heading per feature.
+"""
+import functools
+from types import SimpleNamespace
+
+import click
+
+from cli import paths
+
+ARTIFACT_POLICIES = ['off', 'on', 'retain-on-failure', 'on-first-retry']
+
+class OptionGroup:
+    def __init__(self, name: str, title: str, *options: click.Option):
+        self.name = name
+        self.title = title
+        self.options = options
+        for option in options:
+            option.feature = title
+
+    def _key(self, option):
+        if option.name == self.name:
+            return 'enabled'
+        return option.name.removeprefix(f'{self.name}_')
+
+    def __call__(self, f):
+        @functools.wraps(f)
+        def command(*args, **kwargs):
+            kwargs[self.name] = SimpleNamespace(**{self._key(o): kwargs.pop(o.name) for o in self.options})
+            return f(*args, **kwargs)
+        # click reverses the params its decorators collect, so these list in the order given
+        command.__click_params__ = getattr(f, '__click_params__', []) + list(reversed(self.options))
+        return command
+
+class FeatureGroup(click.Group):
+    """A click group whose --help lists the options of each OptionGroup under its title."""
+
+    def format_options(self, ctx, formatter):
+        sections = {}
+        for param in self.get_params(ctx):
+            record = param.get_help_record(ctx)
+            if record is not None:
+                sections.setdefault(getattr(param, 'feature', 'Options'), []).append(record)
+        for title, records in sections.items():
+            with formatter.section(title):
+                formatter.write_dl(records)
+        self.format_commands(ctx, formatter)
+
+selection = OptionGroup(
+    'selection', 'Test selection',
+    click.Option(['--path', '-p'], default='.', help='Path to tests (file or folder)'),
+    click.Option(['--pattern'], default='test_*.py', help='Filename pattern for discovery'),
+    click.Option(['--markers'], default=None, help='Pytest markers to pass as -m'),
+    click.Option(['--kexpr'], default=None, help='Pytest -k expression'),
+    click.Option(['--changed'], default=None,
+                 help='Run only the tests affected by these changes: a git ref to diff against (e.g. HEAD, '
+                      'origin/main) or a comma-separated file list'),
+    click.Option(['--resume'], is_flag=True, default=False, help='Resume from last session (retry failed tests)'),
+)
+
+execution = OptionGroup(
+    'execution', 'Execution',
+    click.Option(['--parallel', '-n'], default=0, type=int, help='Number of parallel workers (pytest-xdist)'),
+    click.Option(['--schedule'], type=click.Choice(['load', 'lpt']), default='lpt',
+                 help='With --parallel: xdist load order, or longest-first from duration history'),
+    click.Option(['--order'], type=click.Choice(['risk', 'collection']), default='risk',
+                 help='risk: recently failing, flaky and changed tests first; collection: pytest\'s order'),
+    click.Option(['--retries', '-r'], default=0, type=int, help='Rerun a failed test up to N times on the same worker'),
+    click.Option(['--retry-backoff'], default=0.0, type=float,
+                 help='Seconds before the first rerun, doubled for each further one'),
+    click.Option(['--max-failures'], default=0, type=int,
+                 help='Stop scheduling tests after this many failures (0 = run everything)'),
+)
+
+sharding = OptionGroup(
+    'sharding', 'Sharding',
+    click.Option(['--shard'], default=None,
+                 help='Run only shard i of N (e.g. 2/4), split by historical duration; combine with `merge`'),
+    click.Option(['--durations-file'], default=None, type=click.Path(exists=True, dir_okay=False),
+                 help='JSON of nodeid -> seconds to balance shards with, so every machine computes the same split'),
+)
+
+browser = OptionGroup(
+    'browser', 'Browser',
+    click.Option(['--recycle-after'], default=50, type=int,
+                 help='Relaunch each worker\'s browser after N tests (0 = never)'),
+    click.Option(['--max-browser-rss'], default=0, type=int,
+                 help='Relaunch a worker\'s browser above this RSS in MB (0 = off)'),
+    click.Option(['--async-concurrency'], default=4, type=int, help='Pages each worker\'s async browser drives at once'),
+    click.Option(['--daemon/--no-daemon', 'use_daemon'], default=True,
+                 help='Connect to the warm browser of `runner.py daemon start` when one is running'),
+)
+
+site = OptionGroup(
+    'site', 'Site under test',
+    click.Option(['--target'], type=click.Choice(['remote', 'local']), default='remote',
+                 help='Run against www.saucedemo.com or the bundled local stand-in'),
+    click.Option(['--base-url'], default=None, help='Site under test (overrides --target and pytest.ini base_url)'),
+    click.Option(['--har', 'har_mode'], type=click.Choice(['off', 'record', 'replay']), default='off',
+                 help='Record traffic to HAR files or replay it offline'),
+    click.Option(['--har-dir'], default=str(paths.HARS), help='Directory for recorded HAR files'),
+    click.Option(['--block', 'block_profile'], type=click.Choice(['off', 'cache', 'block']), default='off',
+                 help='Serve images/fonts/media from memory (cache) or abort them (block), stubbing trackers'),
+)
+
+artifacts = OptionGroup(
+    'artifacts', 'Artifacts',
+    click.Option(['--video'], default='retain-on-failure', type=click.Choice(ARTIFACT_POLICIES),
+                 help='Video recording policy'),
+    click.Option(['--tracing'], default='retain-on-failure', type=click.Choice(ARTIFACT_POLICIES),
+                 help='Playwright tracing policy'),
+    click.Option(['--screenshot'], default='retain-on-failure', type=click.Choice(ARTIFACT_POLICIES),
+                 help='Teardown screenshot policy'),
+    click.Option(['--artifact-workers'], default=2, type=int,
+                 help='Background threads per worker that write, thumbnail and index artifacts (0 = in teardown)'),
+    click.Option(['--store/--no-store', 'use_store'], default=True,
+                 help='Deduplicate kept artifacts into the artifacts/ store, kept across runs'),
+    click.Option(['--keep-runs'], default=10, type=int, help='Runs whose artifacts the store keeps (0 = all)'),
+    click.Option(['--store-quota'], default=2048, type=int,
+                 help='Store size in MB above which least recently used artifacts are evicted (0 = no quota)'),
+)
+
+report = OptionGroup(
+    'report', 'Reports',
+    click.Option(['--clear/--no-clear'], default=True, help='Clear previous reports, logs, videos and screenshots'),
+    click.Option(['--live/--no-live'], default=True, help='Print a line per finished test as results stream in'),
+    click.Option(['--media'], type=click.Choice(['inline', 'external']), default='inline',
+                 help='inline: self-contained report; external: pytest-html writes screenshots and other extras '
+                      'as files next to the report'),
+    click.Option(['--timing'], is_flag=True, default=False, help='Time every page-object method and Playwright call'),
+)
+
+perf = OptionGroup(
+    'perf', 'Performance',
+    click.Option(['--perf'], is_flag=True, default=False,
+                 help='Collect per-page browser performance metrics'),
+    click.Option(['--perf-budget'], default=20.0, type=float,
+                 help='Fail the run when a page metric\'s p75 exceeds its baseline by this many percent'),
+    click.Option(['--perf-update-baseline'], is_flag=True, default=False,
+                 help='Store this run\'s perf p75s as the new baseline'),
+)
+
+visual = OptionGroup(
+    'visual', 'Visual regression',
+    click.Option(['--visual'], is_flag=True, default=False,
+                 help='Compare every test\'s teardown screenshot with its stored baseline (turns --screenshot on)'),
+    click.Option(['--visual-tolerance'], default=0.1, type=float,
+                 help='Percent of pixels a screenshot may differ from its baseline'),
+    click.Option(['--visual-exact'], is_flag=True, default=False,
+                 help='Diff every screenshot whose pixels changed, even when its perceptual hash matches the baseline'),
+    click.Option(['--visual-update-baseline'], is_flag=True, default=False,
+                 help='Store this run\'s screenshots as the new visual baselines'),
+)
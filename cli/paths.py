@@ -0,0 +1,49 @@
+"""
+Where a run's output goes, and the helpers every runner command shares.
+
+The other cli modules look these up as paths.REPORTS and so on when they run,
+so setting them here points a whole run somewhere else (the post-processing
+benchmark does, for its synthetic runs).
+"""
+import shutil
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+REPORTS = ROOT / "reports"
+LOGS = ROOT / "logs"
+VIDEOS = ROOT / "videos"
+SCREENSHOTS = ROOT / "screenshots"
+SESSION_DIR = ROOT / "session"
+HARS = ROOT / "hars"
+TESTS = ROOT / "src" / "tests"
+DAEMON_STATE = SESSION_DIR / "daemon.json"
+STORE = ROOT / "artifacts"
+
+# shared helpers (local stand-in server, ...) live next to the tests
+sys.path.insert(0, str(ROOT / "src" / "tests"))
+
+def ensure_dirs():
+    for d in (REPORTS, LOGS, VIDEOS, SCREENSHOTS, SESSION_DIR):
+        d.mkdir(parents=True, exist_ok=True)
+
+def clear_previous():
+    for d in (REPORTS, LOGS, VIDEOS, SCREENSHOTS):
+        if d.exists():
+            for child in d.iterdir():
+                try:
+                    if child.is_file() or child.is_symlink():
+                        child.unlink()
+                    elif child.is_dir():
+                        shutil.rmtree(child)
+                except Exception:
+                    pass
+
+def _rel(p: Path):
+    try:
+        return Path(p).resolve().relative_to(ROOT.resolve()).as_posix()
+    except ValueError:
+        return str(p)
+
+def discover_tests(path: Path, pattern: str = "test_*.py"):
+    return [p for p in path.rglob(pattern) if p.is_file()]
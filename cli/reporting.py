@@ -0,0 +1,340 @@
+"""
+Post-processing of the pytest-html report: video, trace and visual-diff
+links are written into it without loading the whole file, plus the results
+pie chart.
+"""
+import html as _html
+import json
+import os
+import re
+from pathlib import Path
+
+from cli import paths
+
+# --- STREAMING REPORT REWRITE ---
+# pytest-html keeps all results in one html-escaped JSON attribute:
+#   <div id="data-container" data-jsonblob="{&#34;tests&#34;: {&#34;<nodeid>&#34;: [...], ...}, ...}">
+# The scanner below walks that attribute token by token without unescaping or
+# parsing it, copies everything straight through, and only buffers and decodes
+# the result lists of the tests a caller asks for.
+_BLOB_PREFIX = 'data-jsonblob="'
+_QUOTE_ENTITIES = ('&#34;', '&quot;', '&#x22;')
+_BLOB_TOKEN = re.compile(r'\\(?:&#34;|&quot;|&#x22;|[^&])|&#34;|&quot;|&#x22;|[{}\[\],:"]')
+_MAX_TOKEN = 7
+REPORT_CHUNK = 1 << 20
+
+def rewrite_pytest_html_tests(html_path: Path, out_path: Path, wanted, transform, chunk_size: int = REPORT_CHUNK,
+                              head=None, extra_tests=()):
+    """
+    Stream html_path to out_path, replacing the result list of every test whose
+    nodeid satisfies wanted(nodeid) with transform(nodeid, results) (a list of
+    result dicts; return None to leave it untouched). Peak memory is one chunk
+    plus the largest selected test entry, whatever the report size.
+
+    head(text), if given, rewrites the document up to the blob (the summary
+    counts live there); extra_tests yields (nodeid, results) pairs appended
+    to the blob's tests. Returns the number of tests transform changed.
+    """
+    changed = 0
+    with open(html_path, encoding='utf-8') as fin, open(out_path, 'w', encoding='utf-8') as fout:
+        buf = ''
+        eof = False
+        # 1. copy everything up to the blob; the header before it is small
+        #    whatever the number of tests, so it is held whole for head()
+        prefix = []
+        while True:
+            idx = buf.find(_BLOB_PREFIX)
+            if idx != -1:
+                prefix.append(buf[:idx + len(_BLOB_PREFIX)])
+                buf = buf[idx + len(_BLOB_PREFIX):]
+                break
+            if eof:
+                prefix.append(buf)
+                fout.write(''.join(prefix))
+                return 0
+            keep = len(_BLOB_PREFIX) - 1
+            prefix.append(buf[:-keep] if len(buf) > keep else '')
+            buf = buf[-keep:] if len(buf) > keep else buf
+            data = fin.read(chunk_size)
+            eof = not data
+            buf += data
+        prefix = ''.join(prefix)
+        fout.write(head(prefix) if head else prefix)
+
+        # 2. scan the blob
+        pos = out_pos = 0
+        stack = []
+        expect_key = False
+        in_string = False
+        key_start = None
+        key_parts = []
+        root_key = test_key = None
+        capture = None
+        seen_tests = False
+        done = False
+
+        def emit(upto):
+            nonlocal out_pos
+            if upto > out_pos:
+                if capture is None:
+                    fout.write(buf[out_pos:upto])
+                else:
+                    capture.append(buf[out_pos:upto])
+            out_pos = upto
+
+        while not done:
+            m = _BLOB_TOKEN.search(buf, pos)
+            if m is None or (not eof and m.start() >= len(buf) - _MAX_TOKEN):
+                if eof:
+                    break
+                # keep any partial token at the end of the window for the next read
+                pos = max(pos, len(buf) - _MAX_TOKEN) if m is None else m.start()
+                if key_start is not None:
+                    key_parts.append(buf[key_start:pos])
+                    key_start = 0
+                emit(pos)
+                buf = buf[pos:]
+                pos = out_pos = 0
+                data = fin.read(chunk_size)
+                eof = not data
+                buf += data
+                continue
+            tok = m.group()
+            pos = m.end()
+            if in_string:
+                if tok in _QUOTE_ENTITIES:
+                    in_string = False
+                    if key_start is not None:
+                        raw = ''.join(key_parts) + buf[key_start:m.start()]
+                        key_start, key_parts = None, []
+                        key = json.loads('"' + _html.unescape(raw) + '"')
+                        if len(stack) == 1:
+                            root_key = key
+                        elif len(stack) == 2 and root_key == 'tests':
+                            test_key = key
+                            seen_tests = True
+                continue
+            if tok in _QUOTE_ENTITIES:
+                in_string = True
+                if expect_key and len(stack) <= 2:
+                    key_start = pos
+                continue
+            if tok == '"':
+                # the attribute's closing quote
+                emit(m.start())
+                done = True
+            elif tok in '{[':
+                if tok == '[' and len(stack) == 2 and root_key == 'tests' and test_key is not None \
+                        and wanted(test_key):
+                    emit(m.start())
+                    capture = []
+                stack.append(tok)
+                expect_key = tok == '{'
+            elif tok in '}]':
+                stack.pop()
+                expect_key = False
+                if tok == '}' and len(stack) == 1 and root_key == 'tests':
+                    emit(m.start())
+                    for nodeid, results in extra_tests:
+                        fout.write((',' if seen_tests else '') + _html.escape(json.dumps(nodeid), quote=True) + ':'
+                                   + _html.escape(json.dumps(results), quote=True))
+                        seen_tests = True
+                if capture is not None and len(stack) == 2:
+                    emit(pos)
+                    raw, capture = ''.join(capture), None
+                    results = json.loads(_html.unescape(raw))
+                    new = transform(test_key, results)
+                    if new is not None:
+                        raw = _html.escape(json.dumps(new), quote=True)
+                        changed += 1
+                    fout.write(raw)
+            elif tok == ',':
+                expect_key = bool(stack) and stack[-1] == '{'
+            elif tok == ':':
+                expect_key = False
+
+        # 3. copy the rest of the document
+        emit(len(buf))
+        while True:
+            data = fin.read(chunk_size)
+            if not data:
+                break
+            fout.write(data)
+    return changed
+
+def _video_link_html(rel_paths):
+    links_html = ""
+    for i, r_path in enumerate(rel_paths):
+        label = "Video" if len(rel_paths) == 1 else f"Video {i+1}"
+        # Badge Style: Red background, white text, rounded corners
+        style = (
+            "background-color: #d9534f; color: white; padding: 2px 6px; "
+            "border-radius: 4px; text-decoration: none; font-size: 11px; "
+            "margin-right: 4px; display: inline-block;"
+        )
+        links_html += f'<a href="{r_path}" target="_blank" style="{style}">{label}</a>'
+    return links_html
+
+def _video_src(v_path):
+    try:
+        return os.path.relpath(v_path, paths.REPORTS)
+    except ValueError:
+        return v_path
+
+def inject_videos_into_pytest_html(html_path: Path, videos_map: dict, failed_nodeids: list):
+    """Add video badges and players to the failed results of a pytest-html report, streaming it."""
+    if not html_path.exists() or not videos_map:
+        return
+
+    print("Injecting videos into report...")
+
+    def inject(test_key, results_list):
+        target_result = None
+        for res in results_list:
+            if res.get('result', '').lower() == 'failed':
+                target_result = res
+                break
+        if not target_result:
+            return None
+
+        vids = videos_map[test_key]
+        rel_paths = [_video_src(v) for v in vids]
+
+        # 1. Inject "Badge" Link into Table
+        if 'resultsTableRow' in target_result:
+            row_html = target_result['resultsTableRow']
+            link_idx = -1
+            for i, cell in enumerate(row_html):
+                if 'col-links' in cell:
+                    link_idx = i
+                    break
+            if link_idx != -1:
+                old_cell = row_html[link_idx]
+                if '</td>' in old_cell:
+                    row_html[link_idx] = old_cell.replace('</td>', f'{_video_link_html(rel_paths)}</td>')
+
+        # 2. Inject Compact Player
+        video_html_list = []
+        for r_path in rel_paths:
+            html = (
+                f'<div class="media" style="float: left; margin: 10px 0; clear: both;">'
+                f'<div style="margin-bottom: 4px; font-weight: bold; font-size: 12px; color: #555;">Video Evidence:</div>'
+                # UPDATED: Fixed width 480px for better fit
+                f'<video controls style="width: 480px; max-width: 100%; border: 1px solid #ccc; border-radius: 4px; box-shadow: 0 1px 3px rgba(0,0,0,0.1); background: #000;">'
+                f'<source src="{r_path}" type="video/webm">'
+                f'Your browser does not support the video tag.'
+                f'</video>'
+                f'</div>'
+            )
+            video_html_list.append(html)
+
+        target_result.setdefault('tableHtml', [])
+        target_result['tableHtml'].extend(video_html_list)
+        return results_list
+
+    tmp = html_path.with_name(html_path.name + '.tmp')
+    try:
+        injected_count = rewrite_pytest_html_tests(html_path, tmp, lambda k: k in videos_map, inject)
+    except Exception as e:
+        print(f"Error rewriting report: {e}")
+        tmp.unlink(missing_ok=True)
+        return
+
+    if injected_count > 0:
+        os.replace(tmp, html_path)
+        print(f"Successfully injected videos for {injected_count} failed tests.")
+    else:
+        tmp.unlink(missing_ok=True)
+
+_BADGE_STYLE = ("color: white; padding: 2px 6px; border-radius: 4px; text-decoration: none; "
+                "font-size: 11px; margin-right: 4px; display: inline-block;")
+
+def _annotate_pytest_html(html_path: Path, items: list, annotate, what: str, result: str = 'failed'):
+    """
+    Rewrite a pytest-html report so annotate(test result, item) can add links
+    and html to the given result of each item's test; items carry 'nodeid' and
+    'file' and are matched under every spelling of the nodeid.
+    """
+    if not html_path.exists() or not items:
+        return
+    by_key = {}
+    for item in items:
+        by_key[item['nodeid']] = item
+        local = item['nodeid'].split('::', 1)[1] if '::' in item['nodeid'] else ''
+        if item.get('file') and local:
+            by_key.setdefault(f"{item['file']}::{local}", item)
+            by_key.setdefault(str(paths.ROOT / f"{item['file']}::{local}"), item)
+
+    def inject(test_key, results_list):
+        target = next((r for r in reversed(results_list) if result is None or r.get('result', '').lower() == result), None)
+        if not target:
+            return None
+        annotate(target, by_key[test_key])
+        return results_list
+
+    tmp = html_path.with_name(html_path.name + '.tmp')
+    try:
+        count = rewrite_pytest_html_tests(html_path, tmp, lambda k: k in by_key, inject)
+    except Exception as e:
+        print(f"Error rewriting report: {e}")
+        tmp.unlink(missing_ok=True)
+        return
+    if count > 0:
+        os.replace(tmp, html_path)
+        print(f"Added {what} to {count} tests in the report.")
+    else:
+        tmp.unlink(missing_ok=True)
+
+def _add_badge(result, label: str, href: str, color: str):
+    row_html = result.get('resultsTableRow') or []
+    for i, cell in enumerate(row_html):
+        if 'col-links' in cell and '</td>' in cell:
+            row_html[i] = cell.replace('</td>', f'<a href="{href}" target="_blank" '
+                                                f'style="background-color: {color}; {_BADGE_STYLE}">{label}</a></td>')
+            break
+
+def inject_traces_into_pytest_html(html_path: Path, failing: list):
+    """Link each failed result of a pytest-html report to its trace and the action it failed at."""
+    def annotate(result, f):
+        href = _video_src(paths.ROOT / f['trace'])
+        _add_badge(result, 'Trace', href, '#5b6abf')
+        where = (f"Failed at <code>{_html.escape(f['action'])} {_html.escape(f['selector'] or '')}</code>: "
+                 f"{_html.escape(f['error'] or '')}<br>" if f['action'] else '')
+        result.setdefault('tableHtml', []).append(
+            f'<div style="clear: both; margin: 10px 0; font-size: 12px;">{where}'
+            f'Trace: <a href="{href}">{_html.escape(f["trace"])}</a> '
+            f'(<code>playwright show-trace {_html.escape(f["trace"])}</code>)</div>')
+    _annotate_pytest_html(html_path, failing, annotate, 'trace links')
+
+def inject_visual_into_pytest_html(html_path: Path, failures: list):
+    """Show baseline, screenshot and diff image on the last result of each test whose screenshot changed."""
+    def annotate(result, f):
+        images = [(label, _video_src(paths.ROOT / f[k])) for label, k in
+                  (('Baseline', 'baseline'), ('Screenshot', 'current'), ('Diff', 'diff')) if f.get(k)]
+        _add_badge(result, 'Visual diff', images[-1][1], '#8e44ad')
+        cells = ''.join(f'<div style="float: left; margin-right: 8px;"><div style="font-weight: bold; font-size: 12px; '
+                        f'color: #555;">{label}</div><a href="{src}" target="_blank"><img src="{src}" '
+                        f'style="width: 320px; border: 1px solid #ccc;"></a></div>' for label, src in images)
+        result.setdefault('tableHtml', []).append(
+            f'<div style="clear: both; margin: 10px 0; font-size: 12px;">Visual regression: '
+            f'{_html.escape(f["reason"])}<div style="overflow: hidden; margin-top: 4px;">{cells}</div></div>')
+    _annotate_pytest_html(html_path, failures, annotate, 'visual diffs', result=None)
+
+def make_pie_chart(stats, outpath: Path, title: str = "Test Results"):
+    try:
+        import matplotlib.pyplot as plt
+    except Exception:
+        print('matplotlib not installed; skipping pie chart generation')
+        return
+    labels = ['passed', 'failed', 'skipped']
+    sizes = [stats.get('passed', 0), stats.get('failed', 0), stats.get('skipped', 0)]
+    colors = ['#2ecc71', '#e74c3c', '#f1c40f']
+    if stats.get('flaky'):
+        labels.append('flaky')
+        sizes.append(stats['flaky'])
+        colors.append('#e67e22')
+    plt.figure(figsize=(6, 6))
+    plt.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=140, colors=colors)
+    plt.title(title)
+    plt.savefig(outpath)
+    plt.close()
@@ -0,0 +1,264 @@
+"""
+Reading a run's results back: the JUnit file, the nodeid index that maps
+test names to the files that define them, and the artifact manifest.
+"""
+import ast
+import json
+import os
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from cli import paths
+
+def iter_junit_testcases(junit_file: Path):
+    """
+    Yield one dict per <testcase> with iterparse, dropping each element once
+    it has been read, so memory stays flat however many testcases the file has.
+    """
+    open_elems = []
+    for event, elem in ET.iterparse(str(junit_file), events=('start', 'end')):
+        if event == 'start':
+            open_elems.append(elem)
+            continue
+        open_elems.pop()
+        if elem.tag != 'testcase':
+            continue
+        t = {
+            'classname': elem.attrib.get('classname'),
+            'name': elem.attrib.get('name'),
+            'time': float(elem.attrib.get('time', '0')),
+            'file': None,
+            'status': 'passed',
+            'attempts': None
+        }
+        if elem.find('failure') is not None or elem.find('error') is not None:
+            t['status'] = 'failed'
+        elif elem.find('skipped') is not None:
+            t['status'] = 'skipped'
+        # in-session reruns record every attempt's outcome as a testcase property
+        prop = elem.find("properties/property[@name='attempts']")
+        if prop is not None:
+            t['attempts'] = prop.attrib.get('value', '').split(',')
+        yield t
+        # forget this testcase (and any siblings before it) in its parent
+        if open_elems:
+            del open_elems[-1][:]
+        elem.clear()
+
+def parse_junit(junit_file: Path, keep_tests: bool = True):
+    if not junit_file.exists():
+        return {"passed": 0, "failed": 0, "skipped": 0, "tests": [], "duration": 0.0}
+    counts = {'passed': 0, 'failed': 0, 'skipped': 0}
+    tests = []
+    total_time = 0.0
+    for t in iter_junit_testcases(junit_file):
+        total_time += t['time']
+        counts[t['status']] += 1
+        if keep_tests:
+            tests.append(t)
+    return dict(counts, tests=tests, duration=total_time)
+
+def merge_junit_results(junit: Path):
+    """
+    Reduce a JUnit report to one verdict per test: passed, failed (failed every
+    attempt), flaky (failed, then passed on an in-session rerun) or skipped.
+    A test found more than once (shards that both ran it) gets one verdict over
+    all of its attempts. Only tests that were rerun or did not pass are held in
+    memory; passed ones are held as their keys.
+    """
+    merged = {'passed': 0, 'failed': 0, 'flaky': 0, 'skipped': 0, 'duration': 0.0, 'verdicts': {}}
+    if not junit.exists():
+        return merged
+    passed = set()
+    for t in iter_junit_testcases(junit):
+        merged['duration'] += t['time']
+        key = f"{t['classname']}::{t['name']}"
+        attempts = t['attempts'] or [t['status']]
+        if key in passed:
+            passed.discard(key)
+            merged['passed'] -= 1
+            attempts = ['passed'] + attempts
+        elif key in merged['verdicts']:
+            earlier = merged['verdicts'].pop(key)
+            merged[earlier['status']] -= 1
+            attempts = earlier['attempts'] + attempts
+        if 'failed' in attempts:
+            status = 'flaky' if 'passed' in attempts else 'failed'
+        else:
+            status = 'passed' if 'passed' in attempts else 'skipped'
+        merged[status] += 1
+        if status == 'passed':
+            passed.add(key)
+        else:
+            merged['verdicts'][key] = {
+                'classname': t['classname'], 'name': t['name'], 'status': status, 'attempts': attempts,
+            }
+    return merged
+
+# directories never worth scanning for test modules
+INDEX_SKIP_DIRS = {'.git', '.venv', 'venv', 'node_modules', '__pycache__', '.tox', '.nox',
+                   'site-packages', 'reports', 'logs', 'videos', 'screenshots', 'session'}
+
+def _collect_test_names(tree):
+    """Return 'test_x' / 'TestY::test_z' names pytest would collect from a module AST."""
+    names = []
+
+    def visit(body, prefix):
+        for node in body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name.startswith('test'):
+                names.append(prefix + node.name)
+            elif isinstance(node, ast.ClassDef) and node.name.startswith('Test'):
+                visit(node.body, f"{prefix}{node.name}::")
+
+    visit(tree.body, '')
+    return names
+
+class NodeidIndex:
+    """
+    On-disk index of test module -> collectable test names, refreshed by file mtime.
+
+    JUnit reports a test as classname 'tests.test_login[.TestX]' + name
+    'test_y[param]'; resolve() maps that back to the exact pytest nodeid with
+    dictionary lookups instead of scanning and reading files per failure.
+    """
+
+    def __init__(self, root: Path = None, cache_file: Path = None):
+        self.root = root or paths.ROOT
+        self.cache_file = cache_file or paths.SESSION_DIR / 'nodeid_index.json'
+        self.files = {}
+        self._modules = {}
+        self._tests = {}
+
+    def _iter_test_files(self):
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if d not in INDEX_SKIP_DIRS and not d.startswith('.')]
+            for f in filenames:
+                if f.endswith('.py') and (f.startswith('test_') or f.endswith('_test.py')):
+                    yield Path(dirpath) / f
+
+    def refresh(self):
+        try:
+            cached = json.loads(self.cache_file.read_text()).get('files', {})
+        except Exception:
+            cached = {}
+        files = {}
+        changed = False
+        for p in self._iter_test_files():
+            rel = p.relative_to(self.root).as_posix()
+            mtime = p.stat().st_mtime
+            entry = cached.get(rel)
+            if entry is None or entry.get('mtime') != mtime:
+                try:
+                    names = _collect_test_names(ast.parse(p.read_text(encoding='utf-8')))
+                except (SyntaxError, UnicodeDecodeError):
+                    names = []
+                entry = {'mtime': mtime, 'tests': names}
+                changed = True
+            files[rel] = entry
+        if changed or set(files) != set(cached):
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            self.cache_file.write_text(json.dumps({'files': files}))
+        self.files = files
+        self._modules = {}
+        self._tests = {rel: set(entry['tests']) for rel, entry in files.items()}
+        for rel in files:
+            parts = rel[:-3].split('/')
+            # junit classnames are relative to pytest's rootdir, so index every dotted suffix
+            for i in range(len(parts)):
+                self._modules.setdefault('.'.join(parts[i:]), []).append(rel)
+        return self
+
+    def resolve(self, classname: str, name: str):
+        """Return the root-relative nodeid for a junit (classname, name), or None."""
+        if not classname or not name:
+            return None
+        parts = classname.split('.')
+        base = name.split('[', 1)[0]
+        for k in range(len(parts), 0, -1):
+            candidates = self._modules.get('.'.join(parts[:k]))
+            if not candidates:
+                continue
+            chain = parts[k:]
+            local = '::'.join(chain + [base])
+            for rel in candidates:
+                if local in self._tests[rel]:
+                    return '::'.join([rel] + chain + [name])
+        return None
+
+    def test_files(self):
+        return list(self.files)
+
+def nodeid_arg(nodeid: str):
+    """Turn a root-relative nodeid into one pytest can run from any working directory."""
+    return str(paths.ROOT / nodeid) if not Path(nodeid.split('::', 1)[0]).is_absolute() else nodeid
+
+def failed_nodeids_from_junit(junit_file: Path, index: NodeidIndex = None):
+    if not junit_file.exists():
+        return []
+    if index is None:
+        index = NodeidIndex().refresh()
+    nodeids = []
+    for t in iter_junit_testcases(junit_file):
+        if t['status'] == 'failed':
+            cls = t.get('classname')
+            name = t.get('name')
+            nodeid = index.resolve(cls, name)
+            if nodeid is None:
+                if not cls:
+                    continue
+                nodeid = f"{cls.replace('.', '/')}.py::{name}"
+            nodeids.append(nodeid_arg(nodeid))
+    return nodeids
+
+def load_artifact_manifest(manifest: Path = None):
+    """Load the conftest's JSONL artifact manifest into {nodeid: [record per attempt]}."""
+    if manifest is None:
+        from support.artifacts import manifest_path
+        manifest = manifest_path(paths.LOGS)
+    index = {}
+    if not manifest.exists():
+        return index
+    with open(manifest, encoding='utf-8') as fh:
+        for line in fh:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                # a worker killed mid-write leaves at most one torn line
+                continue
+            index.setdefault(rec['nodeid'], []).append(rec)
+    for records in index.values():
+        records.sort(key=lambda r: r.get('attempt', 0))
+    return index
+
+def _stored_path(rel: str, digest: str = None):
+    """The working copy of an artifact, or its blob in the store once the working copy was cleared."""
+    path = paths.ROOT / rel
+    if not path.exists() and digest:
+        from support.store import ArtifactStore
+        blob = ArtifactStore(paths.STORE).blob_path(digest, Path(rel).suffix)
+        if blob.exists():
+            return blob
+    return path
+
+def collect_videos_map(manifest: Path = None, attempt: int = None):
+    """
+    Map every spelling of a nodeid (rootdir-relative, repo-relative, absolute) to
+    its video paths, from the given attempt or else the latest one that kept a video.
+    """
+    mapping = {}
+    for nodeid, records in load_artifact_manifest(manifest).items():
+        if attempt is None:
+            rec = next((r for r in reversed(records) if r.get('video')), None)
+        else:
+            rec = next((r for r in records if r.get('attempt', 0) == attempt), None)
+        if rec is None or not rec.get('video'):
+            continue
+        hashes = (rec.get('hashes') or {}).get('video') or []
+        vids = [str(_stored_path(v, hashes[i] if i < len(hashes) else None)) for i, v in enumerate(rec['video'])]
+        mapping[nodeid] = vids
+        local = nodeid.split('::', 1)[1] if '::' in nodeid else ''
+        rel = f"{rec['file']}::{local}" if rec.get('file') and local else None
+        if rel:
+            mapping.setdefault(rel, vids)
+            mapping.setdefault(str(paths.ROOT / rel), vids)
+    return mapping
@@ -0,0 +1,129 @@
+"""
+Which tests a run picks and in what order: --changed narrows the test files
+to those the edits reach through the import graph, failure_risk puts recently
+failing, flaky and changed tests first, and lpt_partition balances them over
+xdist workers (or shards) by duration history.
+"""
+import heapq
+import json
+import subprocess
+from fnmatch import fnmatch
+from pathlib import Path
+
+from cli import paths
+from cli.paths import _rel
+from cli.results import NodeidIndex
+
+# changes that can affect any test however the imports go: the suite's ini and
+# root conftest, requirements*.txt pins what the tests run on, and the runner
+# (runner.py and cli/) builds every run's command line
+GLOBAL_INPUTS = ('src/pytest.ini', 'src/tests/conftest.py', 'requirements*.txt', 'runner.py', 'cli/*.py')
+# no test imports them, but they serve the site the tests run against with --target local
+SITE_MODULES = {'support.stand_in'}
+SITE_DIR = 'src/tests/support/site/'
+
+def changed_files(spec: str):
+    """The files a git ref differs in (working tree and untracked included), or a comma-separated file list."""
+    probe = subprocess.run(['git', 'rev-parse', '--verify', '--quiet', f'{spec}^{{commit}}'], cwd=paths.ROOT,
+                           capture_output=True, text=True)
+    if probe.returncode != 0:
+        return [Path(p.strip()).resolve() for p in spec.split(',') if p.strip()]
+    top = Path(subprocess.run(['git', 'rev-parse', '--show-toplevel'], cwd=paths.ROOT, capture_output=True,
+                              text=True).stdout.strip() or paths.ROOT)
+    names = set()
+    for cmd in (['git', 'diff', '--name-only', spec], ['git', 'ls-files', '--others', '--exclude-standard']):
+        names.update(subprocess.run(cmd, cwd=paths.ROOT, capture_output=True, text=True).stdout.split())
+    return sorted(top / n for n in names)
+
+def select_changed(test_paths, changed, graph):
+    """
+    Narrow test_paths to the files the changes reach through the import graph.
+    Returns (selected paths, reason); a change to a GLOBAL_INPUTS file or to the
+    stand-in site selects everything. Files no test reaches (runner tooling such
+    as support/load.py, README, report CSS) select nothing.
+    """
+    for p in changed:
+        rel = _rel(p)
+        if any(fnmatch(rel, pattern) for pattern in GLOBAL_INPUTS):
+            return list(test_paths), f'{rel} can affect every test'
+        if graph.module_for(p) in SITE_MODULES or rel.startswith(SITE_DIR):
+            return list(test_paths), f'{rel} serves the site under test'
+    affected = {t.resolve() for t in graph.affected_tests(changed)}
+    graph_root = graph.root.resolve()
+    return [t for t in test_paths if t.resolve() in affected or graph_root not in t.resolve().parents], None
+
+def load_duration_history(index: NodeidIndex, max_sessions: int = 10):
+    """Median duration per root-relative nodeid over the most recent session_*.json files."""
+    sessions = sorted(paths.SESSION_DIR.glob('session_*.json'), key=lambda f: f.stat().st_mtime)[-max_sessions:]
+    samples = {}
+    for f in sessions:
+        try:
+            tests = json.loads(f.read_text()).get('stats', {}).get('tests', [])
+        except Exception:
+            continue
+        for t in tests:
+            if t.get('status') == 'skipped':
+                continue
+            nodeid = t.get('nodeid') or index.resolve(t.get('classname'), t.get('name'))
+            if nodeid:
+                samples.setdefault(nodeid, []).append(t.get('time', 0.0))
+    return {k: sorted(v)[len(v) // 2] for k, v in samples.items()}
+
+# weight of a session's failures relative to the next newer session's
+RISK_DECAY = 0.5
+
+def failure_risk(index: NodeidIndex, test_paths, max_sessions: int = 20):
+    """
+    Score tests by how likely they are to fail next, newest session first: a
+    failure counts 1 and a flaky verdict 0.5, halved for every older session;
+    a test file changed since the last session adds 1 for all of its tests.
+    Returns ({root-relative nodeid or file: score}, [changed files]).
+    """
+    sessions = sorted(paths.SESSION_DIR.glob('session_*.json'), key=lambda f: f.stat().st_mtime)[-max_sessions:]
+    scores = {}
+
+    def add(key, weight):
+        scores[key] = scores.get(key, 0.0) + weight
+
+    for age, f in enumerate(reversed(sessions)):
+        try:
+            state = json.loads(f.read_text())
+        except Exception:
+            continue
+        weight = RISK_DECAY ** age
+        for nodeid in state.get('failed_nodeids', []):
+            path, sep, rest = nodeid.partition('::')
+            add(_rel(path) + sep + rest, weight)
+        for v in ((state.get('final') or {}).get('verdicts') or {}).values():
+            if v.get('status') != 'flaky':
+                continue
+            nodeid = v.get('nodeid') or index.resolve(v.get('classname'), v.get('name'))
+            if nodeid:
+                add(nodeid, 0.5 * weight)
+    changed = []
+    if sessions:
+        last_run = sessions[-1].stat().st_mtime
+        for p in test_paths:
+            if p.stat().st_mtime > last_run:
+                changed.append(_rel(p))
+                add(_rel(p), 1.0)
+    return scores, changed
+
+def lpt_partition(durations: dict, bins: int, default: float = None):
+    """
+    Longest-processing-time-first: assign each test, longest first, to the
+    least loaded of `bins` bins. Returns (list of nodeid lists, list of loads).
+    """
+    if default is None:
+        known = sorted(d for d in durations.values() if d is not None)
+        default = known[len(known) // 2] if known else 1.0
+    heap = [(0.0, i) for i in range(bins)]
+    parts = [[] for _ in range(bins)]
+    loads = [0.0] * bins
+    for nodeid, d in sorted(durations.items(), key=lambda kv: (-(kv[1] if kv[1] is not None else default), kv[0])):
+        d = d if d is not None else default
+        load, i = heapq.heappop(heap)
+        parts[i].append(nodeid)
+        loads[i] = load + d
+        heapq.heappush(heap, (loads[i], i))
+    return parts, loads
@@ -0,0 +1,257 @@
+"""
+--shard i/N: splitting a run's tests into duration-balanced shards, and the
+`merge` command that combines the shards' reports, JUnit files and sessions.
+"""
+import json
+import os
+import platform
+import re
+import shutil
+import uuid
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import click
+
+from cli import paths
+from cli.paths import _rel, ensure_dirs
+from cli.reporting import (REPORT_CHUNK, _BLOB_PREFIX, inject_traces_into_pytest_html,
+                           inject_videos_into_pytest_html, inject_visual_into_pytest_html, make_pie_chart,
+                           rewrite_pytest_html_tests)
+from cli.results import NodeidIndex, collect_videos_map, merge_junit_results, parse_junit
+from cli.selection import lpt_partition
+from cli.summaries import summarize_artifacts, summarize_auth_cache, summarize_browser_pool, summarize_store
+
+def shard_units(test_paths, index: NodeidIndex):
+    """Root-relative nodeids of every test in test_paths; files the index cannot see stay whole."""
+    units = []
+    for p in test_paths:
+        try:
+            rel = Path(p).resolve().relative_to(paths.ROOT.resolve()).as_posix()
+        except ValueError:
+            units.append(str(p))
+            continue
+        names = index.files.get(rel, {}).get('tests')
+        units += [f"{rel}::{name}" for name in names] if names else [rel]
+    return units
+
+def shard_partition(units, history: dict, total: int):
+    """
+    Split units into `total` duration-balanced shards with lpt_partition. Every
+    shard computes the same split as long as they see the same history.
+    """
+    unit_set = set(units)
+    by_unit = {}
+    for nodeid, d in history.items():
+        # history has one entry per parametrization; a unit is a whole test function or file
+        key = nodeid.split('[', 1)[0]
+        if key not in unit_set:
+            key = key.split('::', 1)[0]
+        by_unit[key] = by_unit.get(key, 0.0) + d
+    return lpt_partition({u: by_unit.get(u) for u in units}, total)
+
+# --- SHARD MERGE ---
+def _junit_suite_attrs(junit_file: Path):
+    for event, elem in ET.iterparse(str(junit_file), events=('start',)):
+        if elem.tag == 'testsuite':
+            return dict(elem.attrib)
+    return {}
+
+def merge_junit_files(junit_files, out_path: Path):
+    """Stream the testcases of several JUnit files into one testsuite with summed counts."""
+    junit_files = [f for f in junit_files if f.exists()]
+    totals = {'errors': 0, 'failures': 0, 'skipped': 0, 'tests': 0}
+    suite_time = 0.0
+    for f in junit_files:
+        attrs = _junit_suite_attrs(f)
+        for k in totals:
+            totals[k] += int(attrs.get(k, 0))
+        suite_time = max(suite_time, float(attrs.get('time', 0)))
+    with open(out_path, 'w', encoding='utf-8') as fout:
+        fout.write('<?xml version="1.0" encoding="utf-8"?><testsuites>')
+        fout.write(f'<testsuite name="pytest" errors="{totals["errors"]}" failures="{totals["failures"]}" '
+                   f'skipped="{totals["skipped"]}" tests="{totals["tests"]}" time="{suite_time:.3f}">')
+        for f in junit_files:
+            open_elems = []
+            for event, elem in ET.iterparse(str(f), events=('start', 'end')):
+                if event == 'start':
+                    open_elems.append(elem)
+                    continue
+                open_elems.pop()
+                if elem.tag != 'testcase':
+                    continue
+                fout.write(ET.tostring(elem, encoding='unicode'))
+                if open_elems:
+                    del open_elems[-1][:]
+                elem.clear()
+        fout.write('</testsuite></testsuites>')
+    return totals
+
+def _read_html_head(html_path: Path, chunk_size: int = REPORT_CHUNK):
+    """The part of a pytest-html report before its data blob (title, summary counts)."""
+    head = ''
+    with open(html_path, encoding='utf-8') as fh:
+        while True:
+            data = fh.read(chunk_size)
+            head += data
+            idx = head.find(_BLOB_PREFIX)
+            if idx != -1:
+                return head[:idx]
+            if not data:
+                return head
+
+_HTML_COUNT = re.compile(r'<span class="(\w+)">(\d+) ')
+
+def _format_report_duration(seconds: float):
+    # same format pytest-html uses for its run-count line
+    if seconds < 1:
+        return f"{round(seconds * 1000)} ms"
+    seconds = round(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+def merge_pytest_html(html_files, out_path: Path, duration: float):
+    """
+    Combine several pytest-html reports into one: the first report's page with
+    every report's tests in its blob and the summary counts added up. A test
+    found in several reports is one entry holding all of their results. Tests
+    of the other reports are spooled to disk first, so memory stays at the test
+    ids, the repeated tests' results and one test entry plus one chunk.
+    """
+    html_files = [f for f in html_files if f.exists()]
+    if not html_files:
+        return 0
+    counts = {}
+    for f in html_files:
+        for outcome, n in _HTML_COUNT.findall(_read_html_head(f)):
+            counts[outcome] = counts.get(outcome, 0) + int(n)
+    first_keys = set()
+    rewrite_pytest_html_tests(html_files[0], Path(os.devnull), lambda k: first_keys.add(k), lambda k, r: None)
+    # results of tests already met in an earlier report, added to that entry instead of repeating its key
+    repeated = {}
+    spool = out_path.with_name(out_path.name + '.spool')
+    with open(spool, 'w', encoding='utf-8') as fh:
+        spooled_keys = set()
+
+        def keep(test_key, results):
+            if test_key in first_keys or test_key in spooled_keys:
+                repeated.setdefault(test_key, []).extend(results)
+                return
+            spooled_keys.add(test_key)
+            fh.write(json.dumps([test_key, results]) + '\n')
+        for f in html_files[1:]:
+            rewrite_pytest_html_tests(f, Path(os.devnull), lambda k: True, keep)
+
+    def spooled():
+        with open(spool, encoding='utf-8') as fh:
+            for line in fh:
+                test_key, results = json.loads(line)
+                yield test_key, results + repeated.pop(test_key, [])
+
+    # pytest-html's run count leaves out skipped tests and reruns
+    total = sum(n for outcome, n in counts.items() if outcome not in ('skipped', 'rerun'))
+
+    def head(text):
+        text = _HTML_COUNT.sub(lambda m: f'<span class="{m.group(1)}">{counts.get(m.group(1), 0)} ', text)
+        text = re.sub(r'(data-test-result="(\w+)")( disabled)?',
+                      lambda m: m.group(1) + ('' if counts.get(m.group(2)) else ' disabled'), text)
+        return re.sub(r'<p class="run-count">.*?</p>',
+                      f'<p class="run-count">{total} {"test" if total == 1 else "tests"} took '
+                      f'{_format_report_duration(duration)}.</p>', text, count=1)
+
+    try:
+        rewrite_pytest_html_tests(html_files[0], out_path, repeated.__contains__,
+                                  lambda k, r: r + repeated.pop(k), head=head, extra_tests=spooled())
+    finally:
+        spool.unlink(missing_ok=True)
+    return total
+
+def find_shard_sessions():
+    """The newest session of every shard index of the most recent --shard split."""
+    shards = []
+    for f in paths.SESSION_DIR.glob('session_*.json'):
+        try:
+            state = json.loads(f.read_text())
+        except Exception:
+            continue
+        if state.get('shard'):
+            shards.append((f.stat().st_mtime, f, state['shard']))
+    if not shards:
+        return []
+    shards.sort(key=lambda t: t[0])
+    total = shards[-1][2]['total']
+    newest = {}
+    for mtime, f, shard in shards:
+        if shard['total'] == total:
+            newest[shard['index']] = f
+    missing = sorted(set(range(1, total + 1)) - set(newest))
+    if missing:
+        print(f'Missing shard(s) {missing} of {total}; merging the rest')
+    return [newest[i] for i in sorted(newest)]
+
+@click.command()
+@click.argument('sessions', nargs=-1, type=click.Path(exists=True, dir_okay=False, path_type=Path))
+def merge(sessions):
+    """Combine the shards of a --shard i/N split into one report, JUnit, chart and session.
+
+    With no SESSIONS, merges the newest session of each shard of the latest split.
+    """
+    ensure_dirs()
+    session_files = list(sessions) or find_shard_sessions()
+    if not session_files:
+        print('No shard sessions found to merge')
+        return
+    states = [json.loads(Path(f).read_text()) for f in session_files]
+    run_id = uuid.uuid4().hex[:8]
+    html = paths.REPORTS / f'report_merged_{run_id}.html'
+    junit = paths.REPORTS / f'report_merged_{run_id}.xml'
+    htmls = [paths.ROOT / st['reports']['html'] for st in states if st.get('reports')]
+    junits = [paths.ROOT / st['reports']['junit'] for st in states if st.get('reports')]
+    duration = max((st.get('duration', 0.0) for st in states), default=0.0)
+    print(f'Merging {len(states)} shard(s): {", ".join(Path(f).name for f in session_files)}')
+
+    merge_junit_files(junits, junit)
+    merge_pytest_html(htmls, html, duration)
+    stats = parse_junit(junit)
+    final = merge_junit_results(junit)
+    failed_nodeids = [n for st in states for n in st.get('failed_nodeids', [])]
+
+    # one manifest for the merged report's video links
+    manifest = paths.LOGS / f'artifacts_merged_{run_id}.jsonl'
+    with open(manifest, 'w', encoding='utf-8') as out:
+        for f in sorted(paths.LOGS.glob('artifacts_s*.jsonl')):
+            with open(f, encoding='utf-8') as fh:
+                shutil.copyfileobj(fh, out)
+    try:
+        inject_videos_into_pytest_html(html, collect_videos_map(manifest), failed_nodeids)
+    except Exception as e:
+        print('Failed to inject videos into pytest-html report:', e)
+    inject_traces_into_pytest_html(html, [f for st in states for f in (st.get('traces') or {}).get('failing', [])])
+    inject_visual_into_pytest_html(html, [f for st in states for f in (st.get('visual') or {}).get('failures', [])])
+
+    session_state = {
+        'run_id': run_id,
+        'merged_from': [st.get('run_id') for st in states],
+        'shards': [st.get('shard') for st in states],
+        'reports': {'html': _rel(html), 'junit': _rel(junit)},
+        'stats': stats,
+        'final': final,
+        'failed_nodeids': failed_nodeids,
+        'duration': duration,
+        'shard_durations': [st.get('duration', 0.0) for st in states],
+        'browser_pool': summarize_browser_pool(),
+        'auth_cache': summarize_auth_cache(),
+        'artifacts': summarize_artifacts(),
+        'artifact_store': summarize_store([st.get('run_id') for st in states]),
+        'env': {
+            'platform': platform.platform(),
+            'python': platform.python_version()
+        }
+    }
+    with open(paths.SESSION_DIR / f'session_{run_id}.json', 'w') as fh:
+        json.dump(session_state, fh, indent=2)
+    make_pie_chart(final, paths.REPORTS / f'chart_{run_id}.png', title=f'Merged run {run_id}')
+    print(f"Merged: {final['passed']} passed, {final['flaky']} flaky, {final['failed']} failed, "
+          f"{final['skipped']} skipped; slowest shard {duration:.1f}s")
+    print(f'Reports: {html}')
+    print(f'Junit: {junit}')
+    print(f'Chart: {paths.REPORTS / f"chart_{run_id}.png"}')
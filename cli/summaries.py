@@ -0,0 +1,527 @@
+"""
+The end-of-run summaries: each one reads the per-worker stats files the
+conftest fixtures wrote, prints its part of the console summary and returns
+what goes into the session file.
+"""
+import heapq
+import html as _html
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+from cli import paths
+from cli.paths import _rel
+from cli.results import NodeidIndex, _stored_path, load_artifact_manifest
+from cli.selection import lpt_partition
+
+def _worker_glob(name: str, ext: str = 'json'):
+    # a shard only sums its own workers' files; merge (no shard set) sums everyone's
+    from support.workers import shard_id
+    shard = shard_id()
+    return f'{name}_s{shard}-*.{ext}' if shard else f'{name}_*.{ext}'
+
+def load_worker_stats(name: str):
+    """Load every reports/<name>_<worker>.json written by the conftest fixtures."""
+    stats = []
+    for f in sorted(paths.REPORTS.glob(_worker_glob(name))):
+        try:
+            stats.append(json.loads(f.read_text()))
+        except Exception:
+            continue
+    return stats
+
+def _pool_baseline():
+    """(seconds, run id) a browser launch and close took per test in the newest --recycle-after 1 session."""
+    for f in sorted(paths.SESSION_DIR.glob('session_*.json'), key=lambda f: f.stat().st_mtime, reverse=True):
+        try:
+            pool = json.loads(f.read_text()).get('browser_pool') or {}
+        except Exception:
+            continue
+        if pool.get('launch_per_test') and pool.get('tests'):
+            return pool['avg_launch_close'], f.stem[len('session_'):]
+    return None, None
+
+def summarize_browser_pool():
+    workers = load_worker_stats('pool_stats')
+    if not workers:
+        return None
+    tests = sum(w.get('tests', 0) for w in workers)
+    launches = sum(w.get('launches', 0) for w in workers)
+    launch_time = sum(w.get('launch_time', 0.0) for w in workers)
+    close_time = sum(w.get('close_time', 0.0) for w in workers)
+    recycled = {}
+    for w in workers:
+        for k, v in w.get('recycled', {}).items():
+            recycled[k] = recycled.get(k, 0) + v
+    avg_cost = (launch_time + close_time) / launches if launches else 0.0
+    after = launch_time + close_time
+    # a --recycle-after 1 run launches a browser per test, the way tests ran before the pool:
+    # it is the measured baseline later runs are compared against
+    launch_per_test = {w.get('recycle_after') for w in workers} == {1}
+    baseline, baseline_run = _pool_baseline()
+    if launch_per_test or baseline is None:
+        # without a baseline run, assume a per-test launch costs what this run's launches cost
+        baseline, baseline_run = avg_cost, None
+    before = tests * baseline
+    summary = {
+        'workers': len(workers),
+        'tests': tests,
+        'launches': launches,
+        'recycled': recycled,
+        'max_rss_mb': max(w.get('max_rss_mb', 0.0) for w in workers),
+        'launch_per_test': launch_per_test,
+        'avg_launch_close': round(avg_cost, 3),
+        'browser_time_before': round(before, 2),
+        'before_source': 'this run' if launch_per_test else f'session {baseline_run}' if baseline_run else 'estimate',
+        'browser_time_after': round(after, 2),
+        'saved': round(before - after, 2),
+    }
+    print(f"Browser pool: {launches} launch(es) for {tests} tests on {len(workers)} worker(s) "
+          f"(recycled: {recycled.get('limit', 0)} limit, {recycled.get('crash', 0)} crash, {recycled.get('memory', 0)} memory)")
+    if launch_per_test:
+        print(f"  launch-per-test baseline: {after:.2f}s browser start/stop, avg {avg_cost:.2f}s per test "
+              f"(later runs compare against it)")
+    elif baseline_run:
+        print(f"  browser start/stop time: before {before:.2f}s (baseline run {baseline_run}, {baseline:.2f}s per test) "
+              f"-> after {after:.2f}s, saved {before - after:.2f}s")
+    else:
+        print(f"  browser start/stop time: before ~{before:.2f}s (estimate: this run's avg {avg_cost:.2f}s per launch "
+              f"x {tests} tests; run once with --recycle-after 1 to measure it) -> after {after:.2f}s, "
+              f"saved ~{before - after:.2f}s")
+    return summary
+
+def summarize_async_runner():
+    workers = load_worker_stats('async_stats')
+    if not workers:
+        return None
+    summary = {k: sum(w.get(k, 0) for w in workers) for k in ('runs', 'flows', 'failed', 'flow_time', 'wall_time')}
+    summary['peak_concurrency'] = max(w.get('peak_concurrency', 0) for w in workers)
+    overlap = summary['flow_time'] / summary['wall_time'] if summary['wall_time'] else 0.0
+    print(f"Async flows: {summary['flows']} in {summary['runs']} run(s), {summary['failed']} failed, "
+          f"peak {summary['peak_concurrency']} contexts per browser, {overlap:.1f}x flow time per wall second")
+    return summary
+
+def summarize_auth_cache():
+    workers = load_worker_stats('auth_stats')
+    if not workers:
+        return None
+    summary = {k: sum(w.get(k, 0) for w in workers) for k in ('hits', 'misses', 'invalidated')}
+    print(f"Auth cache: {summary['hits']} cached logins reused, {summary['misses']} UI logins, "
+          f"{summary['invalidated']} invalidated")
+    return summary
+
+def _fmt_bytes(n):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if abs(n) < 1024 or unit == 'GB':
+            return f"{n:.1f}{unit}" if unit != 'B' else f"{int(n)}B"
+        n /= 1024
+
+def summarize_artifacts():
+    """Estimate bytes and time saved by the artifact policies versus keeping everything."""
+    workers = load_worker_stats('artifact_stats')
+    if not workers:
+        return None
+    summary = {}
+    print('Artifacts (kept / discarded / not recorded, saved vs. keeping everything):')
+    for kind in ('video', 'tracing', 'screenshot'):
+        totals = {}
+        for w in workers:
+            for k, v in w.get(kind, {}).items():
+                totals[k] = totals.get(k, 0) + v
+        kept = totals.get('kept', 0)
+        avg_bytes = totals.get('kept_bytes', 0) / kept if kept else None
+        avg_time = totals.get('kept_time', 0.0) / kept if kept else None
+        # a discarded video was written and deleted; a discarded trace was never zipped
+        never_written = totals.get('skipped', 0) + (totals.get('discarded', 0) if kind != 'video' else 0)
+        saved_bytes = totals.get('discarded_bytes', 0)
+        if avg_bytes is not None:
+            saved_bytes += never_written * avg_bytes
+        saved_time = None
+        if avg_time is not None and kind != 'video':
+            saved_time = never_written * avg_time - totals.get('discard_time', 0.0)
+        summary[kind] = dict(totals, saved_bytes=int(saved_bytes),
+                             saved_time=round(saved_time, 2) if saved_time is not None else None)
+        time_txt = f"~{saved_time:.2f}s" if saved_time is not None else 'n/a'
+        print(f"  {kind:<10} {kept} / {totals.get('discarded', 0)} / {totals.get('skipped', 0)}"
+              f"  saved ~{_fmt_bytes(saved_bytes)}, {time_txt}")
+    return summary
+
+def summarize_pipeline():
+    """Queue depth and per-stage latency of the workers' background artifact post-processing."""
+    workers = load_worker_stats('pipeline_stats')
+    if not workers:
+        return None
+    summary = {k: sum(w.get(k, 0) for w in workers) for k in ('jobs', 'failed', 'blocked_time', 'wait_time', 'drain_time')}
+    summary['max_depth'] = max(w.get('max_depth', 0) for w in workers)
+    summary['max_wait'] = max(w.get('max_wait', 0.0) for w in workers)
+    stages = {}
+    for w in workers:
+        for name, st in w.get('stages', {}).items():
+            agg = stages.setdefault(name, {'count': 0, 'time': 0.0, 'max': 0.0})
+            agg['count'] += st['count']
+            agg['time'] += st['time']
+            agg['max'] = max(agg['max'], st['max'])
+    summary['stages'] = stages
+    if not summary['jobs']:
+        return summary
+    print(f"Artifact pipeline: {summary['jobs']} jobs, {summary['failed']} failed stages, max queue depth "
+          f"{summary['max_depth']}, queue wait avg {summary['wait_time'] / summary['jobs'] * 1000:.0f}ms "
+          f"(max {summary['max_wait'] * 1000:.0f}ms), tests blocked on a full queue {summary['blocked_time']:.2f}s, "
+          f"drain at session end {summary['drain_time']:.2f}s")
+    for name, st in stages.items():
+        print(f"  {name:<11} {st['count']:>6} x  avg {st['time'] / st['count'] * 1000:>7.1f}ms  "
+              f"max {st['max'] * 1000:>7.1f}ms  total {st['time']:.2f}s off the test thread")
+    return summary
+
+def summarize_store(run_ids, keep_runs: int = 10, quota_mb: int = 2048):
+    """Evict from the artifact store by run count and LRU byte quota; report what deduplication saved."""
+    from support.store import ArtifactStore
+    store = ArtifactStore(paths.STORE)
+    if not store.index.exists():
+        return None
+    summary = store.evict(keep_runs, quota_mb * 1024 * 1024, protect_runs=set(run_ids))
+    saved = summary['logical_bytes'] - summary['bytes']
+    print(f"Artifact store: {summary['blobs']} blobs, {_fmt_bytes(summary['bytes'])} on disk for "
+          f"{_fmt_bytes(summary['logical_bytes'])} of artifacts from {summary['runs']} runs (dedup saved "
+          f"{_fmt_bytes(saved)}); evicted {summary['evicted_blobs']} blobs ({_fmt_bytes(summary['evicted_bytes'])}), "
+          f"{summary['evicted_runs']} runs past --keep-runs, {summary['evicted_lru']} by LRU")
+    if summary['over_quota']:
+        print(f"  still over the {quota_mb} MB quota: this run's artifacts alone exceed it")
+    return summary
+
+def summarize_blocking():
+    """Requests and bytes the --block profile kept off the network, in total and per test."""
+    workers = load_worker_stats('block_stats')
+    if not workers:
+        return None
+    totals = {k: sum(w.get(k, 0) for w in workers) for k in ('requests', 'bytes', 'cached', 'aborted', 'stubbed')}
+    per_test = {}
+    for nodeid, records in load_artifact_manifest().items():
+        for rec in records:
+            blocked = rec.get('blocked')
+            if blocked:
+                t = per_test.setdefault(nodeid, {'requests': 0, 'bytes': 0})
+                t['requests'] += blocked.get('requests', 0)
+                t['bytes'] += blocked.get('bytes', 0)
+    print(f"Request blocking: {totals['requests']} requests avoided (~{_fmt_bytes(totals['bytes'])}): "
+          f"{totals['cached']} served from memory, {totals['aborted']} aborted, {totals['stubbed']} trackers stubbed")
+    for nodeid, t in sorted(per_test.items(), key=lambda kv: (-kv[1]['bytes'], -kv[1]['requests']))[:10]:
+        print(f"  {t['requests']:>5} req  {_fmt_bytes(t['bytes']):>9}  {nodeid}")
+    return dict(totals, tests=per_test)
+
+def summarize_schedule(stats, index: NodeidIndex, history: dict, workers: int, actual: float):
+    """Compare the LPT makespan predicted from history with the measured wall time."""
+    ran = {}
+    for t in stats.get('tests', []):
+        nodeid = t.get('nodeid') or index.resolve(t.get('classname'), t.get('name'))
+        if nodeid:
+            ran[nodeid] = history.get(nodeid)
+    if not ran:
+        return None
+    _, loads = lpt_partition(ran, workers)
+    predicted = max(loads)
+    busy = sum(t.get('time', 0.0) for t in stats.get('tests', []))
+    print(f"Schedule: predicted makespan {predicted:.1f}s on {workers} workers, actual wall {actual:.1f}s "
+          f"(test time {busy:.1f}s, ideal {busy / workers:.1f}s)")
+    return {'workers': workers, 'predicted': round(predicted, 2), 'actual': round(actual, 2),
+            'ideal': round(busy / workers, 2)}
+
+# absolute slack on top of the relative perf budget, so near-zero baselines don't fail on noise
+PERF_SLACK = {'cls': 0.02, 'heap_mb': 1.0, 'resources': 1, 'resource_bytes': 1024}
+PERF_SLACK_MS = 10.0
+
+def summarize_perf(base_url: str, budget: float, update_baseline: bool = False):
+    """
+    Fold the workers' perf samples into p50/p75/p95 per page and metric and
+    compare each p75 with the stored baseline for this site. Returns
+    (summary, list of budget violations).
+    """
+    from support.stats import percentile
+    workers = load_worker_stats('perf_stats')
+    if not workers:
+        return None, []
+    pages = {}
+    for w in workers:
+        for page, metrics in w.get('pages', {}).items():
+            for metric, values in metrics.items():
+                pages.setdefault(page, {}).setdefault(metric, []).extend(values)
+    summary = {}
+    for page, metrics in sorted(pages.items()):
+        summary[page] = {}
+        for metric, values in metrics.items():
+            values.sort()
+            summary[page][metric] = {'n': len(values), 'p50': percentile(values, 50),
+                                     'p75': percentile(values, 75), 'p95': percentile(values, 95)}
+
+    # keyed by host only: the local stand-in gets a new port every run
+    site = urlparse(base_url or 'https://www.saucedemo.com/').hostname
+    baseline_file = paths.SESSION_DIR / f'perf_baseline_{site}.json'
+    baseline = {}
+    if baseline_file.exists() and not update_baseline:
+        try:
+            baseline = json.loads(baseline_file.read_text())
+        except Exception as e:
+            print(f'Ignoring unreadable perf baseline {baseline_file}. Reason: {e}')
+
+    violations = []
+    print(f"Perf (p75 per page; budget +{budget:g}% over {baseline_file.name if baseline else 'no baseline yet'}):")
+    for page, metrics in summary.items():
+        cells = []
+        for metric, st in metrics.items():
+            base = baseline.get(page, {}).get(metric)
+            cells.append(f"{metric}={st['p75']:g}")
+            if base is None:
+                continue
+            limit = base * (1 + budget / 100.0) + PERF_SLACK.get(metric, PERF_SLACK_MS)
+            if st['p75'] > limit:
+                violations.append({'page': page, 'metric': metric, 'p75': st['p75'], 'baseline': base,
+                                   'limit': round(limit, 3)})
+        print(f"  {page:<20} " + ' '.join(cells))
+    for v in violations:
+        print(f"  OVER BUDGET: {v['page']} {v['metric']} p75 {v['p75']:g} > {v['limit']:g} (baseline {v['baseline']:g})")
+
+    if not baseline:
+        baseline_file.write_text(json.dumps(
+            {page: {m: st['p75'] for m, st in metrics.items()} for page, metrics in summary.items()}, indent=2))
+        print(f'  stored perf baseline {baseline_file}')
+    return summary, violations
+
+def summarize_visual(base_url: str, run_id: str, tolerance: float, update_baseline: bool = False, exact: bool = False):
+    """
+    Compare the latest teardown screenshot of every test with the stored visual
+    baseline for this site; store baselines for new tests (or all, when updating).
+    Returns (summary, list of failed comparisons).
+    """
+    try:
+        from support.visual import baseline_key, compare_all
+    except ImportError:
+        print('numpy/Pillow not installed; skipping visual comparison')
+        return None, []
+    latest = {}
+    for nodeid, records in load_artifact_manifest().items():
+        rec = next((r for r in reversed(records) if r.get('screenshot')), None)
+        if rec is not None:
+            local = nodeid.split('::', 1)[1] if '::' in nodeid else nodeid
+            latest[f"{rec['file']}::{local}" if rec.get('file') else nodeid] = (nodeid, rec)
+    if not latest:
+        return None, []
+
+    # keyed by host only, like the perf baseline
+    site = urlparse(base_url or 'https://www.saucedemo.com/').hostname
+    baseline_dir = paths.SESSION_DIR / f'visual_baseline_{site}'
+    index_file = baseline_dir / 'index.json'
+    index = {}
+    if index_file.exists() and not update_baseline:
+        try:
+            index = json.loads(index_file.read_text())
+        except Exception as e:
+            print(f'Ignoring unreadable visual baseline index {index_file}. Reason: {e}')
+    jobs = []
+    for key, (nodeid, rec) in sorted(latest.items()):
+        name = baseline_key(key)
+        jobs.append({'nodeid': nodeid, 'key': key, 'file': rec.get('file'),
+                     'current': str(_stored_path(rec['screenshot'], (rec.get('hashes') or {}).get('screenshot'))),
+                     'baseline': str(baseline_dir / f'{name}.png'), 'meta': index.get(key),
+                     'diff': str(paths.REPORTS / 'visual' / f'{name}_diff.png'), 'masks': rec.get('mask') or [],
+                     'tolerance': tolerance, 'exact': exact})
+    started = time.perf_counter()
+    results = compare_all(jobs)
+    elapsed = time.perf_counter() - started
+
+    counts = {}
+    failures = []
+    for job, res in zip(jobs, results):
+        counts[res['status']] = counts.get(res['status'], 0) + 1
+        if res.get('by_hash'):
+            counts['by_hash'] = counts.get('by_hash', 0) + 1
+        if res['status'] == 'new':
+            baseline_dir.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(job['current'], job['baseline'])
+            index[job['key']] = {'digest': res['digest'], 'pixels_digest': res['pixels_digest'], 'phash': res['phash'],
+                                 'size': res['size'], 'run_id': run_id}
+        elif res['status'] in ('failed', 'error'):
+            failures.append({'nodeid': job['nodeid'], 'file': job['file'], 'status': res['status'],
+                             'ratio': res.get('ratio'), 'reason': res.get('reason', ''),
+                             'current': _rel(job['current']), 'baseline': _rel(job['baseline']),
+                             'diff': _rel(res['diff']) if res.get('diff') else None})
+    if counts.get('new'):
+        tmp = index_file.with_name(index_file.name + '.tmp')
+        tmp.write_text(json.dumps(index, indent=2))
+        os.replace(tmp, index_file)
+
+    summary = {'screenshots': len(jobs), 'time': round(elapsed, 3), 'tolerance': tolerance,
+               'baseline': _rel(baseline_dir), **counts}
+    print(f"Visual: {len(jobs)} screenshots compared in {elapsed:.2f}s against {baseline_dir.name} -- "
+          f"{counts.get('identical', 0)} identical, {counts.get('unchanged', 0)} unchanged "
+          f"({counts.get('by_hash', 0)} by perceptual hash), "
+          f"{counts.get('passed', 0)} within {tolerance:g}%, {counts.get('failed', 0)} changed, "
+          f"{counts.get('new', 0)} new baselines" + (f", {counts['error']} unreadable" if counts.get('error') else ''))
+    for f in failures:
+        print(f"  CHANGED: {f['nodeid']}: {f['reason']}" + (f" -> {f['diff']}" if f['diff'] else ''))
+    return summary, failures
+
+# upper bounds (ms) of the per-method histogram buckets
+TIMING_BUCKETS = [10, 50, 100, 250, 500, 1000, 2500, 5000, float('inf')]
+
+def summarize_timing(out_path: Path, top: int = 15, timelines: int = 30):
+    """
+    Aggregate the per-worker --timing event files: slowest actions, per-method
+    histograms and a timeline of the slowest tests, written as one HTML page.
+    """
+    from support.stats import percentile
+    from support.timing import KIND_NAMES, KIND_TEST, read_events
+    files = sorted(paths.REPORTS.glob(_worker_glob('timing', 'jsonl')))
+    if not files:
+        return None
+    methods = {}
+    slowest = []
+    tests = []
+    # pass 1: everything except the timelines, which are only kept for the slowest tests
+    for f in files:
+        worker = f.stem.split('_', 1)[1]
+        for nodeid, name, kind, start, dur, depth in read_events(f):
+            if kind == KIND_TEST:
+                tests.append((dur, nodeid, worker))
+                continue
+            methods.setdefault((KIND_NAMES.get(kind, kind), name), []).append(dur)
+            item = (dur, name, nodeid, worker)
+            if len(slowest) < top:
+                heapq.heappush(slowest, item)
+            elif item > slowest[0]:
+                heapq.heapreplace(slowest, item)
+    wanted = {(nodeid, worker) for _, nodeid, worker in heapq.nlargest(timelines, tests)}
+    spans = {(nodeid, worker): [] for nodeid, worker in wanted}
+    for f in files:
+        worker = f.stem.split('_', 1)[1]
+        for nodeid, name, kind, start, dur, depth in read_events(f):
+            if (nodeid, worker) in spans:
+                spans[(nodeid, worker)].append((start, dur, depth, KIND_NAMES.get(kind, kind), name))
+
+    summary = {'tests': len(tests), 'methods': {}}
+    for (kind, name), durs in methods.items():
+        durs.sort()
+        hist = [0] * len(TIMING_BUCKETS)
+        for d in durs:
+            hist[next(i for i, b in enumerate(TIMING_BUCKETS) if d / 1000 < b)] += 1
+        summary['methods'][name] = {'kind': kind, 'count': len(durs), 'total_ms': round(sum(durs) / 1000, 1),
+                                    'p50_ms': round(percentile(durs, 50) / 1000, 1),
+                                    'p95_ms': round(percentile(durs, 95) / 1000, 1),
+                                    'max_ms': round(durs[-1] / 1000, 1), 'histogram': hist}
+    summary['slowest'] = [{'ms': round(d / 1000, 1), 'action': name, 'nodeid': nodeid, 'worker': worker}
+                          for d, name, nodeid, worker in sorted(slowest, reverse=True)]
+    write_timing_report(out_path, summary, spans)
+    print(f"Timing: {sum(m['count'] for m in summary['methods'].values())} actions in {len(tests)} tests; slowest:")
+    for s in summary['slowest'][:5]:
+        print(f"  {s['ms']:>9.1f}ms  {s['action']}  ({s['nodeid']})")
+    print(f"  details: {out_path}")
+    return summary
+
+def write_timing_report(out_path: Path, summary: dict, spans: dict):
+    esc = _html.escape
+    parts = ['<!DOCTYPE html><html><head><meta charset="utf-8"><title>Action timing</title><style>',
+             'body{font-family:sans-serif;font-size:13px;margin:20px}table{border-collapse:collapse;margin-bottom:24px}',
+             'td,th{border:1px solid #ddd;padding:3px 8px;text-align:right}td.l,th.l{text-align:left}',
+             '.bar{display:inline-block;height:10px;background:#3498db;vertical-align:middle}',
+             '.tl{position:relative;height:16px;background:#f4f4f4;margin:2px 0 0}',
+             '.tl span{position:absolute;top:0;height:16px;opacity:.85;overflow:hidden;white-space:nowrap;font-size:10px;color:#fff}',
+             '.page{background:#2c3e50}.playwright{background:#e67e22}</style></head><body>',
+             '<h2>Slowest actions</h2><table><tr><th>ms</th><th class="l">action</th><th class="l">test</th><th class="l">worker</th></tr>']
+    for s in summary['slowest']:
+        parts.append(f"<tr><td>{s['ms']:.1f}</td><td class=\"l\">{esc(s['action'])}</td>"
+                     f"<td class=\"l\">{esc(s['nodeid'] or '')}</td><td class=\"l\">{esc(s['worker'])}</td></tr>")
+    parts.append('</table><h2>Per-method histograms</h2><table><tr><th class="l">method</th><th>calls</th>'
+                 '<th>total ms</th><th>p50</th><th>p95</th><th>max</th>')
+    parts += [f"<th>&lt;{b}ms</th>" if b != float('inf') else '<th>slower</th>' for b in TIMING_BUCKETS]
+    parts.append('</tr>')
+    for name, m in sorted(summary['methods'].items(), key=lambda kv: -kv[1]['total_ms']):
+        peak = max(m['histogram']) or 1
+        cells = ''.join(f'<td><span class="bar" style="width:{40 * c // peak}px"></span> {c}</td>' for c in m['histogram'])
+        parts.append(f"<tr><td class=\"l\">{esc(name)} <small>({m['kind']})</small></td><td>{m['count']}</td>"
+                     f"<td>{m['total_ms']:.1f}</td><td>{m['p50_ms']:.1f}</td><td>{m['p95_ms']:.1f}</td>"
+                     f"<td>{m['max_ms']:.1f}</td>{cells}</tr>")
+    parts.append('</table><h2>Timelines of the slowest tests</h2>')
+    for (nodeid, worker), events in sorted(spans.items(), key=lambda kv: -max((e[1] for e in kv[1]), default=0)):
+        test = next((e for e in events if e[3] == 'test'), None)
+        if test is None:
+            continue
+        t0, total = test[0], test[1] or 1
+        parts.append(f"<h4>{esc(nodeid or '')} <small>[{esc(worker)}] {total / 1000:.1f}ms</small></h4>")
+        rows = {}
+        for start, dur, depth, kind, name in events:
+            if kind != 'test':
+                rows.setdefault(depth, []).append((start, dur, kind, name))
+        for depth in sorted(rows):
+            parts.append('<div class="tl">')
+            for start, dur, kind, name in rows[depth]:
+                left = 100.0 * (start - t0) / total
+                width = max(100.0 * dur / total, 0.2)
+                parts.append(f'<span class="{kind}" style="left:{left:.2f}%;width:{width:.2f}%" '
+                             f'title="{esc(name)} {dur / 1000:.1f}ms">{esc(name)}</span>')
+            parts.append('</div>')
+    parts.append('</body></html>')
+    out_path.write_text(''.join(parts), encoding='utf-8')
+
+def summarize_traces(out_path: Path, run_id: str, top: int = 10):
+    """
+    Index every trace the run kept into reports/traces_<run_id>.json (actions,
+    selectors and durations per test) and print the slowest selectors and waits
+    and the trace of each failing test.
+    """
+    from support.traces import index_traces, slowest_selectors, slowest_waits
+    latest = {}
+    for nodeid, records in load_artifact_manifest().items():
+        for rec in records:
+            if rec.get('trace'):
+                latest[(nodeid, rec.get('attempt', 0))] = rec
+    if not latest:
+        return None
+    started = time.perf_counter()
+    paths = {key: _stored_path(rec['trace'], (rec.get('hashes') or {}).get('trace')) for key, rec in latest.items()}
+    indexed = index_traces(paths.items())
+    entries = []
+    for key, rec in latest.items():
+        actions, error = indexed[key]
+        entries.append({'nodeid': key[0], 'file': rec.get('file'), 'attempt': key[1], 'outcome': rec.get('outcome'),
+                        'trace': _rel(paths[key]), 'actions': actions, 'error': error})
+    elapsed = time.perf_counter() - started
+    tmp = out_path.with_name(out_path.name + '.tmp')
+    tmp.write_text(json.dumps({'run_id': run_id, 'traces': entries}, separators=(',', ':')), encoding='utf-8')
+    os.replace(tmp, out_path)
+
+    # a test's last attempt decides whether it failed
+    last = {}
+    for e in entries:
+        if e['attempt'] >= last.get(e['nodeid'], {'attempt': -1})['attempt']:
+            last[e['nodeid']] = e
+    failing = []
+    for e in last.values():
+        if e['outcome'] != 'failed':
+            continue
+        action = next((a for a in e['actions'] if a[3]), None)
+        failing.append({'nodeid': e['nodeid'], 'file': e['file'], 'trace': e['trace'],
+                        'action': action[0] if action else None, 'selector': action[1] if action else None,
+                        'error': action[3] if action else e['error']})
+    summary = {'traces': len(entries), 'actions': sum(len(e['actions']) for e in entries),
+               'unreadable': sum(1 for e in entries if e['error']), 'index_time': round(elapsed, 3),
+               'index': _rel(out_path), 'slowest_selectors': slowest_selectors(entries, top),
+               'slowest_waits': slowest_waits(entries, top), 'failing': failing}
+    print(f"Traces: {summary['actions']} actions from {summary['traces']} traces indexed in {elapsed:.2f}s"
+          + (f" ({summary['unreadable']} unreadable)" if summary['unreadable'] else ''))
+    if summary['slowest_selectors']:
+        print('  slowest selectors:')
+    for sel in summary['slowest_selectors'][:5]:
+        print(f"    {sel['total_ms'] / 1000:>8.1f}s in {sel['count']} calls (max {sel['max_ms']:.1f}ms)  {sel['selector']}")
+    if summary['slowest_waits']:
+        print('  slowest waits:')
+    for w in summary['slowest_waits'][:5]:
+        print(f"    {w['ms']:>9.1f}ms  {w['action']} {w['selector']}  ({w['nodeid']})")
+    for f in failing[:top]:
+        where = f" at {f['action']} {f['selector'] or ''}".rstrip() if f['action'] else ''
+        print(f"  failed: {f['nodeid']}{where} -> {f['trace']}")
+    if len(failing) > top:
+        print(f"  ... and {len(failing) - top} more failed tests with traces (see the index)")
+    print(f"  index: {out_path}")
+    return summary
@@ -1,343 +1,270 @@
 #!/usr/bin/env python3
 """
 Custom test runner for the Sauce Playwright POM project.
+
+This is the run command; the rest of the CLI lives in cli/ by feature:
+selection (--changed, risk order, LPT), sharding (--shard and `merge`),
+summaries and reporting (the end-of-run output), execute (pytest and the
+live dashboard), daemon (`daemon`, `watch`) and load (`load`).
 """
-import click
-import subprocess
-import uuid
-from pathlib import Path
-import shutil
 import json
-import xml.etree.ElementTree as ET
-import platform
-import time
 import os
-import html as _html
-
-ROOT = Path(__file__).parent
-REPORTS = ROOT / "reports"
-LOGS = ROOT / "logs"
-VIDEOS = ROOT / "videos"
-SCREENSHOTS = ROOT / "screenshots"
-SESSION_DIR = ROOT / "session"
-
-def ensure_dirs():
-    for d in (REPORTS, LOGS, VIDEOS, SCREENSHOTS, SESSION_DIR):
-        d.mkdir(parents=True, exist_ok=True)
-
-def clear_previous():
-    for d in (REPORTS, LOGS, VIDEOS, SCREENSHOTS):
-        if d.exists():
-            for child in d.iterdir():
-                try:
-                    if child.is_file() or child.is_symlink():
-                        child.unlink()
-                    elif child.is_dir():
-                        shutil.rmtree(child)
-                except Exception:
-                    pass
-
-def discover_tests(path: Path, pattern: str = "test_*.py"):
-    return [p for p in path.rglob(pattern) if p.is_file()]
-
-def run_pytest(test_args, html_path: Path, junit_path: Path, parallel: int = 0):
-    cmd = ["pytest"] + test_args + [f"--html={html_path}", f"--self-contained-html", f"--junitxml={junit_path}"]
-    if parallel and parallel > 0:
-        cmd = ["pytest", f"-n", str(parallel)] + test_args + [f"--html={html_path}", f"--self-contained-html", f"--junitxml={junit_path}"]
-    print("Running:", " ".join(cmd))
-    start = time.time()
-    res = subprocess.run(cmd)
-    duration = time.time() - start
-    return res.returncode, duration
-
-def parse_junit(junit_file: Path):
-    if not junit_file.exists():
-        return {"passed": 0, "failed": 0, "skipped": 0, "tests": [], "duration": 0.0}
-    tree = ET.parse(str(junit_file))
-    root = tree.getroot()
-    passed = failed = skipped = 0
-    tests = []
-    total_time = 0.0
-    for testcase in root.iter('testcase'):
-        t = {
-            'classname': testcase.attrib.get('classname'),
-            'name': testcase.attrib.get('name'),
-            'time': float(testcase.attrib.get('time', '0')),
-            'file': None,
-            'status': 'passed'
-        }
-        total_time += t['time']
-        if testcase.find('failure') is not None or testcase.find('error') is not None:
-            t['status'] = 'failed'
-            failed += 1
-        elif testcase.find('skipped') is not None:
-            t['status'] = 'skipped'
-            skipped += 1
-        else:
-            passed += 1
-        tests.append(t)
-    return {"passed": passed, "failed": failed, "skipped": skipped, "tests": tests, "duration": total_time}
-
-def failed_nodeids_from_junit(junit_file: Path):
-    parsed = parse_junit(junit_file)
-    nodeids = []
-    for t in parsed['tests']:
-        if t['status'] == 'failed':
-            cls = t.get('classname')
-            name = t.get('name')
-            candidate_paths = []
-            if cls:
-                candidate_paths.append(Path(cls.replace('.', '/') + '.py'))
-            if cls and '.' in cls:
-                candidate_paths.append(Path(cls.split('.')[-1] + '.py'))
-            for p in (REPORTS.parent).rglob('**/*.py'):
-                try:
-                    text = p.read_text(encoding='utf-8')
-                except Exception:
-                    continue
-                if f'def {name}(' in text or name in text:
-                    candidate_paths.append(p.relative_to(REPORTS.parent))
-            picked = None
-            for c in candidate_paths:
-                c_path = (REPORTS.parent / c) if not c.is_absolute() else c
-                if c_path.exists():
-                    picked = c_path
-                    break
-            if picked is None:
-                if cls:
-                    picked = REPORTS.parent / (cls.replace('.', '/') + '.py')
-                else:
-                    continue
-            nodeids.append(f"{picked}::{name}")
-    return nodeids
+import platform
+import re
+import sys
+import uuid
+from pathlib import Path
 
-def collect_videos_map(videos_root: Path):
-    mapping = {}
-    if not videos_root.exists():
-        return mapping
-    for folder in videos_root.iterdir():
-        if not folder.is_dir():
-            continue
-        meta_f = folder / 'metadata.json'
-        target_folder = folder
-        if not meta_f.exists():
-            for sub in folder.iterdir():
-                if sub.is_dir():
-                    m = sub / 'metadata.json'
-                    if m.exists():
-                        meta_f = m
-                        target_folder = sub
-                        break
-        try:
-            data = json.loads(meta_f.read_text()) if meta_f.exists() else None
-        except Exception:
-            data = None
-        nodeid = data.get('nodeid') if data else None
-        if nodeid:
-            vids = [str(p) for p in target_folder.rglob('*') if p.is_file() and p.name != 'metadata.json']
-            mapping[nodeid] = vids
-            try:
-                if nodeid.startswith(str(ROOT)):
-                    rel = nodeid[len(str(ROOT)) + 1:]
-                    mapping.setdefault(rel, vids)
-            except Exception:
-                pass
-            try:
-                abs_node = str((REPORTS.parent / nodeid))
-                mapping.setdefault(abs_node, vids)
-            except Exception:
-                pass
-    return mapping
+import click
 
-# --- UPDATED INJECTION LOGIC ---
-def inject_videos_into_pytest_html(html_path: Path, videos_map: dict, failed_nodeids: list):
-    if not html_path.exists():
+from cli import options, paths
+from cli.daemon import daemon, watch
+from cli.execute import dashboard, run_pytest_live, start_stand_in
+from cli.load import load
+from cli.paths import _rel, clear_previous, discover_tests, ensure_dirs
+from cli.reporting import (inject_traces_into_pytest_html, inject_videos_into_pytest_html,
+                           inject_visual_into_pytest_html, make_pie_chart)
+from cli.results import (NodeidIndex, collect_videos_map, failed_nodeids_from_junit, merge_junit_results, nodeid_arg,
+                         parse_junit)
+from cli.selection import changed_files, failure_risk, load_duration_history, select_changed
+from cli.sharding import merge, shard_partition, shard_units
+from cli.summaries import (summarize_artifacts, summarize_async_runner, summarize_auth_cache, summarize_blocking,
+                           summarize_browser_pool, summarize_perf, summarize_pipeline, summarize_schedule,
+                           summarize_store, summarize_timing, summarize_traces, summarize_visual)
+
+def parse_shard(shard: str):
+    m = re.fullmatch(r'(\d+)/(\d+)', shard)
+    if not m or not 1 <= int(m.group(1)) <= int(m.group(2)):
+        raise click.BadParameter('expected i/N with 1 <= i <= N', param_hint='--shard')
+    return int(m.group(1)), int(m.group(2))
+
+def pytest_options(run_id, execution, browser, site, artifacts, report, perf):
+    """The options the run passes to pytest for the conftest's fixtures and plugins."""
+    opts = [f"--browser-recycle-after={browser.recycle_after}", f"--browser-max-rss-mb={browser.max_browser_rss}",
+            f"--async-concurrency={browser.async_concurrency}",
+            f"--video-policy={artifacts.video}", f"--tracing-policy={artifacts.tracing}",
+            f"--screenshot-policy={artifacts.screenshot}", f"--artifact-workers={artifacts.artifact_workers}"]
+    if artifacts.use_store:
+        opts += [f"--artifact-store={paths.STORE}", f"--run-id={run_id}"]
+    if site.base_url:
+        opts.append(f"--base-url={site.base_url}")
+    if report.timing:
+        opts.append("--timing")
+    if perf.enabled:
+        opts.append("--perf-metrics")
+    if site.block_profile != 'off':
+        opts.append(f"--block-profile={site.block_profile}")
+    if execution.retries > 0:
+        opts += [f"--retry-failed={execution.retries}", f"--retry-backoff={execution.retry_backoff}"]
+    if site.har_mode != 'off':
+        opts += [f"--har-mode={site.har_mode}", f"--har-dir={site.har_dir}"]
+    if execution.max_failures > 0:
+        opts.append(f"--maxfail={execution.max_failures}")
+    if browser.use_daemon:
+        from support.daemon import read_state
+        daemon_state = read_state(paths.DAEMON_STATE)
+        if daemon_state:
+            opts.append(f"--browser-endpoint={daemon_state['endpoint']}")
+            print(f"Using warm browser at {daemon_state['endpoint']}")
+    return opts
+
+def resume_last_session(run_id, pytest_opts, execution, artifacts, report):
+    """Rerun the failed and unrun tests of the newest session."""
+    last = sorted(paths.SESSION_DIR.glob('session_*.json'), key=lambda f: f.stat().st_mtime)
+    if not last:
+        print('No previous session found to resume')
         return
-
-    print("Injecting videos into report...")
-    text = html_path.read_text(encoding='utf-8')
-    
-    prefix = 'data-jsonblob="'
-    start_idx = text.find(prefix)
-    if start_idx == -1: return
-    
-    start_content = start_idx + len(prefix)
-    end_idx = text.find('">', start_content)
-    if end_idx == -1: return
-
-    blob_raw = text[start_content:end_idx]
-    try:
-        blob_json = _html.unescape(blob_raw)
-        data = json.loads(blob_json)
-    except Exception as e:
-        print(f"Error parsing report JSON: {e}")
+    session_file = last[-1]
+    with open(session_file) as fh:
+        state = json.load(fh)
+    # failures first, then whatever --max-failures kept from running
+    nodeids = state.get('failed_nodeids', []) + state.get('not_run', [])
+    if not nodeids:
+        print('No failed tests in last session')
         return
-
-    injected_count = 0
-    
-    def find_videos(test_key):
-        if test_key in videos_map: return videos_map[test_key]
-        suffix = test_key.split('/')[-1]
-        for k, v in videos_map.items():
-            if k.endswith(suffix):
-                return v
-        return []
-
-    tests_dict = data.get('tests', {})
-    
-    for test_key, results_list in tests_dict.items():
-        target_result = None
-        for res in results_list:
-            if res.get('result', '').lower() == 'failed':
-                target_result = res
-                break
-        
-        if not target_result: continue 
-
-        vids = find_videos(test_key)
-        if not vids: continue
-
-        rel_paths = []
-        for v_path in vids:
-            try:
-                rel = os.path.relpath(v_path, REPORTS)
-                rel_paths.append(rel)
-            except ValueError:
-                rel_paths.append(v_path)
-
-        # 1. Inject "Badge" Link into Table
-        if 'resultsTableRow' in target_result:
-            row_html = target_result['resultsTableRow']
-            link_idx = -1
-            for i, cell in enumerate(row_html):
-                if 'col-links' in cell:
-                    link_idx = i
-                    break
-            
-            if link_idx != -1:
-                links_html = ""
-                for i, r_path in enumerate(rel_paths):
-                    label = "Video" if len(rel_paths) == 1 else f"Video {i+1}"
-                    # Badge Style: Red background, white text, rounded corners
-                    style = (
-                        "background-color: #d9534f; color: white; padding: 2px 6px; "
-                        "border-radius: 4px; text-decoration: none; font-size: 11px; "
-                        "margin-right: 4px; display: inline-block;"
-                    )
-                    links_html += f'<a href="{r_path}" target="_blank" style="{style}">{label}</a>'
-                
-                old_cell = row_html[link_idx]
-                if '</td>' in old_cell:
-                    new_cell = old_cell.replace('</td>', f'{links_html}</td>')
-                    row_html[link_idx] = new_cell
-
-        # 2. Inject Compact Player
-        video_html_list = []
-        for r_path in rel_paths:
-            html = (
-                f'<div class="media" style="float: left; margin: 10px 0; clear: both;">'
-                f'<div style="margin-bottom: 4px; font-weight: bold; font-size: 12px; color: #555;">Video Evidence:</div>'
-                # UPDATED: Fixed width 480px for better fit
-                f'<video controls style="width: 480px; max-width: 100%; border: 1px solid #ccc; border-radius: 4px; box-shadow: 0 1px 3px rgba(0,0,0,0.1); background: #000;">'
-                f'<source src="{r_path}" type="video/webm">'
-                f'Your browser does not support the video tag.'
-                f'</video>'
-                f'</div>'
-            )
-            video_html_list.append(html)
-
-        target_result.setdefault('tableHtml', [])
-        target_result['tableHtml'].extend(video_html_list)
-        injected_count += 1
-
-    if injected_count > 0:
-        new_json_str = json.dumps(data)
-        new_blob = _html.escape(new_json_str, quote=True)
-        new_text = text[:start_content] + new_blob + text[end_idx:]
-        html_path.write_text(new_text, encoding='utf-8')
-        print(f"Successfully injected videos for {injected_count} failed tests.")
-
-def make_pie_chart(stats, outpath: Path, title: str = "Test Results"):
-    try:
-        import matplotlib.pyplot as plt
-    except Exception:
-        print('matplotlib not installed; skipping pie chart generation')
+    print(f'Rerunning {len(state.get("failed_nodeids", []))} failed and {len(state.get("not_run", []))} '
+          f'unrun tests from {session_file}')
+    if artifacts.use_store:
+        from support.store import ArtifactStore
+        store = ArtifactStore(paths.STORE)
+        for nodeid in state.get('failed_nodeids', []):
+            path, _, rest = nodeid.partition('::')
+            latest = {}
+            for rec, blob in store.find(f"{_rel(path)}::{rest}"):
+                latest.setdefault(rec['kind'], blob)
+            if latest:
+                print(f"  last artifacts of {_rel(path)}::{rest}: "
+                      + ', '.join(f'{kind} {_rel(blob)}' for kind, blob in latest.items()))
+    html = paths.REPORTS / f'rerun_{session_file.stem}.html'
+    junit = paths.REPORTS / f'rerun_{session_file.stem}.xml'
+    rc, duration, feed = run_pytest_live(nodeids, html, junit, run_id, execution.parallel,
+                                         pytest_opts + ["--run-attempt=1"],
+                                         self_contained=report.media == 'inline', console=report.live)
+    stats = feed.stats() if feed.finished_at else parse_junit(junit)
+    make_pie_chart(stats, paths.REPORTS / f'chart_{run_id}.png', title=f'Retry {session_file.stem}')
+    print('Rerun complete. See reports.')
+
+@click.group(cls=options.FeatureGroup, invoke_without_command=True)
+@click.pass_context
+@options.selection
+@options.execution
+@options.sharding
+@options.browser
+@options.site
+@options.artifacts
+@options.report
+@options.perf
+@options.visual
+def main(ctx, selection, execution, sharding, browser, site, artifacts, report, perf, visual):
+    if ctx.invoked_subcommand is not None:
         return
-    labels = ['passed', 'failed', 'skipped']
-    sizes = [stats.get('passed', 0), stats.get('failed', 0), stats.get('skipped', 0)]
-    colors = ['#2ecc71', '#e74c3c', '#f1c40f']
-    plt.figure(figsize=(6, 6))
-    plt.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=140, colors=colors)
-    plt.title(title)
-    plt.savefig(outpath)
-    plt.close()
-
-@click.command()
-@click.option('--path', '-p', default='.', help='Path to tests (file or folder)')
-@click.option('--pattern', default='test_*.py', help='Filename pattern for discovery')
-@click.option('--parallel', '-n', default=0, type=int, help='Number of parallel workers (pytest-xdist)')
-@click.option('--retries', '-r', default=0, type=int, help='Number of retries for failed tests')
-@click.option('--clear/--no-clear', default=True, help='Clear previous reports, logs, videos and screenshots')
-@click.option('--resume', is_flag=True, default=False, help='Resume from last session (retry failed tests)')
-@click.option('--markers', default=None, help='Pytest markers to pass as -m')
-@click.option('--kexpr', default=None, help='Pytest -k expression')
-def main(path, pattern, parallel, retries, clear, resume, markers, kexpr):
+    shard_index = shard_total = None
+    if sharding.shard:
+        shard_index, shard_total = parse_shard(sharding.shard)
+        # tags this shard's worker stats and artifact manifest, here and in the pytest it starts
+        os.environ['SAUCE_SHARD'] = f'{shard_index}of{shard_total}'
     ensure_dirs()
-    if clear:
+    # shards may share a checkout, so they never clear each other's output
+    if report.clear and not sharding.shard:
         clear_previous()
 
     run_id = uuid.uuid4().hex[:8]
-    session_file = SESSION_DIR / f'session_{run_id}.json'
-
-    base_path = Path(path)
-    if resume:
-        last = sorted(SESSION_DIR.glob('session_*.json'))
-        if not last:
-            print('No previous session found to resume')
-            return
-        session_file = last[-1]
-        with open(session_file) as fh:
-            state = json.load(fh)
-        nodeids = state.get('failed_nodeids', [])
-        if not nodeids:
-            print('No failed tests in last session')
-            return
-        print(f'Rerunning {len(nodeids)} failed tests from {session_file}')
-        html = REPORTS / f'rerun_{session_file.stem}.html'
-        junit = REPORTS / f'rerun_{session_file.stem}.xml'
-        rc, duration = run_pytest(nodeids, html, junit, parallel)
-        stats = parse_junit(junit)
-        make_pie_chart(stats, REPORTS / f'chart_{run_id}.png', title=f'Retry {session_file.stem}')
-        print('Rerun complete. See reports.')
+    session_file = paths.SESSION_DIR / f'session_{run_id}.json'
+
+    visual.enabled = visual.enabled or visual.update_baseline
+    if visual.enabled and artifacts.screenshot != 'on':
+        print(f'--visual needs a screenshot of every test; screenshot policy {artifacts.screenshot} -> on')
+        artifacts.screenshot = 'on'
+    if site.target == 'local' and not site.base_url:
+        site.base_url = start_stand_in()
+    pytest_opts = pytest_options(run_id, execution, browser, site, artifacts, report, perf)
+
+    if selection.resume:
+        resume_last_session(run_id, pytest_opts, execution, artifacts, report)
         return
 
+    base_path = Path(selection.path)
     if base_path.is_file():
         test_paths = [base_path]
     else:
-        test_paths = discover_tests(base_path, pattern)
+        test_paths = discover_tests(base_path, selection.pattern)
 
     if not test_paths:
         print('No tests found')
         return
 
-    test_args = [str(p) for p in test_paths]
-    if markers:
-        test_args += ["-m", markers]
-    if kexpr:
-        test_args += ["-k", kexpr]
-
-    html = REPORTS / f'report_{run_id}.html'
-    junit = REPORTS / f'report_{run_id}.xml'
-    rc, duration = run_pytest(test_args, html, junit, parallel)
-    stats = parse_junit(junit)
+    if selection.changed:
+        from support.impact import ImportGraph
+        graph = ImportGraph(paths.TESTS, paths.SESSION_DIR / 'import_graph.json').build()
+        edits = changed_files(selection.changed)
+        selected, reason = select_changed(test_paths, edits, graph)
+        if reason:
+            print(f'Changed: {reason}; running all {len(test_paths)} test files')
+        else:
+            print(f'Changed: {len(edits)} files affect {len(selected)} of {len(test_paths)} test files '
+                  f'(import graph: {graph.stats["parsed"]} of {graph.stats["files"]} files re-parsed)')
+        if not selected:
+            print('No tests affected by the changes')
+            return
+        test_paths = selected
 
-    failed_nodeids = failed_nodeids_from_junit(junit)
+    nodeid_index = NodeidIndex().refresh()
+    test_args = [str(p) for p in test_paths]
+    if sharding.shard:
+        if sharding.durations_file:
+            shard_history = json.loads(Path(sharding.durations_file).read_text())
+        else:
+            shard_history = load_duration_history(nodeid_index)
+        parts, loads = shard_partition(shard_units(test_paths, nodeid_index), shard_history, shard_total)
+        mine = parts[shard_index - 1]
+        print(f'Shard {shard_index}/{shard_total}: {len(mine)} of {sum(len(p) for p in parts)} tests, '
+              f'~{loads[shard_index - 1]:.1f}s of {sum(loads):.1f}s by duration history')
+        if not mine:
+            print('No tests in this shard')
+            return
+        test_args = [nodeid_arg(n) for n in mine]
+    if selection.markers:
+        test_args += ["-m", selection.markers]
+    if selection.kexpr:
+        test_args += ["-k", selection.kexpr]
+
+    if execution.order == 'risk':
+        risk, changed_nodeids = failure_risk(nodeid_index, test_paths)
+        if risk:
+            risk_file = paths.SESSION_DIR / 'risk.json'
+            risk_file.write_text(json.dumps(risk))
+            test_args += [f"--risk-order={risk_file}"]
+            print(f'Risk ordering: {len(risk) - len(changed_nodeids)} tests with recent failures or flakes, '
+                  f'{len(changed_nodeids)} changed test files first')
+
+    history = {}
+    parallel = execution.parallel
+    if parallel and parallel > 0 and execution.schedule == 'lpt':
+        history = load_duration_history(nodeid_index)
+        if history:
+            durations_file = paths.SESSION_DIR / 'durations.json'
+            durations_file.write_text(json.dumps(history))
+            test_args += [f"--lpt-durations={durations_file}"]
+            print(f'LPT scheduling from {len(history)} historical durations')
+        else:
+            print('No duration history yet; using xdist load scheduling')
+
+    html = paths.REPORTS / f'report_{run_id}.html'
+    junit = paths.REPORTS / f'report_{run_id}.xml'
+    rc, duration, feed = run_pytest_live(test_args, html, junit, run_id, parallel, pytest_opts,
+                                         self_contained=report.media == 'inline', console=report.live)
+    # the stream is complete once session_finish arrived; otherwise fall back to the JUnit file
+    streamed = feed.finished_at is not None
+    not_run = []
+    if streamed:
+        stats = feed.stats()
+        failed_nodeids = [nodeid_arg(n) for n in feed.failed_nodeids()]
+        not_run = [nodeid_arg(n) for n in feed.not_run()]
+    else:
+        print('Event stream incomplete; reading results from the JUnit report')
+        stats = parse_junit(junit)
+        failed_nodeids = failed_nodeids_from_junit(junit, nodeid_index)
+    if not_run:
+        print(f'Stopped after {len(failed_nodeids)} failures; {len(not_run)} tests not run (pick them up with --resume)')
+    schedule_summary = summarize_schedule(stats, nodeid_index, history, parallel, duration) if history else None
+    pool_summary = summarize_browser_pool()
+    auth_summary = summarize_auth_cache()
+    async_summary = summarize_async_runner()
+    artifact_summary = summarize_artifacts()
+    pipeline_summary = summarize_pipeline()
+    # shards sharing a checkout evict once, at merge
+    store_summary = (summarize_store([run_id], artifacts.keep_runs, artifacts.store_quota)
+                     if artifacts.use_store and not sharding.shard else None)
+    blocking_summary = summarize_blocking()
+    perf_summary, perf_violations = (summarize_perf(site.base_url, perf.budget, perf.update_baseline)
+                                     if perf.enabled else (None, []))
+    visual_summary, visual_failures = (summarize_visual(site.base_url, run_id, visual.tolerance, visual.update_baseline,
+                                                        visual.exact)
+                                       if visual.enabled else (None, []))
+    timing_summary = summarize_timing(paths.REPORTS / f'timing_{run_id}.html') if report.timing else None
+    trace_summary = summarize_traces(paths.REPORTS / f'traces_{run_id}.json', run_id)
 
     session_state = {
         'run_id': run_id,
+        'shard': {'index': shard_index, 'total': shard_total} if sharding.shard else None,
+        'reports': {'html': _rel(html), 'junit': _rel(junit), 'live': _rel(paths.REPORTS / f'live_{run_id}.html'),
+                    'events': _rel(paths.REPORTS / f'events_{run_id}.jsonl')},
         'stats': stats,
         'failed_nodeids': failed_nodeids,
+        'not_run': not_run,
         'duration': duration,
+        'browser_pool': pool_summary,
+        'auth_cache': auth_summary,
+        'async_runner': async_summary,
+        'artifacts': artifact_summary,
+        'artifact_pipeline': pipeline_summary,
+        'artifact_store': store_summary,
+        'blocking': blocking_summary,
+        'schedule': schedule_summary,
+        'timing': timing_summary,
+        'traces': trace_summary,
+        'perf': {'pages': perf_summary, 'violations': perf_violations} if perf_summary else None,
+        'visual': {'summary': visual_summary, 'failures': visual_failures} if visual_summary else None,
         'env': {
             'platform': platform.platform(),
             'python': platform.python_version()
@@ -346,40 +273,42 @@ def main(path, pattern, parallel, retries, clear, resume, markers, kexpr):
     with open(session_file, 'w') as fh:
         json.dump(session_state, fh, indent=2)
 
-    attempt = 0
-    while retries > 0 and failed_nodeids:
-        attempt += 1
-        print(f'Retry attempt {attempt} for {len(failed_nodeids)} tests')
-        html_r = REPORTS / f'retry_{run_id}_{attempt}.html'
-        junit_r = REPORTS / f'retry_{run_id}_{attempt}.xml'
-        rc2, dur2 = run_pytest(failed_nodeids, html_r, junit_r, parallel)
-        parsed2 = parse_junit(junit_r)
-        failed_nodeids = []
-        for t in parsed2['tests']:
-            if t['status'] == 'failed':
-                cls = t.get('classname')
-                name = t.get('name')
-                if cls:
-                    path = cls.replace('.', '/') + '.py'
-                    failed_nodeids.append(f"{path}::{name}")
-        retries -= 1
-        session_state['failed_nodeids'] = failed_nodeids
-        session_state['stats_retry_' + str(attempt)] = parsed2
+    final = feed.final() if streamed else merge_junit_results(junit)
+    if execution.retries:
+        session_state['final'] = final
         with open(session_file, 'w') as fh:
             json.dump(session_state, fh, indent=2)
+        print(f"Final: {final['passed']} passed, {final['flaky']} flaky, {final['failed']} failed, "
+              f"{final['skipped']} skipped")
 
-    make_pie_chart(stats, REPORTS / f'chart_{run_id}.png', title=f'Run {run_id}')
+    make_pie_chart(final, paths.REPORTS / f'chart_{run_id}.png', title=f'Run {run_id}')
 
     try:
-        videos_map = collect_videos_map(VIDEOS)
+        videos_map = feed.videos_map() if streamed else collect_videos_map()
         inject_videos_into_pytest_html(html, videos_map, failed_nodeids)
     except Exception as e:
         print('Failed to inject videos into pytest-html report:', e)
+    if trace_summary:
+        inject_traces_into_pytest_html(html, trace_summary['failing'])
+    inject_visual_into_pytest_html(html, visual_failures)
 
     print('Run complete')
     print(f'Reports: {html}')
     print(f'Junit: {junit}')
-    print(f'Chart: {REPORTS / f"chart_{run_id}.png"}')
+    print(f'Live: {paths.REPORTS / f"live_{run_id}.html"}')
+    print(f'Chart: {paths.REPORTS / f"chart_{run_id}.png"}')
+    if perf_violations:
+        print(f'Failing the run: {len(perf_violations)} perf metric(s) over budget')
+    if visual_failures:
+        print(f'Failing the run: {len(visual_failures)} screenshot(s) changed from their visual baseline')
+    if perf_violations or visual_failures:
+        sys.exit(1)
+
+main.add_command(load)
+main.add_command(daemon)
+main.add_command(watch)
+main.add_command(dashboard)
+main.add_command(merge)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
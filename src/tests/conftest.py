@@ -1,60 +1,353 @@
 import pytest
-from playwright.sync_api import Playwright
-import uuid
+from playwright.sync_api import Playwright, TimeoutError as PlaywrightTimeoutError
+from contextlib import ExitStack, contextmanager
 from pathlib import Path
+from urllib.parse import urljoin, urlparse
 import shutil
 import os
 
+from pages.Inventory import Inventory
+from pages.LoginPage import Loginpage
+from support.artifacts import KINDS, POLICIES, ArtifactStats, manifest_path
+from support.async_runner import AsyncBrowserRunner
+from support.auth import USERS, AuthStateCache
+from support.blocking import PROFILES as BLOCK_PROFILES, RequestBlocker
+from support.browser_pool import BrowserPool
+from support.contexts import ContextSetup
+from support.har import HarReplay
+from support.perf import PERF_SCRIPT, PerfRecorder
+from support.pipeline import ArtifactPipeline
+from support.store import ArtifactStore
+from support.workers import shard_id, worker_id, write_worker_stats
+
+AUTH_CHECK_TIMEOUT = 5000
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("sauce", "sauce-playwright-pom")
+    group.addoption("--browser-recycle-after", type=int, default=50,
+                    help="Relaunch the worker's browser after this many tests (0 = never)")
+    group.addoption("--browser-max-rss-mb", type=int, default=0,
+                    help="Relaunch the worker's browser when its process tree exceeds this RSS in MB (0 = off)")
+    group.addoption("--browser-rss-check-every", type=int, default=10,
+                    help="Measure the browser's RSS for --browser-max-rss-mb once every this many tests")
+    group.addoption("--auth-ttl", type=int, default=600,
+                    help="Seconds a cached login storage_state stays valid (0 = until the cookie expires)")
+    group.addoption("--har-mode", choices=("off", "record", "replay"), default="off",
+                    help="Record every context's traffic to HAR files, or replay them instead of the network")
+    group.addoption("--har-dir", default=str(Path(__file__).parents[2] / "hars"),
+                    help="Directory holding the recorded HAR files")
+    group.addoption("--har-not-found", choices=("abort", "fallback"), default="abort",
+                    help="What replay does with a request missing from the HARs")
+    group.addoption("--block-profile", choices=BLOCK_PROFILES, default="off",
+                    help="Serve images, fonts and media from memory (cache) or abort them (block); stub trackers")
+    for kind in KINDS:
+        group.addoption(f"--{kind}-policy", choices=POLICIES, default="retain-on-failure",
+                        help=f"When to record and keep the per-test {kind}")
+    group.addoption("--artifact-workers", type=int, default=2,
+                    help="Threads per worker that write, thumbnail and index artifacts after teardown (0 = inline)")
+    group.addoption("--artifact-store", default=None,
+                    help="Directory of the content-addressed store kept artifacts are deduplicated into across runs")
+    group.addoption("--run-id", default="",
+                    help="Id of the run the stored artifacts belong to (set by runner.py)")
+    group.addoption("--run-attempt", type=int, default=0,
+                    help="Retry attempt number of this run (0 = first run), used by on-first-retry")
+    group.addoption("--async-concurrency", type=int, default=4,
+                    help="Contexts the async_runner fixture drives at once in the worker's async browser")
+    group.addoption("--perf-metrics", action="store_true", default=False,
+                    help="Collect navigation/resource timing, LCP, CLS and heap for every page every test visits")
+    group.addoption("--timing", action="store_true", default=False,
+                    help="Record page-object and Playwright call timings to reports/timing_<worker>.jsonl")
+    group.addoption("--retry-failed", type=int, default=0,
+                    help="Rerun a failed test up to this many times in the same session")
+    group.addoption("--retry-backoff", type=float, default=0.0,
+                    help="Seconds to wait before the first rerun, doubled for each further one")
+    group.addoption("--lpt-durations", default=None,
+                    help="JSON of historical test durations; with -n, dispatch longest tests first")
+    group.addoption("--browser-endpoint", default=None,
+                    help="CDP endpoint of a running Chromium (runner.py daemon) to connect to instead of launching")
+    group.addoption("--risk-order", default=None,
+                    help="JSON of per-test failure risk scores; run the riskiest tests first")
+    group.addoption("--events", default=None,
+                    help="Stream per-test events as JSON lines to this file or to tcp://host:port")
+
+
+def pytest_configure(config):
+    retries = config.getoption("retry_failed")
+    if retries > 0:
+        from support.rerun import RerunPlugin
+        config.pluginmanager.register(RerunPlugin(retries, config.getoption("retry_backoff")), "rerun")
+    # under xdist only the workers run tests; the controller would just see forwarded reports
+    if config.getoption("timing") and (hasattr(config, "workerinput") or not getattr(config.option, "numprocesses", None)):
+        from support.timing import ActionTimer, TimingPlugin
+        timer = ActionTimer(REPO_ROOT / "reports" / f"timing_{worker_id()}.jsonl")
+        timer.install(Path(__file__).parent / "pages")
+        config.pluginmanager.register(TimingPlugin(timer), "timing")
+    durations = config.getoption("lpt_durations")
+    risk = config.getoption("risk_order")
+    if (durations or risk) and config.pluginmanager.hasplugin("xdist") and not hasattr(config, "workerinput"):
+        from support.scheduling import LPTSchedulerPlugin
+        config.pluginmanager.register(LPTSchedulerPlugin(durations, REPO_ROOT, risk), "lpt-scheduler")
+    # under xdist the scheduler above decides the order; workers must keep the collection order
+    if risk and not hasattr(config, "workerinput") and not getattr(config.option, "numprocesses", None):
+        from support.scheduling import RiskOrderPlugin
+        config.pluginmanager.register(RiskOrderPlugin(risk, REPO_ROOT), "risk-order")
+    # the controller gets every worker's reports forwarded, so it is the one that streams them
+    events = config.getoption("events")
+    if events and not hasattr(config, "workerinput"):
+        from support.events import EventSink, EventStreamPlugin
+        config.pluginmanager.register(EventStreamPlugin(EventSink(events)), "event-stream")
+
+
+@pytest.fixture(scope="session")
+def browser_pool(playwright: Playwright, pytestconfig):
+    """One browser per worker; every test still gets its own BrowserContext."""
+    pool = BrowserPool(
+        playwright.chromium,
+        recycle_after=pytestconfig.getoption("browser_recycle_after"),
+        max_rss_mb=pytestconfig.getoption("browser_max_rss_mb"),
+        endpoint=pytestconfig.getoption("browser_endpoint"),
+        rss_check_every=pytestconfig.getoption("browser_rss_check_every"),
+    )
+    yield pool
+    pool.close()
+    write_worker_stats(Path(__file__).parents[2] / "reports", "pool_stats", pool.stats)
+
+
+@pytest.fixture(scope="session")
+def async_browser(pytestconfig):
+    """One async browser per worker that runs page-object flows concurrently, one context each."""
+    runner = AsyncBrowserRunner(concurrency=pytestconfig.getoption("async_concurrency"),
+                                endpoint=pytestconfig.getoption("browser_endpoint")).start()
+    yield runner
+    runner.close()
+    write_worker_stats(Path(__file__).parents[2] / "reports", "async_stats", runner.stats)
+
 
 @pytest.fixture(scope="function")
-def setup_teardown(playwright: Playwright, request):
-    browser = playwright.chromium.launch()
-    repo_root = Path(__file__).parents[2]
-    videos_dir = repo_root / "videos"
-    logs_dir = repo_root / "logs"
-    screenshots_dir = repo_root / "screenshots"
-    # ensure dirs exist
-    videos_dir.mkdir(parents=True, exist_ok=True)
-    logs_dir.mkdir(parents=True, exist_ok=True)
-    screenshots_dir.mkdir(parents=True, exist_ok=True)
-
-    # create per-test video directory so we can map videos to test node
-    unique_id = uuid.uuid4().hex[:8]
-    per_test_video_dir = videos_dir / unique_id
-    per_test_video_dir.mkdir(parents=True, exist_ok=True)
-
-    context = browser.new_context(record_video_dir=str(per_test_video_dir))
-    context.tracing.start(screenshots=True, snapshots=True, sources=True)
-    page = context.new_page()
-    page.set_viewport_size({"width": 1280, "height": 720})
-    page.goto("https://www.saucedemo.com/")
-
-    # attach video dir info to the test node for later reporting
-    request.node._video_dir = per_test_video_dir
-
-    yield page
-
-    # teardown: capture screenshot, stop tracing, close context
-    page.screenshot(path=str(screenshots_dir / f"snapshots_{unique_id}.png"))
-    context.tracing.stop(path=str(logs_dir / f"tracing_{unique_id}.zip"))
-    context.close()
-    browser.close()
-
-    # collect video files for the test node
-    vids = []
-    if per_test_video_dir.exists():
-        for p in per_test_video_dir.rglob('*'):
-            if p.is_file():
-                vids.append(p)
-    request.node._video_paths = vids
-    # write metadata file linking this video folder to the test nodeid
+def async_runner(async_browser, request):
+    """Runs async flows in the worker's async browser; their contexts get what a sync test's context gets."""
+    setup = _context_setup(request)
+    marker = request.node.get_closest_marker("visual_mask")
+    yield async_browser.bound(setup, mask_selectors=marker.args if marker else ())
+    failed = _test_failed(request.node) or any(rec["failed"] for rec in setup.contexts)
+    entry = setup.finish(failed)
+    request.node._video_paths = setup.kept_videos
+    # the teardown report carries this to the --events stream
+    request.node._artifacts = entry
+
+
+@pytest.fixture(scope="session")
+def har_replay(pytestconfig):
+    """Recorded HAR entries indexed once per worker for --har-mode=replay."""
+    replay = HarReplay(Path(pytestconfig.getoption("har_dir")), pytestconfig.getoption("har_not_found"))
+    yield replay
+    write_worker_stats(Path(__file__).parents[2] / "reports", "har_stats", replay.stats)
+
+
+@pytest.fixture(scope="session")
+def perf_recorder():
+    recorder = PerfRecorder()
+    yield recorder
+    write_worker_stats(Path(__file__).parents[2] / "reports", "perf_stats",
+                       {"stats": recorder.stats, "pages": recorder.samples})
+
+
+@pytest.fixture(scope="function")
+def perf_metrics(perf_recorder):
+    """Opt a single test into perf collection (--perf-metrics turns it on for all of them)."""
+    return perf_recorder
+
+
+@pytest.fixture(scope="session")
+def request_blocker(pytestconfig):
+    """One blocker per worker so the in-memory asset cache is shared by all its tests."""
+    blocker = RequestBlocker(pytestconfig.getoption("block_profile"))
+    yield blocker
+    write_worker_stats(Path(__file__).parents[2] / "reports", "block_stats", blocker.stats)
+
+
+def _uses_blocker(request):
+    # HAR record wants the full traffic and HAR replay already keeps it local
+    if request.config.getoption("block_profile") == "off" or request.config.getoption("har_mode") != "off":
+        return False
+    return request.node.get_closest_marker("all_resources") is None
+
+
+@pytest.fixture(scope="session")
+def artifact_stats():
+    stats = ArtifactStats()
+    yield stats
+    write_worker_stats(Path(__file__).parents[2] / "reports", "artifact_stats", stats.data)
+
+
+@pytest.fixture(scope="session")
+def artifact_pipeline(pytestconfig, artifact_stats):
+    """Per-worker thread pool for artifact post-processing; drained before artifact_stats is written."""
+    pipeline = ArtifactPipeline(workers=pytestconfig.getoption("artifact_workers"))
+    yield pipeline
+    pipeline.drain()
+    write_worker_stats(Path(__file__).parents[2] / "reports", "pipeline_stats", pipeline.stats)
+
+
+@pytest.fixture(scope="session")
+def artifact_store(pytestconfig):
+    """The --artifact-store, or None when kept artifacts are not stored across runs."""
+    root = pytestconfig.getoption("artifact_store")
+    return ArtifactStore(Path(root)) if root else None
+
+
+def _mask_boxes(page, request):
+    """Viewport boxes [x, y, w, h] of the visual_mask marker's selectors, for the visual comparison to ignore."""
+    marker = request.node.get_closest_marker("visual_mask")
+    if marker is None:
+        return []
+    boxes = []
+    for selector in marker.args:
+        for locator in page.locator(selector).all():
+            box = locator.bounding_box()
+            if box:
+                boxes.append([round(box["x"]), round(box["y"]), round(box["width"]), round(box["height"])])
+    return boxes
+
+
+def _test_failed(item):
+    return any(getattr(item, f"rep_{when}", None) is not None and getattr(item, f"rep_{when}").failed
+               for when in ("setup", "call"))
+
+
+def _context_setup(request):
+    """The routes, artifact policies and artifact handling of this test's contexts, sync or async."""
+    config = request.config
+    for d in (VIDEOS_DIR, LOGS_DIR, SCREENSHOTS_DIR):
+        d.mkdir(parents=True, exist_ok=True)
+    har_mode = config.getoption("har_mode")
+    router = None
+    if har_mode == "replay":
+        router = request.getfixturevalue("har_replay")
+    elif _uses_blocker(request):
+        router = request.getfixturevalue("request_blocker")
+    return ContextSetup(
+        request.node.nodeid, _rel_path_from_reports(Path(request.node.path)), REPO_ROOT,
+        # reruns inside this session count on from the attempt the runner started us at
+        attempt=config.getoption("run_attempt") + getattr(request.node, "_rerun_attempt", 0),
+        policies={kind: config.getoption(f"{kind}_policy") for kind in KINDS},
+        stats=request.getfixturevalue("artifact_stats"),
+        pipeline=request.getfixturevalue("artifact_pipeline"),
+        manifest=ARTIFACT_MANIFEST,
+        worker=worker_id(),
+        store=request.getfixturevalue("artifact_store"),
+        run_id=config.getoption("run_id"),
+        har_record_dir=Path(config.getoption("har_dir")) if har_mode == "record" else None,
+        router=router,
+    )
+
+
+@contextmanager
+def _open_test_page(browser_pool, request, start_url, storage_state=None):
+    setup = _context_setup(request)
+    perf = None
+    if request.config.getoption("perf_metrics") or "perf_metrics" in request.fixturenames:
+        perf = request.getfixturevalue("perf_recorder")
+
+    rec = setup.open(storage_state=storage_state)
+    context = browser_pool.new_context(**rec["args"])
+    page = None
+    opened = False
+    # the context lives in the worker's shared browser, so it is closed however setup or teardown fails
     try:
-        meta = {'nodeid': request.node.nodeid}
-        import json
+        setup.attach(context, rec)
+        if perf is not None:
+            context.add_init_script(script=PERF_SCRIPT)
+        page = context.new_page()
+        page.set_viewport_size({"width": 1280, "height": 720})
+        page.goto(start_url)
+        opened = True
 
-        (per_test_video_dir / 'metadata.json').write_text(json.dumps(meta))
-    except Exception:
-        pass
+        # attach video dir info to the test node for later reporting
+        request.node._video_dir = rec["video_dir"]
+
+        yield page
+    finally:
+        # teardown: capture screenshot, stop tracing, close context -- keeping only what the policies ask for.
+        # Only the Playwright calls happen here; files are written and indexed by the artifact pipeline.
+        # Each call may fail on a crashed page; the first error is raised once the context is closed.
+        failed = not opened or _test_failed(request.node)
+        errors = []
+        if perf is not None and opened:
+            perf.collect(page)
+        masks = []
+        if page is not None and setup.keeps("screenshot", failed):
+            try:
+                masks = _mask_boxes(page, request)
+            except Exception as e:
+                errors.append(e)
+        errors += setup.capture(context, page, rec, failed, masks)
+        try:
+            context.close()
+        except Exception as e:
+            errors.append(e)
+
+        entry = setup.finish(failed)
+        request.node._video_paths = setup.kept_videos
+        # the teardown report carries this to the --events stream
+        request.node._artifacts = entry
+        # a failed setup is already propagating; don't replace it with a teardown error
+        if errors and opened:
+            raise errors[0]
+
+
+@pytest.fixture(scope="function")
+def setup_teardown(browser_pool, base_url, request):
+    with _open_test_page(browser_pool, request, base_url) as page:
+        yield page
+
+
+@pytest.fixture(scope="session")
+def auth_cache(pytestconfig, base_url):
+    # storage_state is per origin, so keep one cache per target site
+    site = urlparse(base_url).netloc.replace(":", "_")
+    cache = AuthStateCache(Path(__file__).parents[2] / ".auth" / site / worker_id(),
+                           ttl=pytestconfig.getoption("auth_ttl"))
+    yield cache
+    write_worker_stats(Path(__file__).parents[2] / "reports", "auth_stats", cache.stats)
+
+
+@pytest.fixture(scope="function")
+def authenticated_page(browser_pool, auth_cache, base_url, request):
+    """Factory returning a page that is already logged in and on the inventory page.
+
+    The first call per user per worker logs in through the UI and caches the
+    storage_state; later calls start the context from that file. Tests marked
+    ``real_login`` always go through the login form.
+    """
+    with ExitStack() as stack:
+        def _open(user="standard_user", password=None):
+            password = password or USERS.get(user, "secret_sauce")
+            real_login = request.node.get_closest_marker("real_login") is not None
+            state = None if real_login else auth_cache.get(user)
+            if state is None:
+                page = stack.enter_context(_open_test_page(browser_pool, request, base_url))
+            else:
+                page = stack.enter_context(_open_test_page(
+                    browser_pool, request, urljoin(base_url, "inventory.html"), storage_state=state))
+                try:
+                    Inventory(page).inventory_header.wait_for(timeout=AUTH_CHECK_TIMEOUT)
+                    return page
+                except PlaywrightTimeoutError:
+                    # the cached session was rejected; fall back to the form and refresh the cache
+                    auth_cache.invalidate(user)
+                    page.goto(base_url)
+            inventory = Loginpage(page).do_login({"username": user, "password": password})
+            if not real_login:
+                try:
+                    inventory.inventory_header.wait_for(timeout=AUTH_CHECK_TIMEOUT)
+                    auth_cache.store(page.context, user)
+                except PlaywrightTimeoutError:
+                    pass
+            return page
+
+        yield _open
 
 
 # Define paths to videos and screenshots directories relative to repo root
@@ -62,6 +355,7 @@ REPO_ROOT = Path(__file__).parents[2]
 VIDEOS_DIR = REPO_ROOT / 'videos'
 SCREENSHOTS_DIR = REPO_ROOT / 'screenshots'
 LOGS_DIR = REPO_ROOT / 'logs'
+ARTIFACT_MANIFEST = manifest_path(LOGS_DIR)
 
 
 def clear_directory(directory: Path):
@@ -77,9 +371,18 @@ def clear_directory(directory: Path):
                 print(f'Failed to delete {child}. Reason: {e}')
 
 
-@pytest.fixture(scope='session', autouse=True)
-def clear_videos_and_screenshots():
-    """Fixture to clear videos, screenshots and logs before tests run."""
+def pytest_sessionstart(session):
+    """Clear videos, screenshots and logs (and with them the artifact manifest) before tests run.
+
+    Under xdist this runs once on the controller before any worker starts, so a
+    late-starting worker can no longer wipe artifacts another worker already wrote.
+    """
+    if hasattr(session.config, "workerinput"):
+        return
+    # retry runs append to the first attempt's artifacts instead of wiping them,
+    # and shards sharing a checkout must not wipe each other's
+    if session.config.getoption("run_attempt") > 0 or shard_id():
+        return
     for d in (VIDEOS_DIR, SCREENSHOTS_DIR, LOGS_DIR):
         clear_directory(d)
 
@@ -96,6 +399,10 @@ def pytest_runtest_makereport(item, call):
     """Attach video links to pytest-html report when a test fails."""
     outcome = yield
     rep = outcome.get_result()
+    # keep each phase's report on the item so fixture teardown can see the outcome
+    setattr(item, f"rep_{rep.when}", rep)
+    if rep.when == 'teardown' and getattr(item, '_artifacts', None):
+        rep.artifacts = item._artifacts
     if rep.when == 'call' and rep.failed:
         video_paths = getattr(item, '_video_paths', None)
         if not video_paths:
@@ -0,0 +1,36 @@
+from pages.aio.chain import chainable
+
+
+class Checkout:
+    def __init__(self, page) -> None:
+        self.page = page
+        self.checkout_title = page.locator("//span[@class='title']")
+        self.f_name = page.locator("//input[@id='first-name']")
+        self.l_name = page.locator("//input[@id='last-name']")
+        self.zip_code = page.locator("//input[@id='postal-code']")
+        self.checkout_continue = page.locator("//input[@id='continue']")
+        self.checkout_overview = page.locator("//span[@class='title']")
+        self.checkout_finish_btn = page.locator("//button[@id='finish']")
+        self.checkout_sucess_txt = page.locator("//h2[@class='complete-header']")
+
+    def get_checkout_title(self):
+        return self.checkout_title
+
+    @chainable
+    async def enter_checkout_details(self, fname, lname, zip):
+        await self.f_name.fill(fname)
+        await self.l_name.fill(lname)
+        await self.zip_code.fill(zip)
+        return self
+
+    async def click_checkout_continue(self):
+        await self.checkout_continue.click()
+
+    def get_checkout_overview(self):
+        return self.checkout_overview
+
+    async def click_checkout_finish_btn(self):
+        await self.checkout_finish_btn.click()
+
+    def get_checkout_sucess(self):
+        return self.checkout_sucess_txt
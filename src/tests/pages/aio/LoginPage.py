@@ -0,0 +1,37 @@
+from pages.aio.chain import chainable
+from pages.aio.Inventory import Inventory
+
+
+class Loginpage:
+
+    def __init__(self, page):
+        self.page = page
+        self._username_locator = page.locator("//input[@id='user-name']")
+        self._password_locator = page.locator("//input[@id='password']")
+        self._login_btn_locator = page.locator("//input[@id='login-button']")
+        self._error_msg = page.locator("//h3[@data-test='error']")
+        self._loginPage_title = page.locator("//div[@class='login_logo']")
+
+    async def enter_username(self, user_name):
+        await self._username_locator.clear()
+        await self._username_locator.fill(user_name)
+
+    async def enter_password(self, password):
+        await self._password_locator.clear()
+        await self._password_locator.fill(password)
+
+    async def click_loginbtn(self):
+        await self._login_btn_locator.click()
+
+    @chainable
+    async def do_login(self, credentials):
+        await self._username_locator.fill(credentials['username'])
+        await self._password_locator.fill(credentials['password'])
+        await self.click_loginbtn()
+        return Inventory(self.page)
+
+    def error_msg(self):
+        return self._error_msg
+
+    def loginPage_title(self):
+        return self._loginPage_title
@@ -0,0 +1,43 @@
+"""
+Fluent chaining for the async page objects.
+
+A method decorated with @chainable returns a Chain instead of a bare coroutine.
+Awaiting a Chain runs the method; calling a page-object method on it queues that
+call on the result, so the sync flow
+
+    inventory.click_addremove_to_cart(product).click_cart_btn()
+
+reads the same with one await in front:
+
+    await inventory.click_addremove_to_cart(product).click_cart_btn()
+"""
+import functools
+import inspect
+
+
+class Chain:
+    def __init__(self, coro):
+        self._coro = coro
+
+    def __await__(self):
+        return self._coro.__await__()
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            return Chain(self._then(name, args, kwargs))
+        return call
+
+    async def _then(self, name, args, kwargs):
+        target = await self._coro
+        result = getattr(target, name)(*args, **kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+
+def chainable(method):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        # through __wrapped__, so --timing can time the coroutine itself
+        return Chain(wrapper.__wrapped__(*args, **kwargs))
+    return wrapper
@@ -0,0 +1,91 @@
+"""
+Per-artifact retention policies for video, tracing and screenshots.
+
+off               never record
+on                record and keep for every test
+retain-on-failure record, keep only when the test failed
+on-first-retry    record and keep only on the first retry attempt
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from support.workers import shard_id
+
+POLICIES = ("off", "on", "retain-on-failure", "on-first-retry")
+KINDS = ("video", "tracing", "screenshot")
+
+
+def should_record(policy: str, attempt: int) -> bool:
+    if policy == "on-first-retry":
+        return attempt == 1
+    return policy in ("on", "retain-on-failure")
+
+
+def should_keep(policy: str, attempt: int, failed: bool) -> bool:
+    if policy == "retain-on-failure":
+        return failed
+    return should_record(policy, attempt)
+
+
+def path_size(path: Path) -> int:
+    if path.is_file():
+        return path.stat().st_size
+    if path.is_dir():
+        return sum(p.stat().st_size for p in path.rglob('*') if p.is_file())
+    return 0
+
+
+class ArtifactStats:
+    """Counts what each policy kept, discarded after recording, or never produced; safe to call from the pipeline."""
+
+    def __init__(self):
+        self.data = {kind: {'kept': 0, 'kept_bytes': 0, 'kept_time': 0.0,
+                            'discarded': 0, 'discarded_bytes': 0, 'discard_time': 0.0,
+                            'skipped': 0}
+                     for kind in KINDS}
+        self._lock = threading.Lock()
+
+    def kept(self, kind: str, path: Path, started: float, nbytes: int = None):
+        elapsed = time.perf_counter() - started
+        nbytes = path_size(path) if nbytes is None else nbytes
+        with self._lock:
+            d = self.data[kind]
+            d['kept'] += 1
+            d['kept_time'] += elapsed
+            d['kept_bytes'] += nbytes
+
+    def discarded(self, kind: str, nbytes: int, started: float):
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            d = self.data[kind]
+            d['discarded'] += 1
+            d['discarded_bytes'] += nbytes
+            d['discard_time'] += elapsed
+
+    def skipped(self, kind: str):
+        with self._lock:
+            self.data[kind]['skipped'] += 1
+
+
+def manifest_path(logs_dir: Path) -> Path:
+    """logs/artifacts.jsonl, or one file per shard so shards can share a checkout."""
+    shard = shard_id()
+    return logs_dir / (f"artifacts_s{shard}.jsonl" if shard else "artifacts.jsonl")
+
+
+def append_manifest(manifest: Path, record: dict):
+    """Append one JSON line to the artifact manifest.
+
+    The file is opened with O_APPEND and each line goes out in a single write,
+    so lines from concurrent xdist workers never interleave.
+    """
+    manifest.parent.mkdir(parents=True, exist_ok=True)
+    line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+    fd = os.open(str(manifest), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
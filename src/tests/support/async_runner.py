@@ -0,0 +1,158 @@
+"""
+Drive many pages concurrently from one worker with playwright.async_api.
+
+AsyncBrowserRunner owns an event loop on a background thread and one browser
+launched in it. run() takes async flows -- ``async def flow(page)`` built on
+the page objects in pages/aio -- and runs them concurrently, each in its own
+BrowserContext, at most ``concurrency`` at a time. The loop lives on its own
+thread so it never meets the loop the sync API parks on the main thread, and
+sync and async tests can share a worker.
+
+Given a ContextSetup (support.contexts), every context is routed, traced and
+captured the way a sync test's context is, visual_mask selectors included;
+given an endpoint, the runner connects to an already running browser over CDP
+instead of launching.
+"""
+import asyncio
+import threading
+import time
+
+from playwright.async_api import async_playwright
+
+
+async def _mask_boxes(page, selectors):
+    """Viewport boxes [x, y, w, h] of selectors, like the sync conftest's _mask_boxes."""
+    boxes = []
+    for selector in selectors:
+        for locator in await page.locator(selector).all():
+            box = await locator.bounding_box()
+            if box:
+                boxes.append([round(box["x"]), round(box["y"]), round(box["width"]), round(box["height"])])
+    return boxes
+
+
+class AsyncBrowserRunner:
+    def __init__(self, browser_name: str = "chromium", concurrency: int = 4, launch_options=None,
+                 endpoint: str = None):
+        self.browser_name = browser_name
+        self.endpoint = endpoint
+        self.concurrency = concurrency
+        self.launch_options = launch_options or {}
+        self.stats = {'runs': 0, 'flows': 0, 'failed': 0, 'peak_concurrency': 0,
+                      'flow_time': 0.0, 'wall_time': 0.0}
+        self._loop = None
+        self._thread = None
+        self._playwright = None
+        self._browser = None
+        self._active = 0
+
+    def start(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="async-runner", daemon=True)
+        self._thread.start()
+        try:
+            self._call(self._launch())
+        except Exception:
+            self.close()
+            raise
+        return self
+
+    def _call(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _launch(self):
+        self._playwright = await async_playwright().start()
+        browser_type = getattr(self._playwright, self.browser_name)
+        if self.endpoint:
+            self._browser = await browser_type.connect_over_cdp(self.endpoint)
+        else:
+            self._browser = await browser_type.launch(**self.launch_options)
+
+    async def _run_one(self, semaphore, flow, start_url, setup, context_args, mask_selectors=()):
+        name = getattr(flow, '__name__', repr(flow))
+        async with semaphore:
+            self._active += 1
+            self.stats['peak_concurrency'] = max(self.stats['peak_concurrency'], self._active)
+            started = time.perf_counter()
+            rec = setup.open(part=name) if setup is not None else None
+            context = page = error = None
+            try:
+                context = await self._browser.new_context(**dict(context_args, **(rec['args'] if rec else {})))
+                if setup is not None:
+                    await setup.attach_async(context, rec)
+                page = await context.new_page()
+                await page.set_viewport_size({"width": 1280, "height": 720})
+                await page.goto(start_url)
+                await flow(page)
+            except Exception as e:
+                error = e
+            finally:
+                # a failed flow or a crashed page must not keep its context open
+                if context is not None:
+                    if setup is not None:
+                        failed = error is not None
+                        masks = []
+                        if page is not None and mask_selectors and setup.keeps("screenshot", failed):
+                            try:
+                                masks = await _mask_boxes(page, mask_selectors)
+                            except Exception as e:
+                                error = error or e
+                        errors = await setup.capture_async(context, page, rec, failed, masks)
+                        error = error or (errors[0] if errors else None)
+                    try:
+                        await context.close()
+                    except Exception as e:
+                        error = error or e
+                self._active -= 1
+        return {'flow': name, 'duration': time.perf_counter() - started, 'error': error}
+
+    async def _run_all(self, flows, start_url, setup, context_args, mask_selectors=()):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        return await asyncio.gather(*(self._run_one(semaphore, f, start_url, setup, context_args, mask_selectors)
+                                      for f in flows))
+
+    def run(self, flows, start_url: str, setup=None, mask_selectors=(), **context_args):
+        """Run every flow in its own context; re-raise the first failure once all have finished."""
+        started = time.perf_counter()
+        results = self._call(self._run_all(list(flows), start_url, setup, context_args, mask_selectors))
+        self.stats['runs'] += 1
+        self.stats['flows'] += len(results)
+        self.stats['failed'] += sum(1 for r in results if r['error'] is not None)
+        self.stats['flow_time'] += sum(r['duration'] for r in results)
+        self.stats['wall_time'] += time.perf_counter() - started
+        for r in results:
+            if r['error'] is not None:
+                raise r['error']
+        return results
+
+    def bound(self, setup, mask_selectors=()):
+        """This runner with every run() setting its contexts up with setup (one test's ContextSetup)."""
+        return _BoundRunner(self, setup, mask_selectors)
+
+    async def _shutdown(self):
+        if self._browser is not None:
+            await self._browser.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+
+    def close(self):
+        if self._loop is None:
+            return
+        try:
+            self._call(self._shutdown())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=10)
+            self._loop.close()
+            self._loop = None
+
+
+class _BoundRunner:
+    def __init__(self, runner: AsyncBrowserRunner, setup, mask_selectors=()):
+        self.runner = runner
+        self.setup = setup
+        self.mask_selectors = mask_selectors
+
+    def run(self, flows, start_url: str, **context_args):
+        return self.runner.run(flows, start_url, setup=self.setup, mask_selectors=self.mask_selectors,
+                               **context_args)
@@ -0,0 +1,66 @@
+"""
+Per-worker cache of authenticated storage_state files.
+
+The first test that asks for a user logs in through the UI and saves the
+context's storage_state under .auth/<site>/<worker>/<user>.json; later contexts
+for the same user start from that file and skip the login form. An entry is dropped
+when it is older than the TTL, when its session cookie has expired, or when a
+context started from it turns out not to be logged in.
+"""
+import json
+import time
+from pathlib import Path
+
+# every saucedemo account shares the same password
+USERS = {
+    "standard_user": "secret_sauce",
+    "locked_out_user": "secret_sauce",
+    "problem_user": "secret_sauce",
+    "performance_glitch_user": "secret_sauce",
+    "error_user": "secret_sauce",
+    "visual_user": "secret_sauce",
+}
+
+
+class AuthStateCache:
+    def __init__(self, cache_dir: Path, ttl: int = 600):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.stats = {'hits': 0, 'misses': 0, 'invalidated': 0}
+
+    def path_for(self, user: str) -> Path:
+        return self.cache_dir / f"{user}.json"
+
+    def get(self, user: str):
+        """Return the cached storage_state path for user, or None if missing or expired."""
+        path = self.path_for(user)
+        if not path.exists():
+            self.stats['misses'] += 1
+            return None
+        now = time.time()
+        expired = self.ttl and now - path.stat().st_mtime > self.ttl
+        if not expired:
+            try:
+                cookies = json.loads(path.read_text()).get('cookies', [])
+            except Exception:
+                cookies = None
+            # a session cookie has expires == -1; anything else is a unix timestamp
+            expired = cookies is None or any(0 < c.get('expires', -1) < now for c in cookies)
+        if expired:
+            self.invalidate(user)
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        return path
+
+    def store(self, context, user: str) -> Path:
+        path = self.path_for(user)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        context.storage_state(path=str(path))
+        return path
+
+    def invalidate(self, user: str):
+        path = self.path_for(user)
+        if path.exists():
+            path.unlink()
+            self.stats['invalidated'] += 1
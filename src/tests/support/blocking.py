@@ -0,0 +1,122 @@
+"""
+Request-blocking profiles for test contexts.
+
+off    every request goes to the network
+cache  images, fonts and media are fetched once per worker and then fulfilled
+       from memory; analytics and error-reporting beacons get an empty 204
+block  images, fonts and media are aborted; beacons get an empty 204
+
+Tests marked ``all_resources`` always load everything. The blocker counts, per
+test, the requests it kept off the network and the bytes that saved; bytes are
+only known for responses the worker has seen once, so aborted requests for
+never-seen URLs count as requests only.
+"""
+import re
+from urllib.parse import urlparse
+
+PROFILES = ("off", "cache", "block")
+HEAVY_TYPES = {"image", "font", "media"}
+TRACKER_HOSTS = re.compile(r"(^|\.)(google-analytics\.com|googletagmanager\.com|doubleclick\.net|backtrace\.io|"
+                           r"segment\.(io|com)|hotjar\.com|optimizely\.com|newrelic\.com|nr-data\.net|sentry\.io|"
+                           r"facebook\.net)$")
+# headers that describe the on-the-wire body, not the decoded body we fulfill with
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+# stop caching new bodies once this much is held in memory
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+
+class RequestBlocker:
+    def __init__(self, profile: str = "cache"):
+        self.profile = profile
+        self.cache = {}
+        self.sizes = {}
+        self.cache_bytes = 0
+        self.stats = {'requests': 0, 'bytes': 0, 'stubbed': 0, 'aborted': 0, 'cached': 0}
+
+    def _cache(self, url, response, body):
+        self.sizes[url] = len(body)
+        if response.ok and self.cache_bytes + len(body) <= MAX_CACHE_BYTES:
+            headers = {k: v for k, v in response.headers.items() if k.lower() not in _DROP_HEADERS}
+            self.cache[url] = (response.status, headers, body)
+            self.cache_bytes += len(body)
+
+    def _fetch_and_cache(self, route):
+        response = route.fetch()
+        body = response.body()
+        self._cache(route.request.url, response, body)
+        route.fulfill(response=response, body=body)
+
+    async def _fetch_and_cache_async(self, route):
+        response = await route.fetch()
+        body = await response.body()
+        self._cache(route.request.url, response, body)
+        await route.fulfill(response=response, body=body)
+
+    def _counter(self):
+        counts = {'requests': 0, 'bytes': 0}
+
+        def avoided(kind, nbytes=0):
+            counts['requests'] += 1
+            counts['bytes'] += nbytes
+            self.stats['requests'] += 1
+            self.stats['bytes'] += nbytes
+            self.stats[kind] += 1
+        return counts, avoided
+
+    def _decide(self, request, avoided):
+        """What to do with a request: stub, fallback, abort, fetch, or fulfill from the returned cache hit."""
+        if TRACKER_HOSTS.search(urlparse(request.url).hostname or ""):
+            avoided('stubbed')
+            return "stub", None
+        if request.resource_type not in HEAVY_TYPES:
+            return "fallback", None
+        if self.profile == "block":
+            avoided('aborted', self.sizes.get(request.url, 0))
+            return "abort", None
+        hit = self.cache.get(request.url)
+        if hit is None:
+            return "fetch", None
+        avoided('cached', len(hit[2]))
+        return "fulfill", hit
+
+    def attach(self, context):
+        """Route the context through the profile; returns the per-test counters it fills in."""
+        counts, avoided = self._counter()
+
+        def handle(route):
+            action, hit = self._decide(route.request, avoided)
+            if action == "stub":
+                route.fulfill(status=204, body=b"")
+            elif action == "fallback":
+                route.fallback()
+            elif action == "abort":
+                route.abort("blockedbyclient")
+            elif action == "fetch":
+                self._fetch_and_cache(route)
+            else:
+                status, headers, body = hit
+                route.fulfill(status=status, headers=headers, body=body)
+
+        context.route("**/*", handle)
+        return counts
+
+    async def attach_async(self, context):
+        """attach() for a context of the async API."""
+        counts, avoided = self._counter()
+
+        async def handle(route):
+            action, hit = self._decide(route.request, avoided)
+            if action == "stub":
+                await route.fulfill(status=204, body=b"")
+            elif action == "fallback":
+                await route.fallback()
+            elif action == "abort":
+                await route.abort("blockedbyclient")
+            elif action == "fetch":
+                await self._fetch_and_cache_async(route)
+            else:
+                status, headers, body = hit
+                await route.fulfill(status=status, headers=headers, body=body)
+
+        await context.route("**/*", handle)
+        return counts
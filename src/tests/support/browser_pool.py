@@ -0,0 +1,179 @@
+"""
+Worker-scoped browser pool.
+
+Each xdist worker keeps one Chromium process alive and hands every test a fresh
+BrowserContext, so tests stay as isolated as before without paying a browser
+launch per test. The browser is recycled after N tests, when it has crashed, or
+when the browser process tree grows past a memory threshold. Given an endpoint,
+the pool connects to an already running browser over CDP instead of launching.
+
+The memory check sums the tree of the browser process alone: the Playwright
+driver and the async runner's browser are children of the worker too, so the
+browser is launched with a marker switch that finds its pid. Walking /proc is
+not free, so it runs every rss_check_every tests, and never for a browser the
+pool only connected to.
+"""
+import time
+import uuid
+from pathlib import Path
+
+RSS_CHECK_EVERY = 10
+
+
+def _process_tree_rss_mb(root_pid: int):
+    """Sum resident memory (MB) of root_pid and all its descendants. Linux only."""
+    proc = Path('/proc')
+    if not proc.exists():
+        return None
+    children = {}
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / 'stat').read_text()
+            # the command name may contain spaces, so split after the closing paren
+            ppid = int(stat.rsplit(')', 1)[1].split()[1])
+        except Exception:
+            continue
+        children.setdefault(ppid, []).append(int(entry.name))
+    total_kb = 0
+    stack = [root_pid]
+    while stack:
+        pid = stack.pop()
+        stack.extend(children.get(pid, []))
+        try:
+            for line in (proc / str(pid) / 'status').read_text().splitlines():
+                if line.startswith('VmRSS:'):
+                    total_kb += int(line.split()[1])
+                    break
+        except Exception:
+            continue
+    return total_kb / 1024
+
+
+def _pid_launched_with(arg: str):
+    """Pid of the process started with arg on its command line (the topmost one if children inherit it). Linux only."""
+    proc = Path('/proc')
+    if not proc.exists():
+        return None
+    found = {}
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            if arg.encode() not in (entry / 'cmdline').read_bytes().split(b'\0'):
+                continue
+            stat = (entry / 'stat').read_text()
+            found[int(entry.name)] = int(stat.rsplit(')', 1)[1].split()[1])
+        except Exception:
+            continue
+    return next((pid for pid, ppid in found.items() if ppid not in found), None)
+
+
+class BrowserPool:
+    def __init__(self, browser_type, recycle_after: int = 0, max_rss_mb: int = 0, launch_options: dict = None,
+                 endpoint: str = None, rss_check_every: int = RSS_CHECK_EVERY):
+        self.browser_type = browser_type
+        self.endpoint = endpoint
+        self.recycle_after = recycle_after
+        self.max_rss_mb = max_rss_mb
+        self.rss_check_every = max(rss_check_every, 1)
+        self.launch_options = launch_options or {}
+        # Chromium ignores switches it does not know; this one only tags our browser in /proc
+        self._marker = f"--sauce-browser-pool={uuid.uuid4().hex}"
+        self._browser = None
+        self._browser_pid = None
+        self._served = 0
+        self.stats = {
+            'recycle_after': recycle_after,
+            'tests': 0,
+            'launches': 0,
+            'launch_time': 0.0,
+            'close_time': 0.0,
+            'context_time': 0.0,
+            'recycled': {'limit': 0, 'crash': 0, 'memory': 0},
+            'rss_checks': 0,
+            'max_rss_mb': 0.0,
+        }
+
+    @property
+    def browser(self):
+        return self._browser
+
+    def _launch(self):
+        start = time.perf_counter()
+        if self.endpoint:
+            self._browser = self.browser_type.connect_over_cdp(self.endpoint)
+        else:
+            options = dict(self.launch_options)
+            options['args'] = list(options.get('args', [])) + [self._marker]
+            self._browser = self.browser_type.launch(**options)
+        self.stats['launch_time'] += time.perf_counter() - start
+        self.stats['launches'] += 1
+        self._browser_pid = None
+        self._served = 0
+
+    def _browser_rss_mb(self):
+        """RSS of the launched browser's process tree, or None when it cannot be measured."""
+        if self._browser_pid is None:
+            self._browser_pid = _pid_launched_with(self._marker)
+            if self._browser_pid is None:
+                return None
+        rss = _process_tree_rss_mb(self._browser_pid)
+        self.stats['rss_checks'] += 1
+        self.stats['max_rss_mb'] = max(self.stats['max_rss_mb'], round(rss or 0.0, 1))
+        return rss
+
+    def _recycle_reason(self):
+        if self._browser is None:
+            return None
+        if not self._browser.is_connected():
+            return 'crash'
+        if self.recycle_after and self._served >= self.recycle_after:
+            return 'limit'
+        # a browser we only connected to is not ours to measure or relaunch for memory
+        if self.max_rss_mb and not self.endpoint and self._served % self.rss_check_every == 0:
+            rss = self._browser_rss_mb()
+            if rss is not None and rss > self.max_rss_mb:
+                return 'memory'
+        return None
+
+    def acquire(self):
+        """Return a live browser, relaunching it first if the recycle policy says so."""
+        reason = self._recycle_reason()
+        if reason:
+            self.stats['recycled'][reason] += 1
+            self.close()
+        if self._browser is None:
+            self._launch()
+        self._served += 1
+        self.stats['tests'] += 1
+        return self._browser
+
+    def new_context(self, **kwargs):
+        browser = self.acquire()
+        start = time.perf_counter()
+        try:
+            context = browser.new_context(**kwargs)
+        except Exception:
+            # the browser died between the health check and now; relaunch once
+            if browser.is_connected():
+                raise
+            self.stats['recycled']['crash'] += 1
+            self.close()
+            self._launch()
+            self._served = 1
+            context = self._browser.new_context(**kwargs)
+        self.stats['context_time'] += time.perf_counter() - start
+        return context
+
+    def close(self):
+        if self._browser is None:
+            return
+        start = time.perf_counter()
+        try:
+            self._browser.close()
+        except Exception:
+            pass
+        self.stats['close_time'] += time.perf_counter() - start
+        self._browser = None
@@ -0,0 +1,251 @@
+"""
+What every test context gets, for the sync fixtures and the async runner alike.
+
+The conftest builds one ContextSetup per test. For each context the test opens,
+open() hands out the new_context() arguments (a video directory of its own
+when the video policy records); attach() routes the context -- HAR record or
+replay, or the request blocker -- and starts tracing; capture() takes the
+teardown screenshot and stops tracing as the policies say. attach() and
+capture() have async twins making the same Playwright calls for the contexts
+of AsyncBrowserRunner. capture() does not raise for a crashed page; it
+returns the errors so the caller can still close the context.
+
+Once every context is closed, finish() queues the test's files on the artifact
+pipeline -- screenshot written, discarded videos deleted, kept ones thumbnailed,
+everything deduplicated into the store -- and appends the test's manifest line.
+A test with several contexts keeps a video per context, and the screenshot and
+trace of the first context that failed (or else of the first one).
+"""
+import shutil
+import time
+import uuid
+from pathlib import Path
+
+from support.artifacts import append_manifest, path_size, should_keep, should_record
+from support.har import har_file_for
+from support.pipeline import video_thumbnail
+
+TRACING_OPTIONS = {"screenshots": True, "snapshots": True, "sources": True}
+
+
+class ContextSetup:
+    def __init__(self, nodeid: str, file: str, root: Path, attempt: int, policies: dict, stats, pipeline,
+                 manifest: Path, worker: str, store=None, run_id: str = "", har_record_dir: Path = None,
+                 router=None):
+        self.nodeid = nodeid
+        self.file = file
+        self.root = root
+        self.attempt = attempt
+        self.policies = policies
+        self.record = {kind: should_record(policy, attempt) for kind, policy in policies.items()}
+        self.stats = stats
+        self.pipeline = pipeline
+        self.manifest = manifest
+        self.worker = worker
+        self.store = store
+        self.run_id = run_id
+        # HAR record wants the full traffic; otherwise router is the HAR replay or the request blocker
+        self.har_record_dir = har_record_dir
+        self.router = router
+        self.videos_dir = root / "videos"
+        self.screenshots_dir = root / "screenshots"
+        self.logs_dir = root / "logs"
+        self.contexts = []
+        self.kept_videos = []
+
+    def keeps(self, kind: str, failed: bool) -> bool:
+        return should_keep(self.policies[kind], self.attempt, failed)
+
+    def _rel(self, p: Path):
+        try:
+            return str(p.relative_to(self.root))
+        except ValueError:
+            return str(p)
+
+    def open(self, part: str = None, storage_state=None) -> dict:
+        """Track a new context; its "args" go to new_context(). part names it among the test's contexts."""
+        uid = uuid.uuid4().hex[:8]
+        rec = {"id": uid, "part": part, "video_dir": self.videos_dir / uid, "args": {}, "tracing": False,
+               "failed": False, "png": None, "trace": None, "started": {}, "mask": [], "blocked": None}
+        if self.record["video"]:
+            rec["video_dir"].mkdir(parents=True, exist_ok=True)
+            rec["args"]["record_video_dir"] = str(rec["video_dir"])
+        if storage_state:
+            rec["args"]["storage_state"] = str(storage_state)
+        self.contexts.append(rec)
+        return rec
+
+    def _har_file(self, rec):
+        self.har_record_dir.mkdir(parents=True, exist_ok=True)
+        name = self.nodeid if rec["part"] is None else f"{self.nodeid}[{rec['part']}]"
+        return har_file_for(self.har_record_dir, name)
+
+    def attach(self, context, rec: dict):
+        if self.har_record_dir is not None:
+            context.route_from_har(self._har_file(rec), update=True, update_content="embed")
+        elif self.router is not None:
+            rec["blocked"] = self.router.attach(context)
+        if self.record["tracing"]:
+            context.tracing.start(**TRACING_OPTIONS)
+            rec["tracing"] = True
+
+    async def attach_async(self, context, rec: dict):
+        if self.har_record_dir is not None:
+            await context.route_from_har(self._har_file(rec), update=True, update_content="embed")
+        elif self.router is not None:
+            rec["blocked"] = await self.router.attach_async(context)
+        if self.record["tracing"]:
+            await context.tracing.start(**TRACING_OPTIONS)
+            rec["tracing"] = True
+
+    def _trace_path(self, rec):
+        # stopping without a path drops the trace instead of zipping it
+        return self.logs_dir / f"tracing_{rec['id']}.zip" if self.keeps("tracing", rec["failed"]) else None
+
+    def capture(self, context, page, rec: dict, failed: bool, masks=()) -> list:
+        """Take the screenshot and stop tracing as the policies say; returns the errors instead of raising."""
+        rec["failed"] = failed
+        rec["mask"] = list(masks)
+        errors = []
+        if page is not None and self.keeps("screenshot", failed):
+            rec["started"]["screenshot"] = time.perf_counter()
+            try:
+                rec["png"] = page.screenshot()
+            except Exception as e:
+                errors.append(e)
+        if rec["tracing"]:
+            path = self._trace_path(rec)
+            rec["started"]["tracing"] = time.perf_counter()
+            try:
+                context.tracing.stop(path=str(path) if path else None)
+                rec["trace"] = path
+            except Exception as e:
+                errors.append(e)
+        return errors
+
+    async def capture_async(self, context, page, rec: dict, failed: bool, masks=()) -> list:
+        rec["failed"] = failed
+        rec["mask"] = list(masks)
+        errors = []
+        if page is not None and self.keeps("screenshot", failed):
+            rec["started"]["screenshot"] = time.perf_counter()
+            try:
+                rec["png"] = await page.screenshot()
+            except Exception as e:
+                errors.append(e)
+        if rec["tracing"]:
+            path = self._trace_path(rec)
+            rec["started"]["tracing"] = time.perf_counter()
+            try:
+                await context.tracing.stop(path=str(path) if path else None)
+                rec["trace"] = path
+            except Exception as e:
+                errors.append(e)
+        return errors
+
+    def _video_job(self, rec, kept: list):
+        video_dir = rec["video_dir"]
+        if not self.record["video"]:
+            self.stats.skipped("video")
+            return None
+        if not self.keeps("video", rec["failed"]):
+            def discard_video(started=time.perf_counter()):
+                nbytes = path_size(video_dir)
+                shutil.rmtree(video_dir, ignore_errors=True)
+                self.stats.discarded("video", nbytes, started)
+            return discard_video
+        vids = [p for p in video_dir.rglob('*') if p.is_file()] if video_dir.exists() else []
+        kept.extend(vids)
+
+        def finish_video(started=time.perf_counter()):
+            for v in vids:
+                video_thumbnail(v)
+            self.stats.kept("video", video_dir, started)
+        return finish_video
+
+    def finish(self, failed: bool) -> dict:
+        """
+        Queue the files of every closed context and the test's manifest line;
+        returns the manifest entry as queued, and sets kept_videos.
+        """
+        primary = next((rec for rec in self.contexts if rec["failed"]), self.contexts[0] if self.contexts else None)
+        kept_paths = {"video": [], "trace": None, "screenshot": None}
+        jobs = []
+        for rec in self.contexts:
+            png, trace = rec.pop("png"), rec["trace"]
+            if png is None:
+                self.stats.skipped("screenshot")
+            elif rec is primary:
+                screenshot_path = self.screenshots_dir / f"snapshots_{rec['id']}.png"
+                self.stats.kept("screenshot", screenshot_path, rec["started"]["screenshot"], nbytes=len(png))
+                kept_paths["screenshot"] = screenshot_path
+                jobs.append(("screenshot", lambda p=screenshot_path, png=png: p.write_bytes(png)))
+            else:
+                self.stats.discarded("screenshot", len(png), rec["started"]["screenshot"])
+
+            if not rec["tracing"]:
+                self.stats.skipped("tracing")
+            elif trace is None:
+                self.stats.discarded("tracing", 0, rec["started"].get("tracing", time.perf_counter()))
+            elif rec is primary:
+                self.stats.kept("tracing", trace, rec["started"]["tracing"])
+                kept_paths["trace"] = trace
+            else:
+                def discard_trace(trace=trace, started=rec["started"]["tracing"]):
+                    nbytes = path_size(trace)
+                    trace.unlink(missing_ok=True)
+                    self.stats.discarded("tracing", nbytes, started)
+                jobs.append(("tracing", discard_trace))
+
+            job = self._video_job(rec, kept_paths["video"])
+            if job is not None:
+                jobs.append(("video", job))
+
+        blocked = [rec["blocked"] for rec in self.contexts if rec["blocked"] is not None]
+        # one manifest line per test links its artifacts to the nodeid for the runner
+        entry = {
+            "nodeid": self.nodeid,
+            "file": self.file,
+            "worker": self.worker,
+            "attempt": self.attempt,
+            "outcome": "failed" if failed else "passed",
+            "video": [self._rel(p) for p in kept_paths["video"]],
+            "trace": self._rel(kept_paths["trace"]) if kept_paths["trace"] else None,
+            "screenshot": self._rel(kept_paths["screenshot"]) if kept_paths["screenshot"] else None,
+            "mask": primary["mask"] if primary else [],
+            "blocked": {key: sum(b[key] for b in blocked) for key in blocked[0]} if blocked else None,
+        }
+        queued = dict(entry)
+        self.kept_videos = kept_paths["video"]
+
+        def index():
+            if self.store is not None:
+                # dedupe into the store; the working files become links to their blobs
+                # keyed from the repo root like the runner's session history
+                stored_as = f"{entry['file']}::{entry['nodeid'].split('::', 1)[-1]}"
+                entry["hashes"] = {"video": []}
+                for kind, paths in (("video", kept_paths["video"]), ("trace", [kept_paths["trace"]]),
+                                    ("screenshot", [kept_paths["screenshot"]])):
+                    for p in paths:
+                        digest = None
+                        if p is not None and p.exists():
+                            digest, _ = self.store.put(p)
+                            self.store.record(self.run_id, stored_as, kind, digest, p.suffix, path_size(p),
+                                              self.attempt)
+                        if kind == "video":
+                            # aligned with entry["video"]
+                            entry["hashes"]["video"].append(digest)
+                        elif digest:
+                            entry["hashes"][kind] = digest
+            entry["sizes"] = {
+                "video": sum(path_size(p) for p in kept_paths["video"]),
+                "trace": path_size(kept_paths["trace"]) if kept_paths["trace"] else 0,
+                "screenshot": path_size(kept_paths["screenshot"]) if kept_paths["screenshot"] else 0,
+            }
+            try:
+                append_manifest(self.manifest, entry)
+            except Exception as e:
+                print(f'Failed to append to {self.manifest}. Reason: {e}')
+        jobs.append(("index", index))
+        self.pipeline.submit(self.nodeid, jobs)
+        return queued
@@ -0,0 +1,81 @@
+"""
+Warm browser for local iteration.
+
+`runner.py daemon start` runs serve() in a background process: it launches
+Chromium once with a DevTools port, records the endpoint in session/daemon.json
+and keeps the browser up until `runner.py daemon stop`. Runs given
+--browser-endpoint connect to it over CDP instead of launching their own;
+closing the pool then only drops the connection and the contexts it made.
+
+Playwright for Python has no launch_server(), and `playwright run-server`
+starts a new browser per connection, so the CDP endpoint is what keeps the
+browser itself warm. It is Chromium only, like the browser pool.
+"""
+import json
+import os
+import signal
+import socket
+import time
+import urllib.request
+from pathlib import Path
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def endpoint_alive(endpoint: str, timeout: float = 0.5) -> bool:
+    try:
+        with urllib.request.urlopen(f"{endpoint}/json/version", timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def read_state(state_file: Path):
+    """The running daemon's state ({pid, endpoint, ...}), or None when there is none."""
+    try:
+        state = json.loads(Path(state_file).read_text())
+        os.kill(state["pid"], 0)
+    except (OSError, ValueError, KeyError):
+        return None
+    return state if endpoint_alive(state["endpoint"]) else None
+
+
+def serve(state_file: Path, headless: bool = True, port: int = 0):
+    from playwright.sync_api import sync_playwright
+
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+    port = port or _free_port()
+    endpoint = f"http://127.0.0.1:{port}"
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=headless, args=[f"--remote-debugging-port={port}"])
+        try:
+            while not endpoint_alive(endpoint):
+                time.sleep(0.05)
+            Path(state_file).write_text(json.dumps({
+                "pid": os.getpid(), "endpoint": endpoint, "browser": "chromium",
+                "version": browser.version, "started": time.time(),
+            }))
+            print(f"Chromium {browser.version} listening at {endpoint}", flush=True)
+            while not stopping and endpoint_alive(endpoint):
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            Path(state_file).unlink(missing_ok=True)
+            browser.close()
+
+
+def stop(state_file: Path, timeout: float = 10.0) -> bool:
+    state = read_state(state_file)
+    if state is None:
+        return False
+    os.kill(state["pid"], signal.SIGTERM)
+    deadline = time.time() + timeout
+    while Path(state_file).exists() and time.time() < deadline:
+        time.sleep(0.1)
+    return True
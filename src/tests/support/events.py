@@ -0,0 +1,266 @@
+"""
+Live per-test event stream.
+
+With --events the conftest registers EventStreamPlugin on the process that
+sees every report -- the xdist controller, or the only process without -n --
+and it writes one JSON line per event as tests run:
+
+    {"event": "session_start", "total": 120, "nodeids": [...], "rootdir": "...", "time": ...}
+    {"event": "start", "nodeid": ..., "time": ...}
+    {"event": "rerun", "nodeid": ..., "worker": "gw1", "attempt": 0, "duration": ...}
+    {"event": "finish", "nodeid": ..., "worker": "gw1", "outcome": "failed", "duration": 3.2,
+     "artifacts": {"video": [...], "trace": ..., "screenshot": ...}, "time": ...}
+    {"event": "session_finish", "exitstatus": 1, "time": ...}
+
+--events takes a file path (JSONL, appended) or tcp://host:port, where
+EventListener -- what runner.py starts -- reads the lines as they come.
+ResultFeed folds the events into the counts, failures, verdicts and video
+links the runner used to rebuild from the JUnit file after the run.
+"""
+import json
+import socket
+import socketserver
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from support.workers import worker_id
+
+
+class EventSink:
+    def __init__(self, spec: str):
+        self.spec = spec
+        self._sock = None
+        if spec.startswith("tcp://"):
+            host, port = spec[len("tcp://"):].rsplit(":", 1)
+            self._sock = socket.create_connection((host, int(port)), timeout=10)
+            self._fh = self._sock.makefile("w", encoding="utf-8")
+        else:
+            Path(spec).parent.mkdir(parents=True, exist_ok=True)
+            self._fh = open(spec, "a", encoding="utf-8")
+
+    def emit(self, event: dict):
+        if self._fh is None:
+            return
+        try:
+            self._fh.write(json.dumps(event, separators=(",", ":")) + "\n")
+            self._fh.flush()
+        except OSError as e:
+            # a dashboard that went away must not fail the run
+            print(f"Event stream {self.spec} closed. Reason: {e}")
+            self._fh = None
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        if self._sock is not None:
+            self._sock.close()
+
+
+def _outcome(reports):
+    for rep in reports:
+        if rep.failed:
+            if rep.when != "call":
+                return "error"
+            return "xpassed" if hasattr(rep, "wasxfail") else "failed"
+    for rep in reports:
+        if rep.skipped:
+            return "xfailed" if hasattr(rep, "wasxfail") else "skipped"
+    return "passed"
+
+
+class EventStreamPlugin:
+    def __init__(self, sink: EventSink):
+        self.sink = sink
+        self._reports = {}
+        self._announced = False
+
+    def _session_start(self, config, nodeids):
+        if not self._announced:
+            self._announced = True
+            self.sink.emit({"event": "session_start", "total": len(nodeids), "nodeids": list(nodeids),
+                            "rootdir": str(config.rootpath), "time": time.time()})
+
+    def pytest_collection_finish(self, session):
+        # under xdist the controller collects nothing; the workers' collection is reported below
+        if session.items or not session.config.pluginmanager.hasplugin("dsession"):
+            self._session_start(session.config, [item.nodeid for item in session.items])
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_xdist_node_collection_finished(self, node, ids):
+        self._session_start(node.config, ids)
+
+    def pytest_runtest_logstart(self, nodeid, location):
+        self.sink.emit({"event": "start", "nodeid": nodeid, "time": time.time()})
+
+    def pytest_runtest_logreport(self, report):
+        worker = getattr(report, "worker_id", None) or worker_id()
+        if report.outcome == "rerun":
+            self.sink.emit({"event": "rerun", "nodeid": report.nodeid, "worker": worker,
+                            "attempt": getattr(report, "rerun", 0), "duration": report.duration,
+                            "time": time.time()})
+            return
+        self._reports.setdefault(report.nodeid, []).append(report)
+
+    def pytest_runtest_logfinish(self, nodeid, location):
+        reports = self._reports.pop(nodeid, [])
+        if not reports:
+            return
+        teardown = next((r for r in reports if r.when == "teardown"), None)
+        self.sink.emit({
+            "event": "finish",
+            "nodeid": nodeid,
+            "worker": getattr(reports[0], "worker_id", None) or worker_id(),
+            "outcome": _outcome(reports),
+            "duration": sum(r.duration for r in reports),
+            "attempts": dict(reports[-1].user_properties).get("attempts"),
+            "artifacts": getattr(teardown, "artifacts", None),
+            "time": time.time(),
+        })
+
+    def pytest_sessionfinish(self, session, exitstatus):
+        self.sink.emit({"event": "session_finish", "exitstatus": int(exitstatus), "time": time.time()})
+
+    def pytest_unconfigure(self, config):
+        self.sink.close()
+
+
+class _LineHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            self.server.on_event(event)
+
+
+class EventListener:
+    """Local TCP endpoint for --events=tcp://...; on_event is called once per event, in order per connection."""
+
+    def __init__(self, on_event, host: str = "127.0.0.1", port: int = 0):
+        self._server = socketserver.ThreadingTCPServer((host, port), _LineHandler)
+        # stop() waits for every connection to be read to the end
+        self._server.daemon_threads = False
+        self._server.block_on_close = True
+        lock = threading.Lock()
+
+        def locked(event):
+            with lock:
+                on_event(event)
+        self._server.on_event = locked
+        self._thread = None
+
+    @property
+    def spec(self):
+        host, port = self._server.server_address[:2]
+        return f"tcp://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="event-listener", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+
+class ResultFeed:
+    """
+    Running totals built from the event stream: what the runner used to
+    re-derive from the JUnit file, available while the run is still going.
+    Nodeids are turned root-relative (src/tests/...) with the session's rootdir.
+    """
+
+    def __init__(self, repo_root: Path):
+        self.repo_root = repo_root
+        self.rootdir = None
+        self.total = None
+        self.collected = []
+        self.started = time.time()
+        self.finished_at = None
+        self.counts = {}
+        self.running = {}
+        self.results = []
+        self.reruns = {}
+
+    def root_nodeid(self, nodeid):
+        path, sep, rest = nodeid.partition("::")
+        if self.rootdir is not None:
+            try:
+                path = (self.rootdir / path).resolve().relative_to(self.repo_root.resolve()).as_posix()
+            except ValueError:
+                pass
+        return path + sep + rest
+
+    def feed(self, event: dict):
+        kind = event.get("event")
+        if kind == "session_start":
+            self.total = event.get("total")
+            self.collected = event.get("nodeids") or []
+            self.started = event.get("time", self.started)
+            self.rootdir = Path(event["rootdir"]) if event.get("rootdir") else None
+        elif kind == "start":
+            self.running[event["nodeid"]] = event.get("time", time.time())
+        elif kind == "rerun":
+            self.reruns.setdefault(event["nodeid"], []).append(event)
+        elif kind == "finish":
+            self.running.pop(event["nodeid"], None)
+            self.counts[event["outcome"]] = self.counts.get(event["outcome"], 0) + 1
+            self.results.append(event)
+        elif kind == "session_finish":
+            self.finished_at = event.get("time", time.time())
+
+    @property
+    def done(self):
+        return len(self.results)
+
+    def stats(self):
+        """Same shape as parse_junit(): passed / failed (incl. errors) / skipped and one entry per test."""
+        stats = {"passed": 0, "failed": 0, "skipped": 0, "tests": [], "duration": 0.0}
+        for r in self.results:
+            status = {"error": "failed", "xpassed": "failed", "xfailed": "skipped"}.get(r["outcome"], r["outcome"])
+            stats[status] += 1
+            stats["duration"] += r["duration"]
+            stats["tests"].append({"nodeid": self.root_nodeid(r["nodeid"]), "classname": None,
+                                   "name": r["nodeid"].rsplit("::", 1)[-1], "time": r["duration"],
+                                   "file": None, "status": status})
+        return stats
+
+    def failed_nodeids(self):
+        return [self.root_nodeid(r["nodeid"]) for r in self.results if r["outcome"] in ("failed", "error")]
+
+    def not_run(self):
+        """Collected tests that never finished, e.g. after --maxfail stopped the session."""
+        finished = {r["nodeid"] for r in self.results}
+        return [self.root_nodeid(n) for n in self.collected if n not in finished]
+
+    def final(self):
+        """Same shape as merge_junit_results(): flaky = failed at least once, then passed."""
+        merged = {"passed": 0, "failed": 0, "flaky": 0, "skipped": 0, "duration": 0.0, "verdicts": {}}
+        for r in self.results:
+            merged["duration"] += r["duration"]
+            status = {"error": "failed", "xpassed": "failed", "xfailed": "skipped"}.get(r["outcome"], r["outcome"])
+            attempts = (r.get("attempts") or "").split(",") if r.get("attempts") else [status]
+            if status == "passed" and (r["nodeid"] in self.reruns or "failed" in attempts):
+                status = "flaky"
+            merged[status] += 1
+            if status != "passed":
+                nodeid = self.root_nodeid(r["nodeid"])
+                merged["verdicts"][nodeid] = {"nodeid": nodeid, "status": status, "attempts": attempts}
+        return merged
+
+    def videos_map(self):
+        """nodeid (as pytest-html keys it) -> absolute video paths, from the finish events."""
+        mapping = {}
+        for r in self.results:
+            videos = (r.get("artifacts") or {}).get("video")
+            if videos:
+                mapping[r["nodeid"]] = [str(self.repo_root / v) for v in videos]
+        return mapping
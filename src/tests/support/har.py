@@ -0,0 +1,88 @@
+"""
+HAR record/replay for test contexts.
+
+record: every test context records the traffic it sees into
+        <har_dir>/<test>.har (Playwright's route_from_har in update mode).
+replay: all recorded HAR files are loaded once per worker into an in-memory
+        (method, url) -> response index and served through context.route, so
+        nothing leaves the machine.
+
+Sync and async contexts are routed alike: attach() for the sync API,
+attach_async() for the async runner's contexts.
+"""
+import base64
+import json
+import re
+from pathlib import Path
+
+# headers that describe the on-the-wire body and no longer apply once we fulfill decoded content
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+def har_file_for(har_dir: Path, nodeid: str) -> Path:
+    return har_dir / (re.sub(r"[^A-Za-z0-9_.-]+", "_", nodeid).strip("_") + ".har")
+
+
+def _strip_fragment(url: str) -> str:
+    return url.split("#", 1)[0]
+
+
+class HarReplay:
+    def __init__(self, har_dir: Path, not_found: str = "abort"):
+        self.not_found = not_found
+        self.entries = {}
+        self.stats = {"hits": 0, "misses": 0}
+        for har in sorted(Path(har_dir).glob("*.har")):
+            self._load(har)
+
+    def _load(self, har: Path):
+        try:
+            log = json.loads(har.read_text(encoding="utf-8"))["log"]
+        except Exception as e:
+            print(f"Skipping unreadable HAR {har}. Reason: {e}")
+            return
+        for entry in log.get("entries", []):
+            req, resp = entry["request"], entry["response"]
+            content = resp.get("content", {})
+            text = content.get("text", "")
+            if content.get("encoding") == "base64":
+                body = base64.b64decode(text)
+            else:
+                body = text.encode("utf-8")
+            headers = {h["name"]: h["value"] for h in resp.get("headers", [])
+                       if h["name"].lower() not in _DROP_HEADERS}
+            self.entries[(req["method"], _strip_fragment(req["url"]))] = (resp.get("status", 200), headers, body)
+
+    def lookup(self, request):
+        """The recorded (status, headers, body) for a request, or None; counts hits and misses."""
+        hit = self.entries.get((request.method, _strip_fragment(request.url)))
+        self.stats["misses" if hit is None else "hits"] += 1
+        return hit
+
+    def handle(self, route):
+        hit = self.lookup(route.request)
+        if hit is None:
+            if self.not_found == "fallback":
+                route.continue_()
+            else:
+                route.abort()
+            return
+        status, headers, body = hit
+        route.fulfill(status=status, headers=headers, body=body)
+
+    async def handle_async(self, route):
+        hit = self.lookup(route.request)
+        if hit is None:
+            if self.not_found == "fallback":
+                await route.continue_()
+            else:
+                await route.abort()
+            return
+        status, headers, body = hit
+        await route.fulfill(status=status, headers=headers, body=body)
+
+    def attach(self, context):
+        context.route("**/*", self.handle)
+
+    async def attach_async(self, context):
+        await context.route("**/*", self.handle_async)
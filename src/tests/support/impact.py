@@ -0,0 +1,180 @@
+"""
+Which tests an edit can affect, from the imports under src/tests.
+
+Every .py file under the tests directory is a module named the way the tests
+import it (test_login, pages.Cart, support.auth, ...). ImportGraph reads each
+file's imports with ast and follows them transitively, so an edit to
+pages/Checkout.py reaches every test that imports a page object chaining to
+Checkout (Loginpage -> Inventory -> Cart -> Checkout).
+
+Tests never import their conftest. Editing a conftest.py, or a support module
+it imports, affects every test below it; page objects a conftest uses are
+charged only to the tests requesting a fixture that reaches them, through the
+fixtures and helpers it calls, so a Checkout edit does not rerun the suite.
+
+With a cache file the parsed imports are kept between runs and a file is only
+parsed again when its mtime changed.
+"""
+import ast
+import json
+from pathlib import Path
+
+TEST_GLOB = "test_*.py"
+PAGES_PACKAGE = "pages"
+
+
+def module_name(path: Path, root: Path) -> str:
+    rel = path.relative_to(root).with_suffix("")
+    parts = list(rel.parts)
+    if parts[-1] == "__init__":
+        parts.pop()
+    return ".".join(parts)
+
+
+def _is_page(module: str) -> bool:
+    return module.split(".", 1)[0] == PAGES_PACKAGE
+
+
+def _scan(source: str):
+    """
+    What the graph needs from one file: the dotted names it imports, the
+    arguments of its test functions (the fixtures they request) and, per
+    top-level function, the page modules it reaches through names it uses
+    or other top-level functions (fixtures, helpers) it refers to.
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return {"imports": [], "fixtures_used": [], "function_pages": {}}
+    imports, local_modules = set(), {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            imports.add(node.module)
+            for alias in node.names:
+                imports.add(f"{node.module}.{alias.name}")
+                local_modules[alias.asname or alias.name] = node.module
+    functions = {n.name: n for n in tree.body if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))}
+    refs = {}
+    for name, fn in functions.items():
+        used = {n.id for n in ast.walk(fn) if isinstance(n, ast.Name)}
+        used.update(a.arg for a in fn.args.args)
+        refs[name] = used
+    function_pages = {}
+    for name in functions:
+        seen, stack = {name}, [name]
+        while stack:
+            for ref in refs.get(stack.pop(), ()):
+                if ref in functions and ref not in seen:
+                    seen.add(ref)
+                    stack.append(ref)
+        pages = {local_modules[r] for fn in seen for r in refs[fn] if r in local_modules}
+        pages = sorted(m for m in pages if _is_page(m))
+        if pages:
+            function_pages[name] = pages
+    fixtures_used = sorted({a.arg for name, fn in functions.items() if name.startswith("test")
+                            for a in fn.args.args})
+    return {"imports": sorted(imports), "fixtures_used": fixtures_used, "function_pages": function_pages}
+
+
+class ImportGraph:
+    def __init__(self, root: Path, cache_file: Path = None):
+        self.root = Path(root)
+        self.cache_file = cache_file
+        self.modules = {}
+        self.imports = {}
+        self.stats = {"files": 0, "parsed": 0}
+        self._scans = {}
+        if cache_file is not None:
+            try:
+                cached = json.loads(Path(cache_file).read_text())
+                if cached.get("root") == str(self.root.resolve()):
+                    self._scans = cached.get("files", {})
+            except (OSError, ValueError):
+                pass
+
+    def _files(self):
+        return [p for p in self.root.rglob("*.py") if "__pycache__" not in p.parts]
+
+    def _scan_file(self, path: Path):
+        key = path.relative_to(self.root).as_posix()
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            return {"imports": [], "fixtures_used": [], "function_pages": {}}
+        entry = self._scans.get(key)
+        if entry is None or entry.get("mtime") != mtime:
+            try:
+                source = path.read_text(encoding="utf-8")
+            except OSError:
+                source = ""
+            entry = dict(_scan(source), mtime=mtime)
+            self._scans[key] = entry
+            self.stats["parsed"] += 1
+        return entry
+
+    def build(self):
+        """(Re)build the graph, parsing only files that are new or changed since the last build."""
+        files = self._files()
+        self.modules = {module_name(p, self.root): p for p in files}
+        live = {p.relative_to(self.root).as_posix() for p in files}
+        self._scans = {k: v for k, v in self._scans.items() if k in live}
+        self.stats = {"files": len(files), "parsed": 0}
+        scans = {name: self._scan_file(path) for name, path in self.modules.items()}
+
+        conftests = {name: path for name, path in self.modules.items() if path.name == "conftest.py"}
+        self.imports = {}
+        for name, scan in scans.items():
+            path = self.modules[name]
+            deps = {n for n in scan["imports"] if n in self.modules}
+            if name in conftests:
+                deps = {n for n in deps if not _is_page(n)}
+            elif path.match(TEST_GLOB):
+                for conftest_name, conftest in conftests.items():
+                    if conftest.parent in path.parents:
+                        fixture_pages = scans[conftest_name]["function_pages"]
+                        for fixture in scan["fixtures_used"]:
+                            deps.update(m for m in fixture_pages.get(fixture, ()) if m in self.modules)
+            self.imports[name] = deps
+        if self.cache_file is not None:
+            try:
+                Path(self.cache_file).write_text(json.dumps({"root": str(self.root.resolve()), "files": self._scans}))
+            except OSError as e:
+                print(f"Could not write import graph cache {self.cache_file}. Reason: {e}")
+        return self
+
+    def dependents(self, changed_modules):
+        """The changed modules plus every module that imports one of them, directly or not."""
+        importers = {}
+        for name, deps in self.imports.items():
+            for dep in deps:
+                importers.setdefault(dep, set()).add(name)
+        seen = set(changed_modules)
+        stack = list(changed_modules)
+        while stack:
+            for importer in importers.get(stack.pop(), ()):
+                if importer not in seen:
+                    seen.add(importer)
+                    stack.append(importer)
+        return seen
+
+    def module_for(self, path):
+        """Module name of a file in the graph, or None for anything outside it."""
+        try:
+            name = module_name(Path(path).resolve(), self.root.resolve())
+        except ValueError:
+            return None
+        return name if name in self.modules else None
+
+    def affected_tests(self, changed_paths):
+        """Test files under root that can be affected by edits to changed_paths."""
+        changed = {m for m in map(self.module_for, changed_paths) if m is not None}
+        hit = self.dependents(changed)
+        tests = {p for p in self.modules.values() if p.match(TEST_GLOB)}
+        affected = {t for t in tests if module_name(t, self.root) in hit}
+        for name in hit:
+            path = self.modules[name]
+            if path.name == "conftest.py":
+                affected.update(t for t in tests if path.parent in t.parents)
+        return sorted(affected)
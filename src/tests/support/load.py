@@ -0,0 +1,140 @@
+"""
+Virtual-user load generator built on the async page objects.
+
+Every virtual user loops over the test_placeorder journey (login, add to cart,
+open cart, checkout details, finish) in a fresh BrowserContext of one shared
+browser until the test duration is over. Users start evenly spread over the
+ramp-up, and an optional target rate caps how many journeys start per second
+across all of them. Each page-object step is timed from the action until the
+next page shows its landmark, so the latencies are what a user would wait.
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+from playwright.async_api import async_playwright, expect
+
+from pages.aio.LoginPage import Loginpage
+from support.stats import percentile
+
+STEPS = ("login", "add_to_cart", "open_cart", "checkout_details", "finish")
+
+
+class LoadStats:
+    def __init__(self):
+        self.latencies = {step: [] for step in STEPS}
+        self.journeys = 0
+        self.failed = 0
+        self.errors = {}
+        self.started = None
+        self.finished = None
+
+    @asynccontextmanager
+    async def step(self, name):
+        started = time.perf_counter()
+        yield
+        self.latencies[name].append(time.perf_counter() - started)
+
+    def failure(self, error):
+        self.failed += 1
+        key = f"{type(error).__name__}: {str(error).splitlines()[0] if str(error) else ''}"[:200]
+        self.errors[key] = self.errors.get(key, 0) + 1
+
+    def summary(self):
+        elapsed = (self.finished or time.perf_counter()) - (self.started or time.perf_counter())
+        steps = {}
+        for name, values in self.latencies.items():
+            values = sorted(values)
+            steps[name] = {
+                'count': len(values),
+                'throughput': round(len(values) / elapsed, 3) if elapsed else 0.0,
+                'p50': percentile(values, 50),
+                'p95': percentile(values, 95),
+                'p99': percentile(values, 99),
+                'max': values[-1] if values else None,
+            }
+        return {
+            'elapsed': round(elapsed, 3),
+            'journeys': self.journeys,
+            'failed': self.failed,
+            'throughput': round(self.journeys / elapsed, 3) if elapsed else 0.0,
+            'steps': steps,
+            'errors': self.errors,
+        }
+
+
+async def place_order(page, stats, product_name="Sauce Labs Onesie", user="standard_user"):
+    """The test_placeorder journey, one timed step per page-object action."""
+    async with stats.step("login"):
+        inventory = await Loginpage(page).do_login({"username": user, "password": "secret_sauce"})
+        await expect(inventory.inventory_header).to_contain_text("Products")
+    async with stats.step("add_to_cart"):
+        await inventory.click_addremove_to_cart(product_name)
+        await expect(inventory.get_addremove_to_cart_btn(product_name)).to_contain_text("Remove")
+    async with stats.step("open_cart"):
+        cart_page = await inventory.click_cart_btn()
+        await expect(cart_page.get_cart_product_text()).to_contain_text(product_name)
+    async with stats.step("checkout_details"):
+        checkout_page = await cart_page.click_on_checkout()
+        await checkout_page.enter_checkout_details("prashant", "singh", "12345678").click_checkout_continue()
+        await expect(checkout_page.get_checkout_overview()).to_contain_text("Checkout: Overview")
+    async with stats.step("finish"):
+        await checkout_page.click_checkout_finish_btn()
+        await expect(checkout_page.get_checkout_sucess()).to_contain_text("Thank you for your order!")
+
+
+class LoadRunner:
+    def __init__(self, base_url: str, users: int = 10, ramp_up: float = 0.0, duration: float = 60.0,
+                 rate: float = 0.0, browser_name: str = "chromium", journey=place_order):
+        self.base_url = base_url
+        self.users = users
+        self.ramp_up = ramp_up
+        self.duration = duration
+        self.rate = rate
+        self.browser_name = browser_name
+        self.journey = journey
+        self.stats = LoadStats()
+        self._next_start = 0.0
+
+    async def _pace(self):
+        # one shared schedule of start slots, 1/rate apart, for all users
+        if not self.rate:
+            return
+        now = time.perf_counter()
+        slot = max(now, self._next_start)
+        self._next_start = slot + 1.0 / self.rate
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def _user(self, browser, index, deadline):
+        if self.users > 1 and self.ramp_up:
+            await asyncio.sleep(self.ramp_up * index / self.users)
+        while True:
+            await self._pace()
+            if time.perf_counter() >= deadline:
+                return
+            context = await browser.new_context()
+            try:
+                page = await context.new_page()
+                await page.goto(self.base_url)
+                await self.journey(page, self.stats)
+                self.stats.journeys += 1
+            except Exception as e:
+                self.stats.failure(e)
+            finally:
+                await context.close()
+
+    async def _run(self):
+        async with async_playwright() as playwright:
+            browser = await getattr(playwright, self.browser_name).launch()
+            try:
+                self.stats.started = time.perf_counter()
+                deadline = self.stats.started + self.ramp_up + self.duration
+                await asyncio.gather(*(self._user(browser, i, deadline) for i in range(self.users)))
+                self.stats.finished = time.perf_counter()
+            finally:
+                await browser.close()
+
+    def run(self):
+        asyncio.run(self._run())
+        return self.stats.summary()
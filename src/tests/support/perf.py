@@ -0,0 +1,113 @@
+"""
+Front-end performance samples for every page a test visits.
+
+PERF_SCRIPT is added as an init script to the test's context. It watches LCP
+and layout shifts, and whenever the document is left -- a full navigation
+(pagehide) or a client-side route change (history.pushState) -- it stores a
+sample for the page being left in sessionStorage, so it survives the
+transition. At teardown PerfRecorder.collect() reads the stored samples plus
+one for the current page and files them by page name.
+
+Each sample holds Navigation Timing (ttfb, dom_content_loaded, load; full
+navigations only), Resource Timing since the page was entered (resources,
+resource_bytes, resource_time), lcp, cls and heap_mb (Chromium only).
+"""
+from urllib.parse import urlparse
+
+METRICS = ("ttfb", "dom_content_loaded", "load", "lcp", "cls", "resources", "resource_bytes", "resource_time",
+           "heap_mb")
+
+PERF_SCRIPT = """
+(() => {
+  if (window.__perfCollect) return;
+  const KEY = '__perf_samples';
+  let lcp = null, cls = 0, mark = 0;
+  try {
+    new PerformanceObserver(list => {
+      for (const e of list.getEntries()) lcp = e.renderTime || e.loadTime || e.startTime;
+    }).observe({type: 'largest-contentful-paint', buffered: true});
+  } catch (e) {}
+  try {
+    new PerformanceObserver(list => {
+      for (const e of list.getEntries()) if (!e.hadRecentInput) cls += e.value;
+    }).observe({type: 'layout-shift', buffered: true});
+  } catch (e) {}
+
+  function sample() {
+    const res = performance.getEntriesByType('resource').filter(r => r.startTime >= mark);
+    const s = {
+      url: location.href, lcp: lcp, cls: cls,
+      resources: res.length,
+      resource_bytes: res.reduce((a, r) => a + (r.transferSize || 0), 0),
+      resource_time: res.reduce((a, r) => Math.max(a, r.duration), 0),
+      heap_mb: performance.memory ? performance.memory.usedJSHeapSize / 1048576 : null
+    };
+    const nav = performance.getEntriesByType('navigation')[0];
+    if (nav && mark === 0) {
+      s.ttfb = nav.responseStart - nav.startTime;
+      s.dom_content_loaded = nav.domContentLoadedEventEnd > 0 ? nav.domContentLoadedEventEnd - nav.startTime : null;
+      s.load = nav.loadEventEnd > 0 ? nav.loadEventEnd - nav.startTime : null;
+    }
+    return s;
+  }
+  function stored() {
+    try { return JSON.parse(sessionStorage.getItem(KEY)) || []; } catch (e) { return []; }
+  }
+  function save(s) {
+    const all = stored();
+    all.push(s);
+    sessionStorage.setItem(KEY, JSON.stringify(all));
+  }
+
+  window.addEventListener('pagehide', () => save(sample()));
+  const push = history.pushState;
+  history.pushState = function () {
+    save(sample());
+    const result = push.apply(this, arguments);
+    mark = performance.now();
+    lcp = null;
+    cls = 0;
+    return result;
+  };
+  window.__perfCollect = () => {
+    const all = stored();
+    all.push(sample());
+    sessionStorage.removeItem(KEY);
+    return all;
+  };
+})();
+"""
+
+
+def page_name(url: str) -> str:
+    """'login' for the site root, else the last path segment without extension (inventory, cart, ...)."""
+    path = urlparse(url).path.rstrip("/")
+    stem = path.rsplit("/", 1)[-1].split(".", 1)[0]
+    return "login" if stem in ("", "index") else stem
+
+
+class PerfRecorder:
+    def __init__(self):
+        self.samples = {}
+        self.stats = {'tests': 0, 'samples': 0, 'errors': 0}
+
+    def add(self, sample: dict):
+        metrics = self.samples.setdefault(page_name(sample.get("url", "")), {})
+        for m in METRICS:
+            value = sample.get(m)
+            if value is not None:
+                metrics.setdefault(m, []).append(round(value, 3))
+        self.stats['samples'] += 1
+
+    def collect(self, page):
+        """Read every sample the page stored since the context started; never fails the test."""
+        self.stats['tests'] += 1
+        try:
+            samples = page.evaluate("() => window.__perfCollect ? window.__perfCollect() : []")
+        except Exception as e:
+            print(f"Could not collect perf metrics. Reason: {e}")
+            self.stats['errors'] += 1
+            return []
+        for sample in samples:
+            self.add(sample)
+        return samples
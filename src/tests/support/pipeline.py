@@ -0,0 +1,97 @@
+"""
+Background post-processing of per-test artifacts.
+
+Playwright's sync API has to be driven from the test's own thread, so the
+teardown still takes the screenshot, stops tracing and closes the context
+(which finalizes the video). Everything after that -- writing the screenshot
+bytes, deleting discarded videos, thumbnailing kept ones, measuring sizes and
+appending the manifest line -- is handed to ArtifactPipeline as one job per
+test and runs on a small per-worker thread pool while the next test starts.
+
+The queue is bounded: when max_pending jobs are waiting, submit() blocks the
+test until one finishes, so a slow disk cannot pile up unbounded work. drain()
+waits for every job; the conftest calls it when the worker's session ends,
+before pytest exits and the runner builds its reports. With workers=0 jobs run
+inline, as they did before.
+"""
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+THUMBNAIL_WIDTH = 320
+
+
+def video_thumbnail(video: Path, ffmpeg: str = None):
+    """Write <video>.jpg from the video's first frame with a system ffmpeg; None when there is none."""
+    ffmpeg = ffmpeg or shutil.which("ffmpeg")
+    if not ffmpeg:
+        return None
+    out = video.with_suffix(".jpg")
+    subprocess.run([ffmpeg, "-y", "-loglevel", "error", "-i", str(video), "-frames:v", "1",
+                    "-vf", f"scale={THUMBNAIL_WIDTH}:-2", str(out)], check=True, timeout=30)
+    return out
+
+
+class ArtifactPipeline:
+    def __init__(self, workers: int = 2, max_pending: int = 32):
+        self.workers = workers
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="artifacts") if workers > 0 else None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._depth = 0
+        self.stats = {'jobs': 0, 'failed': 0, 'max_depth': 0, 'blocked_time': 0.0, 'wait_time': 0.0,
+                      'max_wait': 0.0, 'drain_time': 0.0, 'stages': {}}
+
+    def _record_stage(self, stage, elapsed):
+        with self._lock:
+            s = self.stats['stages'].setdefault(stage, {'count': 0, 'time': 0.0, 'max': 0.0})
+            s['count'] += 1
+            s['time'] += elapsed
+            s['max'] = max(s['max'], elapsed)
+
+    def _run(self, label, stages, enqueued, pooled=False):
+        waited = time.perf_counter() - enqueued
+        with self._lock:
+            self.stats['wait_time'] += waited
+            self.stats['max_wait'] = max(self.stats['max_wait'], waited)
+        try:
+            for stage, fn in stages:
+                started = time.perf_counter()
+                try:
+                    fn()
+                except Exception as e:
+                    with self._lock:
+                        self.stats['failed'] += 1
+                    print(f"Artifact {stage} for {label} failed. Reason: {e}")
+                self._record_stage(stage, time.perf_counter() - started)
+        finally:
+            with self._lock:
+                self._depth -= 1
+            if pooled:
+                self._slots.release()
+
+    def submit(self, label: str, stages):
+        """Queue one test's stages, a list of (stage name, callable) run in order."""
+        if self._pool is not None:
+            started = time.perf_counter()
+            self._slots.acquire()
+            self.stats['blocked_time'] += time.perf_counter() - started
+        with self._lock:
+            self.stats['jobs'] += 1
+            self._depth += 1
+            self.stats['max_depth'] = max(self.stats['max_depth'], self._depth)
+        if self._pool is None:
+            self._run(label, stages, time.perf_counter())
+        else:
+            self._pool.submit(self._run, label, stages, time.perf_counter(), True)
+
+    def drain(self):
+        if self._pool is None:
+            return
+        started = time.perf_counter()
+        self._pool.shutdown(wait=True)
+        self._pool = None
+        self.stats['drain_time'] = time.perf_counter() - started
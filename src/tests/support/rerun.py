@@ -0,0 +1,69 @@
+"""
+In-session reruns of failed tests.
+
+A test whose setup or call fails is run again straight away on the same worker,
+up to --retry-failed times, waiting --retry-backoff seconds before the first
+rerun and twice as long before each one after it. Session fixtures (the browser
+pool, the auth cache) stay warm; only the test's own function fixtures are torn
+down and set up again.
+
+Failed attempts are reported with outcome "rerun", which pytest-html shows as
+reruns, and the final reports carry an ``attempts`` user property
+(e.g. ``failed,passed``) that ends up in the JUnit XML.
+"""
+import time
+
+import pytest
+from _pytest.runner import runtestprotocol
+
+
+def _attempt_failed(reports):
+    # a failing teardown alone does not make the test body worth another try
+    return any(r.failed for r in reports if r.when in ("setup", "call"))
+
+
+def _attempt_outcome(reports):
+    if _attempt_failed(reports):
+        return "failed"
+    if any(r.skipped for r in reports if r.when in ("setup", "call")):
+        return "skipped"
+    return "passed"
+
+
+class RerunPlugin:
+    """Registered by the conftest when --retry-failed is above zero."""
+
+    def __init__(self, retries: int, backoff: float = 0.0):
+        self.retries = retries
+        self.backoff = backoff
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+        item.ihook.pytest_runtest_logstart(nodeid=item.nodeid, location=item.location)
+        outcomes = []
+        for attempt in range(self.retries + 1):
+            item._rerun_attempt = attempt
+            last = attempt == self.retries
+            # between attempts tear down only the test's own fixtures, keeping its module and session warm
+            reports = runtestprotocol(item, nextitem=nextitem if last else item.parent, log=False)
+            outcomes.append(_attempt_outcome(reports))
+            if last or not _attempt_failed(reports):
+                break
+            for rep in reports:
+                if rep.failed and rep.when in ("setup", "call"):
+                    rep.outcome = "rerun"
+                    rep.rerun = attempt
+                    item.ihook.pytest_runtest_logreport(report=rep)
+            if self.backoff:
+                time.sleep(self.backoff * 2 ** attempt)
+        for rep in reports:
+            if len(outcomes) > 1:
+                rep.user_properties = list(rep.user_properties) + [("attempts", ",".join(outcomes))]
+            item.ihook.pytest_runtest_logreport(report=rep)
+        item.ihook.pytest_runtest_logfinish(nodeid=item.nodeid, location=item.location)
+        return True
+
+    def pytest_report_teststatus(self, report):
+        if report.outcome == "rerun":
+            return "rerun", "R", ("RERUN", {"yellow": True})
+        return None
@@ -0,0 +1,129 @@
+"""
+Test ordering: failure risk first, then longest-processing-time-first.
+
+The runner scores every test by how likely it is to fail -- recent failures,
+flaky verdicts, test files changed since the last run -- and passes the scores
+with --risk-order. Without xdist, RiskOrderPlugin moves the riskiest tests to
+the front of the collection. Under xdist, LPTScheduling keeps the dynamic
+"load" dispatch but orders the pending tests by risk and then by historical
+duration, longest first, and hands them out one at a time, so breakage shows
+up early and long flows no longer end up alone at the tail of the run.
+
+Both tables are keyed by root-relative nodeid; a test without an entry falls
+back to its unparametrized nodeid and then to its file.
+"""
+import json
+from pathlib import Path
+
+from xdist.scheduler import LoadScheduling
+
+
+def history_value(table: dict, key: str, default=None):
+    if key in table:
+        return table[key]
+    base = key.split('[', 1)[0]
+    if base in table:
+        return table[base]
+    return table.get(key.split('::', 1)[0], default)
+
+
+def repo_key(nodeid: str, rootpath: Path, repo_root: Path):
+    """Collection nodeids are relative to pytest's rootdir; history is keyed from the repo root."""
+    path, _, rest = nodeid.partition('::')
+    try:
+        path = (rootpath / path).resolve().relative_to(repo_root).as_posix()
+    except ValueError:
+        pass
+    return f"{path}::{rest}" if rest else path
+
+
+def _load_table(path, what):
+    if not path:
+        return {}
+    try:
+        return json.loads(Path(path).read_text())
+    except Exception as e:
+        print(f"Ignoring {what} {path}. Reason: {e}")
+        return {}
+
+
+class LPTScheduling(LoadScheduling):
+    def __init__(self, config, log=None, durations=None, key_for=None, risk=None):
+        super().__init__(config, log)
+        self.durations = durations or {}
+        self.risk = risk or {}
+        self.key_for = key_for or (lambda nodeid: nodeid)
+        known = sorted(self.durations.values())
+        self.default = known[len(known) // 2] if known else 1.0
+        # refill one test at a time so the longest remaining test goes to the first free worker
+        self.maxschedchunk = 1
+
+    def estimate(self, nodeid):
+        return history_value(self.durations, self.key_for(nodeid), self.default)
+
+    def risk_of(self, nodeid):
+        return history_value(self.risk, self.key_for(nodeid), 0.0)
+
+    def schedule(self):
+        assert self.collection_is_completed
+
+        if self.collection is not None:
+            for node in self.nodes:
+                self.check_schedule(node)
+            return
+
+        if not self._check_nodes_have_same_collection():
+            self.log("**Different tests collected, aborting run**")
+            return
+
+        self.collection = next(iter(self.node2collection.values()))
+        if not self.collection:
+            return
+        est = [self.estimate(nodeid) for nodeid in self.collection]
+        risk = [self.risk_of(nodeid) for nodeid in self.collection]
+        self.pending[:] = sorted(range(len(self.collection)), key=lambda i: (-risk[i], -est[i], i))
+
+        # xdist workers only start a test once the next one is queued, so seed every
+        # worker with two; the second round goes in reverse so the worker holding the
+        # longest test also gets the shortest of the seeded ones
+        for nodes in (self.nodes, self.nodes[::-1]):
+            for node in nodes:
+                if self.pending:
+                    self._send_tests(node, 1)
+
+        if not self.pending:
+            for node in self.nodes:
+                node.shutdown()
+
+
+class LPTSchedulerPlugin:
+    """Registered on the xdist controller when --lpt-durations or --risk-order is given."""
+
+    def __init__(self, durations_file: Path, repo_root: Path, risk_file: Path = None):
+        self.durations = _load_table(durations_file, "duration history")
+        self.risk = _load_table(risk_file, "risk scores")
+        self.repo_root = repo_root
+
+    def pytest_xdist_make_scheduler(self, config, log):
+        if config.getvalue("dist") != "load":
+            return None
+        rootpath = config.rootpath
+        return LPTScheduling(config, log, durations=self.durations, risk=self.risk,
+                             key_for=lambda nodeid: repo_key(nodeid, rootpath, self.repo_root))
+
+
+class RiskOrderPlugin:
+    """Registered by the conftest for --risk-order runs without xdist."""
+
+    def __init__(self, risk_file: Path, repo_root: Path):
+        self.risk = _load_table(risk_file, "risk scores")
+        self.repo_root = repo_root
+
+    def pytest_collection_modifyitems(self, session, config, items):
+        if not self.risk:
+            return
+        rootpath = config.rootpath
+        risk = {item.nodeid: history_value(self.risk, repo_key(item.nodeid, rootpath, self.repo_root), 0.0)
+                for item in items}
+        # sorted() is stable, so tests with equal risk keep their collection order
+        items[:] = sorted(items, key=lambda item: -risk[item.nodeid])
@@ -0,0 +1,216 @@
+// Minimal behaviour of www.saucedemo.com needed by the page objects in src/tests/pages.
+(function () {
+  'use strict';
+
+  var PRODUCTS = [
+    { id: 4, name: 'Sauce Labs Backpack', price: 29.99 },
+    { id: 0, name: 'Sauce Labs Bike Light', price: 9.99 },
+    { id: 1, name: 'Sauce Labs Bolt T-Shirt', price: 15.99 },
+    { id: 5, name: 'Sauce Labs Fleece Jacket', price: 49.99 },
+    { id: 2, name: 'Sauce Labs Onesie', price: 7.99 },
+    { id: 3, name: 'Test.allTheThings() T-Shirt (Red)', price: 15.99 }
+  ];
+  var USERS = ['standard_user', 'locked_out_user', 'problem_user', 'performance_glitch_user', 'error_user', 'visual_user'];
+  var PASSWORD = 'secret_sauce';
+  var SESSION_COOKIE = 'session-username';
+  var CART_KEY = 'cart-contents';
+
+  function currentUser() {
+    var match = document.cookie.match(new RegExp('(?:^|; )' + SESSION_COOKIE + '=([^;]*)'));
+    return match ? decodeURIComponent(match[1]) : null;
+  }
+
+  function setUser(user) {
+    if (user) {
+      document.cookie = SESSION_COOKIE + '=' + encodeURIComponent(user) + '; path=/; max-age=600';
+    } else {
+      document.cookie = SESSION_COOKIE + '=; path=/; max-age=0';
+    }
+  }
+
+  function getCart() {
+    try {
+      return JSON.parse(localStorage.getItem(CART_KEY)) || [];
+    } catch (e) {
+      return [];
+    }
+  }
+
+  function setCart(ids) {
+    if (ids.length) {
+      localStorage.setItem(CART_KEY, JSON.stringify(ids));
+    } else {
+      localStorage.removeItem(CART_KEY);
+    }
+    renderBadge();
+  }
+
+  function slug(name) {
+    return name.toLowerCase().replace(/[^a-z0-9]+/g, '-').replace(/^-|-$/g, '');
+  }
+
+  function el(tag, attrs, children) {
+    var node = document.createElement(tag);
+    Object.keys(attrs || {}).forEach(function (k) { node.setAttribute(k, attrs[k]); });
+    (children || []).forEach(function (c) {
+      node.appendChild(typeof c === 'string' ? document.createTextNode(c) : c);
+    });
+    return node;
+  }
+
+  function showError(container, message) {
+    container.innerHTML = '';
+    if (message) {
+      container.appendChild(el('h3', { 'data-test': 'error' }, [message]));
+    }
+  }
+
+  function renderBadge() {
+    var link = document.querySelector('.shopping_cart_link');
+    if (!link) return;
+    link.innerHTML = '';
+    var count = getCart().length;
+    if (count) {
+      link.appendChild(el('span', { 'class': 'shopping_cart_badge', 'data-test': 'shopping-cart-badge' }, [String(count)]));
+    }
+  }
+
+  function cartRow(product) {
+    return el('div', { 'class': 'cart_item' }, [
+      el('div', { 'class': 'cart_quantity' }, ['1']),
+      el('div', { 'class': 'cart_item_label' }, [
+        el('a', { href: '#', id: 'item_' + product.id + '_title_link' }, [
+          el('div', { 'class': 'inventory_item_name' }, [product.name])
+        ]),
+        el('div', { 'class': 'inventory_item_price' }, ['$' + product.price.toFixed(2)])
+      ])
+    ]);
+  }
+
+  function cartProducts() {
+    var ids = getCart();
+    return PRODUCTS.filter(function (p) { return ids.indexOf(p.id) !== -1; });
+  }
+
+  var pages = {
+    login: function () {
+      var params = new URLSearchParams(location.search);
+      var errors = document.querySelector('.error-message-container');
+      if (params.get('error')) {
+        showError(errors, "Epic sadface: You can only access '" + params.get('error') + "' when you are logged in.");
+      }
+      document.getElementById('login-form').addEventListener('submit', function (event) {
+        event.preventDefault();
+        var user = document.getElementById('user-name').value;
+        var password = document.getElementById('password').value;
+        if (!user) {
+          showError(errors, 'Epic sadface: Username is required');
+        } else if (!password) {
+          showError(errors, 'Epic sadface: Password is required');
+        } else if (USERS.indexOf(user) === -1 || password !== PASSWORD) {
+          showError(errors, 'Epic sadface: Username and password do not match any user in this service');
+        } else if (user === 'locked_out_user') {
+          showError(errors, 'Epic sadface: Sorry, this user has been locked out.');
+        } else {
+          setUser(user);
+          location.href = '/inventory.html';
+        }
+      });
+    },
+
+    inventory: function () {
+      var list = document.getElementById('inventory_container');
+      PRODUCTS.forEach(function (product) {
+        var button = el('button', { 'class': 'btn btn_inventory', id: 'add-to-cart-' + slug(product.name), type: 'button' });
+        function sync() {
+          var inCart = getCart().indexOf(product.id) !== -1;
+          button.textContent = inCart ? 'Remove' : 'Add to cart';
+          button.id = (inCart ? 'remove-' : 'add-to-cart-') + slug(product.name);
+        }
+        button.addEventListener('click', function () {
+          var ids = getCart();
+          var idx = ids.indexOf(product.id);
+          if (idx === -1) ids.push(product.id); else ids.splice(idx, 1);
+          setCart(ids);
+          sync();
+        });
+        sync();
+        list.appendChild(el('div', { 'class': 'inventory_item' }, [
+          el('div', { 'class': 'inventory_item_img' }, [el('img', { src: '/img/item.svg', alt: product.name })]),
+          el('div', { 'class': 'inventory_item_description' }, [
+            el('div', { 'class': 'inventory_item_label' }, [
+              el('a', { href: '#', id: 'item_' + product.id + '_title_link' }, [
+                el('div', { 'class': 'inventory_item_name' }, [product.name])
+              ]),
+              el('div', { 'class': 'inventory_item_desc' }, ['A stand-in description for ' + product.name + '.'])
+            ]),
+            el('div', { 'class': 'pricebar' }, [
+              el('div', { 'class': 'inventory_item_price' }, ['$' + product.price.toFixed(2)]),
+              button
+            ])
+          ])
+        ]));
+      });
+      var menu = document.querySelector('.bm-menu');
+      document.getElementById('react-burger-menu-btn').addEventListener('click', function () {
+        menu.hidden = !menu.hidden;
+      });
+      document.getElementById('logout_sidebar_link').addEventListener('click', function (event) {
+        event.preventDefault();
+        setUser(null);
+        localStorage.removeItem(CART_KEY);
+        location.href = '/';
+      });
+    },
+
+    cart: function () {
+      var list = document.getElementById('cart_contents_container');
+      cartProducts().forEach(function (product) { list.appendChild(cartRow(product)); });
+      document.getElementById('continue-shopping').addEventListener('click', function () { location.href = '/inventory.html'; });
+      document.getElementById('checkout').addEventListener('click', function () { location.href = '/checkout-step-one.html'; });
+    },
+
+    'checkout-step-one': function () {
+      var errors = document.querySelector('.error-message-container');
+      document.getElementById('checkout-info').addEventListener('submit', function (event) {
+        event.preventDefault();
+        if (!document.getElementById('first-name').value) {
+          showError(errors, 'Error: First Name is required');
+        } else if (!document.getElementById('last-name').value) {
+          showError(errors, 'Error: Last Name is required');
+        } else if (!document.getElementById('postal-code').value) {
+          showError(errors, 'Error: Postal Code is required');
+        } else {
+          location.href = '/checkout-step-two.html';
+        }
+      });
+    },
+
+    'checkout-step-two': function () {
+      var list = document.getElementById('checkout_summary_container');
+      var total = 0;
+      cartProducts().forEach(function (product) {
+        total += product.price;
+        list.appendChild(cartRow(product));
+      });
+      document.querySelector('.summary_total_label').textContent = 'Total: $' + (total * 1.08).toFixed(2);
+      document.getElementById('cancel').addEventListener('click', function () { location.href = '/inventory.html'; });
+      document.getElementById('finish').addEventListener('click', function () {
+        setCart([]);
+        location.href = '/checkout-complete.html';
+      });
+    },
+
+    'checkout-complete': function () {
+      document.getElementById('back-to-products').addEventListener('click', function () { location.href = '/inventory.html'; });
+    }
+  };
+
+  var page = document.body.dataset.page;
+  if (page !== 'login' && !currentUser()) {
+    location.replace('/?error=' + encodeURIComponent(location.pathname));
+    return;
+  }
+  renderBadge();
+  pages[page]();
+})();
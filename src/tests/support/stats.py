@@ -0,0 +1,12 @@
+"""
+Small statistics helpers shared by the load generator and the runner's
+timing and perf summaries, with no Playwright import behind them.
+"""
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
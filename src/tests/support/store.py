@@ -0,0 +1,158 @@
+"""
+Content-addressed artifact store kept across runs.
+
+Kept screenshots, traces and videos are hashed (sha256) into
+artifacts/blobs/<ab>/<hash><ext>; identical files are stored once. The file in
+videos/, screenshots/ or logs/ becomes a hard link to its blob, so report links
+keep working while clearing those directories at the start of a run only drops
+links -- the blob survives until the store evicts it.
+
+artifacts/index.jsonl has one line per stored artifact:
+
+    {"run": ..., "nodeid": ..., "kind": "video", "hash": ..., "ext": ".webm", "size": ..., "attempt": 0, "time": ...}
+
+Workers only append to it (O_APPEND, like the artifact manifest); the runner
+alone compacts it when it evicts. evict() keeps the last keep_runs runs, then
+drops least recently used blobs -- by the last time a run stored or find()
+served them -- until the store is under its byte quota. Blobs of the runs being
+protected (the one that just finished, or a split's shards) are never evicted.
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+from support.artifacts import append_manifest
+
+_CHUNK = 1 << 20
+
+
+def file_digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _link_or_copy(src: Path, dst: Path):
+    """Atomically make dst the same file as src: a hard link, or a copy across filesystems."""
+    tmp = dst.with_name(f".{dst.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+
+class ArtifactStore:
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.blobs = self.root / "blobs"
+        self.index = self.root / "index.jsonl"
+
+    def blob_path(self, digest: str, ext: str = "") -> Path:
+        return self.blobs / digest[:2] / f"{digest}{ext}"
+
+    def put(self, path: Path):
+        """Store a file by content and link it back in place; returns (hash, newly stored)."""
+        path = Path(path)
+        digest = file_digest(path)
+        blob = self.blob_path(digest, path.suffix)
+        if blob.exists():
+            # already stored: drop this copy for a link to the existing blob
+            _link_or_copy(blob, path)
+            return digest, False
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        _link_or_copy(path, blob)
+        return digest, True
+
+    def record(self, run: str, nodeid: str, kind: str, digest: str, ext: str, size: int, attempt: int = 0):
+        append_manifest(self.index, {"run": run, "nodeid": nodeid, "kind": kind, "hash": digest, "ext": ext,
+                                     "size": size, "attempt": attempt, "time": time.time()})
+
+    def read_index(self):
+        if not self.index.exists():
+            return []
+        records = []
+        with open(self.index, encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+        return records
+
+    def find(self, nodeid: str, kind: str = None):
+        """The latest stored artifacts of a test, newest first, as (record, blob path); marks them used."""
+        hits = [r for r in self.read_index() if "nodeid" in r and r["nodeid"] == nodeid
+                and (kind is None or r["kind"] == kind)]
+        hits.sort(key=lambda r: r["time"], reverse=True)
+        found = [(r, self.blob_path(r["hash"], r["ext"])) for r in hits]
+        found = [(r, p) for r, p in found if p.exists()]
+        for digest in {r["hash"] for r, _ in found}:
+            append_manifest(self.index, {"touch": digest, "time": time.time()})
+        return found
+
+    def evict(self, keep_runs: int = 10, quota_bytes: int = 0, protect_runs=()):
+        """Apply the retention policy, rewrite the index and delete unreferenced blobs; returns what it did."""
+        records, touched = [], {}
+        for r in self.read_index():
+            if "touch" in r:
+                touched[r["touch"]] = max(touched.get(r["touch"], 0.0), r["time"])
+            else:
+                records.append(r)
+        run_order = {}
+        for r in records:
+            run_order.setdefault(r["run"], r["time"])
+        runs = sorted(run_order, key=run_order.get)
+        keep = set(runs[-keep_runs:]) if keep_runs > 0 else set(runs)
+        keep.update(protect_runs)
+        kept = [r for r in records if r["run"] in keep]
+
+        blobs = {}
+        for r in kept:
+            b = blobs.setdefault((r["hash"], r["ext"]), {"size": r["size"], "used": 0.0, "protected": False})
+            b["used"] = max(b["used"], r["time"], touched.get(r["hash"], 0.0))
+            b["protected"] = b["protected"] or r["run"] in protect_runs
+        total = sum(b["size"] for b in blobs.values())
+        lru = []
+        if quota_bytes and total > quota_bytes:
+            for key, b in sorted(blobs.items(), key=lambda kv: kv[1]["used"]):
+                if total <= quota_bytes:
+                    break
+                if b["protected"]:
+                    continue
+                lru.append(key)
+                total -= b["size"]
+            evicted = set(lru)
+            kept = [r for r in kept if (r["hash"], r["ext"]) not in evicted]
+            blobs = {k: v for k, v in blobs.items() if k not in evicted}
+
+        all_blobs = {(r["hash"], r["ext"]): r["size"] for r in records}
+        removed = {k: size for k, size in all_blobs.items() if k not in blobs}
+        for digest, ext in removed:
+            self.blob_path(digest, ext).unlink(missing_ok=True)
+        tmp = self.index.with_name(self.index.name + ".tmp")
+        tmp.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.writelines(json.dumps(r, separators=(",", ":")) + "\n" for r in kept)
+            live = {digest for digest, _ in blobs}
+            fh.writelines(json.dumps({"touch": d, "time": t}, separators=(",", ":")) + "\n"
+                          for d, t in touched.items() if d in live)
+        os.replace(tmp, self.index)
+        return {
+            "runs": len({r["run"] for r in kept}),
+            "records": len(kept),
+            "blobs": len(blobs),
+            "bytes": sum(b["size"] for b in blobs.values()),
+            "logical_bytes": sum(r["size"] for r in kept),
+            "evicted_runs": len([r for r in runs if r not in keep]),
+            "evicted_lru": len(lru),
+            "evicted_blobs": len(removed),
+            "evicted_bytes": sum(removed.values()),
+            "over_quota": bool(quota_bytes) and sum(b["size"] for b in blobs.values()) > quota_bytes,
+        }
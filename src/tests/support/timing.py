@@ -0,0 +1,205 @@
+"""
+Opt-in timing of page-object methods and the Playwright calls under them.
+
+With --timing the conftest installs an ActionTimer: every public method of the
+page-object classes in src/tests/pages (and their async twins in pages/aio) and
+of Playwright's Page, Locator, BrowserContext and assertion classes, sync and
+async, is wrapped to record its start and duration against the running test.
+Without the flag nothing is wrapped, so the only cost is one option lookup at
+configure time. Nesting depth is kept per thread and per asyncio task, so flows
+the async runner drives side by side each get their own.
+
+Each worker writes reports/timing_<worker>.jsonl. Lines are either a string
+table entry or an event, both as JSON arrays:
+
+    ["s", id, text]                                  nodeid or action name
+    [test_id, name_id, kind, start_us, dur_us, depth]
+
+kind is KIND_TEST for the test itself (logstart to logfinish), KIND_PAGE for a
+page-object method and KIND_PLAYWRIGHT for a Playwright call; depth is the
+nesting level inside the test, start_us is epoch microseconds.
+"""
+import contextvars
+import functools
+import importlib
+import inspect
+import json
+import time
+from pathlib import Path
+
+KIND_TEST, KIND_PAGE, KIND_PLAYWRIGHT = 0, 1, 2
+KIND_NAMES = {KIND_TEST: "test", KIND_PAGE: "page", KIND_PLAYWRIGHT: "playwright"}
+
+# cheap lookups and listener plumbing that would only add noise to the timeline
+_SKIP_PLAYWRIGHT = {"locator", "nth", "filter", "and_", "or_", "frame_locator", "on", "once",
+                    "remove_listener", "set_default_timeout", "set_default_navigation_timeout",
+                    "is_closed", "content_frame", "owner"}
+_FLUSH_EVERY = 500
+_DEPTH = contextvars.ContextVar("timing_depth", default=0)
+
+
+def _playwright_classes():
+    from playwright import async_api, sync_api
+    classes = []
+    for api in (sync_api, async_api):
+        classes += [api.Page, api.Locator, api.BrowserContext]
+        try:
+            classes += [api._generated.LocatorAssertions, api._generated.PageAssertions]
+        except AttributeError:
+            pass
+    return classes
+
+
+def _page_object_classes(pages_dir: Path, package: str = "pages"):
+    classes = []
+    for module_file in sorted(pages_dir.glob("*.py")):
+        module = importlib.import_module(f"{package}.{module_file.stem}")
+        classes += [c for c in vars(module).values()
+                    if inspect.isclass(c) and c.__module__ == module.__name__]
+    return classes
+
+
+class ActionTimer:
+    def __init__(self, out_path: Path):
+        self.out_path = out_path
+        self.nodeid = None
+        self._test_id = None
+        self._test_start = 0
+        self._strings = {}
+        self._lines = []
+        self._patched = []
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = open(out_path, "w", encoding="utf-8")
+
+    def _intern(self, text):
+        sid = self._strings.get(text)
+        if sid is None:
+            sid = self._strings[text] = len(self._strings)
+            self._lines.append(json.dumps(["s", sid, text], separators=(",", ":")))
+        return sid
+
+    def _record(self, name_id, kind, start_ns, end_ns, depth):
+        self._lines.append(json.dumps([self._test_id, name_id, kind, start_ns // 1000,
+                                       (end_ns - start_ns) // 1000, depth], separators=(",", ":")))
+        if len(self._lines) >= _FLUSH_EVERY:
+            self.flush()
+
+    def _wrap(self, fn, label, kind):
+        timer = self
+        name_id = None
+
+        def begin():
+            nonlocal name_id
+            if name_id is None:
+                name_id = timer._intern(label)
+            depth = _DEPTH.get()
+            return depth, _DEPTH.set(depth + 1), time.time_ns()
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def timed_async(*args, **kwargs):
+                if timer._test_id is None:
+                    return await fn(*args, **kwargs)
+                depth, token, start = begin()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    _DEPTH.reset(token)
+                    timer._record(name_id, kind, start, time.time_ns(), depth)
+            return timed_async
+
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            if timer._test_id is None:
+                return fn(*args, **kwargs)
+            depth, token, start = begin()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _DEPTH.reset(token)
+                timer._record(name_id, kind, start, time.time_ns(), depth)
+        return timed
+
+    def instrument(self, cls, kind, skip=()):
+        for attr, fn in list(vars(cls).items()):
+            if attr.startswith("_") or attr in skip or attr.startswith("expect_") or not inspect.isfunction(fn):
+                continue
+            label = f"{cls.__name__}.{attr}"
+            inner = getattr(fn, "__wrapped__", None)
+            if inspect.iscoroutinefunction(inner) and not inspect.iscoroutinefunction(fn):
+                # @chainable calls the coroutine through __wrapped__; timing the wrapper would time nothing
+                fn.__wrapped__ = self._wrap(inner, label, kind)
+                self._patched.append((fn, "__wrapped__", inner))
+                continue
+            setattr(cls, attr, self._wrap(fn, label, kind))
+            self._patched.append((cls, attr, fn))
+
+    def install(self, pages_dir: Path):
+        for cls in _page_object_classes(pages_dir):
+            self.instrument(cls, KIND_PAGE)
+        if (pages_dir / "aio").is_dir():
+            for cls in _page_object_classes(pages_dir / "aio", "pages.aio"):
+                self.instrument(cls, KIND_PAGE)
+        for cls in _playwright_classes():
+            self.instrument(cls, KIND_PLAYWRIGHT, skip=_SKIP_PLAYWRIGHT)
+
+    def uninstall(self):
+        for cls, attr, fn in reversed(self._patched):
+            setattr(cls, attr, fn)
+        self._patched = []
+
+    def start_test(self, nodeid):
+        self.nodeid = nodeid
+        self._test_id = self._intern(nodeid)
+        self._test_start = time.time_ns()
+        _DEPTH.set(0)
+
+    def finish_test(self):
+        if self._test_id is None:
+            return
+        self._record(self._test_id, KIND_TEST, self._test_start, time.time_ns(), 0)
+        self._test_id = None
+        self.nodeid = None
+
+    def flush(self):
+        if self._lines:
+            self._fh.write("\n".join(self._lines) + "\n")
+            self._lines = []
+        self._fh.flush()
+
+    def close(self):
+        self.flush()
+        self._fh.close()
+
+
+class TimingPlugin:
+    """Points the timer at the running test; registered by the conftest with --timing."""
+
+    def __init__(self, timer: ActionTimer):
+        self.timer = timer
+
+    def pytest_runtest_logstart(self, nodeid, location):
+        self.timer.start_test(nodeid)
+
+    def pytest_runtest_logfinish(self, nodeid, location):
+        self.timer.finish_test()
+
+    def pytest_unconfigure(self, config):
+        self.timer.uninstall()
+        self.timer.close()
+
+
+def read_events(path: Path):
+    """Yield (nodeid, name, kind, start_us, dur_us, depth) from one worker's timing file."""
+    strings = {}
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue
+            if row[0] == "s":
+                strings[row[1]] = row[2]
+                continue
+            test_id, name_id, kind, start, dur, depth = row
+            yield strings.get(test_id), strings.get(name_id), kind, start, dur, depth
@@ -0,0 +1,133 @@
+"""
+Index of the Playwright traces a run kept.
+
+A trace zip holds the recorded events (trace.trace, one JSON object per line)
+next to the network log and every screenshot and DOM snapshot resource, so
+most of its bytes are not needed to see which action was slow or failed.
+read_actions() opens the zip through its central directory, which lists the
+members without reading them, and decompresses only the *.trace members. It
+streams those line by line and decodes just the action lines ("before" and
+"after", or "action" in older trace versions); snapshots and screencast frames
+are skipped by their type prefix without being parsed.
+
+index_traces() does this for every trace of a run, over a process pool once
+there are enough of them, and returns one compact entry per trace whose
+actions are [name, selector, ms, error] rows in call order.
+"""
+import json
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+POOL_THRESHOLD = 64
+_HEAD = 64
+_ACTION_TYPES = (b'"before"', b'"after"', b'"action"')
+WAIT_PREFIXES = ("wait", "expect")
+
+
+def _action_name(event: dict) -> str:
+    if event.get("apiName"):
+        return event["apiName"]
+    cls = event.get("class", "")
+    return f"{cls[:1].lower()}{cls[1:]}.{event.get('method', '')}" if cls else event.get("method", "")
+
+
+def _error_text(error):
+    if not error:
+        return None
+    if isinstance(error, dict):
+        error = (error.get("error") or error).get("message") or json.dumps(error)
+    return str(error).strip().splitlines()[0][:200]
+
+
+def read_actions(path):
+    """The actions of one trace zip as [name, selector, ms, error] rows; ms is None for an unfinished call."""
+    calls, order = {}, []
+    with zipfile.ZipFile(path) as zf:
+        for member in zf.namelist():
+            if not member.endswith(".trace"):
+                continue
+            with zf.open(member) as fh:
+                for line in fh:
+                    head = line[:_HEAD]
+                    if not any(t in head for t in _ACTION_TYPES):
+                        continue
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        continue
+                    kind = event.get("type")
+                    if kind == "action":
+                        # trace format <= 4: one record with both ends
+                        event = event.get("metadata") or {}
+                    call_id = event.get("callId") or event.get("id")
+                    if kind in ("before", "action"):
+                        params = event.get("params") or {}
+                        calls[call_id] = {"name": _action_name(event), "selector": params.get("selector") or "",
+                                          "start": event.get("startTime"), "end": event.get("endTime"),
+                                          "error": _error_text(event.get("error"))}
+                        order.append(call_id)
+                    elif call_id in calls:
+                        calls[call_id]["end"] = event.get("endTime")
+                        calls[call_id]["error"] = _error_text(event.get("error")) or calls[call_id]["error"]
+    actions = []
+    for call_id in order:
+        c = calls[call_id]
+        ms = round(c["end"] - c["start"], 1) if c["start"] is not None and c["end"] else None
+        actions.append([c["name"], c["selector"], ms, c["error"]])
+    return actions
+
+
+def _index_one(item):
+    key, path = item
+    try:
+        return key, read_actions(path), None
+    except (OSError, zipfile.BadZipFile, KeyError) as e:
+        return key, [], str(e)
+
+
+def index_traces(items, workers: int = None):
+    """
+    Read every (key, trace path) of items; returns {key: (actions, error)}.
+    A few traces are read in-process, more are spread over worker processes.
+    """
+    items = list(items)
+    if workers == 0 or len(items) < POOL_THRESHOLD:
+        results = map(_index_one, items)
+    else:
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_index_one, items, chunksize=max(1, len(items) // (workers * 4))))
+    return {key: (actions, error) for key, actions, error in results}
+
+
+def is_wait(name: str) -> bool:
+    method = name.rsplit(".", 1)[-1]
+    return method.startswith(WAIT_PREFIXES) or name.startswith("expect")
+
+
+def slowest_selectors(entries, top: int = 10):
+    """Selectors by total time spent in actions on them across all entries."""
+    by_selector = {}
+    for entry in entries:
+        for name, selector, ms, error in entry["actions"]:
+            if not selector or ms is None:
+                continue
+            s = by_selector.setdefault(selector, {"selector": selector, "count": 0, "total_ms": 0.0,
+                                                  "max_ms": 0.0, "errors": 0, "actions": set()})
+            s["count"] += 1
+            s["total_ms"] += ms
+            s["max_ms"] = max(s["max_ms"], ms)
+            s["errors"] += bool(error)
+            s["actions"].add(name)
+    ranked = sorted(by_selector.values(), key=lambda s: -s["total_ms"])[:top]
+    return [dict(s, total_ms=round(s["total_ms"], 1), actions=sorted(s["actions"])) for s in ranked]
+
+
+def slowest_waits(entries, top: int = 10):
+    """The longest individual waits (wait_for_*, expect) across all entries."""
+    waits = [{"ms": ms, "action": name, "selector": selector, "error": error, "nodeid": entry["nodeid"]}
+             for entry in entries for name, selector, ms, error in entry["actions"]
+             if ms is not None and is_wait(name)]
+    waits.sort(key=lambda w: -w["ms"])
+    return waits[:top]
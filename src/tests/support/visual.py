@@ -0,0 +1,123 @@
+"""
+Visual comparison of teardown screenshots against stored baselines.
+
+Baselines live in session/visual_baseline_<site>/, next to the perf baseline:
+one PNG per test, named from its repo-relative nodeid, and index.json with
+each baseline's file, pixel and perceptual hashes.
+
+compare() decides cheapest first. A screenshot byte-identical to its baseline
+is unchanged without being decoded. Otherwise it is decoded once; the same
+pixels under another encoding are unchanged too, and so is an image whose
+perceptual hash (a 64x64 difference hash of the grayscale image) equals the
+baseline's. The hash ignores edits of a few pixels -- a changed digit in a
+price -- so exact comparisons skip that shortcut. Only the rest get the full
+NumPy diff: a pixel differs when any channel moves by more than threshold,
+pixels inside the test's masked regions never differ, and the comparison fails
+when more than tolerance percent of the pixels differ. A failure writes a diff
+image -- the baseline faded to gray with the differing pixels in red.
+
+compare_all() spreads the comparisons over a process pool.
+"""
+import hashlib
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+POOL_THRESHOLD = 16
+HASH_SIZE = 64
+DEFAULT_THRESHOLD = 16
+DIFF_COLOR = (255, 0, 0)
+
+
+def baseline_key(nodeid: str) -> str:
+    """File-name-safe, collision-free name for a test's baseline."""
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", nodeid.split("/")[-1])[:80]
+    return f"{slug}_{hashlib.sha1(nodeid.encode('utf-8')).hexdigest()[:8]}"
+
+
+def perceptual_hash(image: Image.Image, size: int = HASH_SIZE) -> str:
+    small = np.asarray(image.convert("L").resize((size + 1, size), Image.Resampling.BOX), dtype=np.int16)
+    return np.packbits(small[:, 1:] > small[:, :-1]).tobytes().hex()
+
+
+def _rgb(image: Image.Image) -> np.ndarray:
+    return np.asarray(image if image.mode == "RGB" else image.convert("RGB"))
+
+
+def changed_pixels(current: np.ndarray, baseline: np.ndarray, threshold: int = DEFAULT_THRESHOLD, masks=()):
+    """Boolean HxW array of the pixels where any channel differs by more than threshold, outside masks."""
+    # |a - b| without widening: max - min stays within uint8
+    d = np.maximum(current, baseline)
+    d -= np.minimum(current, baseline)
+    delta = np.maximum(np.maximum(d[..., 0], d[..., 1]), d[..., 2]) > threshold
+    for x, y, w, h in masks:
+        delta[max(int(y), 0):max(int(y + h), 0), max(int(x), 0):max(int(x + w), 0)] = False
+    return delta
+
+
+def diff_image(baseline: np.ndarray, changed: np.ndarray) -> Image.Image:
+    # luma as R/4 + G/2 + B/4, faded into the upper half of the range
+    gray = (baseline[..., 0] >> 2) + (baseline[..., 1] >> 1) + (baseline[..., 2] >> 2)
+    gray = (gray >> 1) + np.uint8(128)
+    return Image.merge("RGB", [Image.fromarray(np.where(changed, np.uint8(c), gray)) for c in DIFF_COLOR])
+
+
+def compare(job: dict) -> dict:
+    """
+    Compare one screenshot with its baseline. job has nodeid, current and
+    baseline paths, meta (the baseline's index entry or None), diff (where to
+    write a diff image), masks, threshold, tolerance (percent of pixels) and
+    exact (no perceptual-hash shortcut).
+    """
+    result = {"nodeid": job["nodeid"], "key": job["key"], "current": job["current"]}
+    try:
+        data = Path(job["current"]).read_bytes()
+        result["digest"] = hashlib.sha256(data).hexdigest()
+        # an index entry whose baseline file is gone is no baseline: it is written anew
+        meta = job.get("meta") if Path(job["baseline"]).exists() else None
+        if meta and meta.get("digest") == result["digest"]:
+            return dict(result, status="identical", phash=meta.get("phash"), ratio=0.0)
+        with Image.open(job["current"]) as img:
+            img.load()
+            result["phash"] = perceptual_hash(img)
+            current = _rgb(img)
+        result["size"] = [current.shape[1], current.shape[0]]
+        result["pixels_digest"] = hashlib.sha256(current.tobytes()).hexdigest()
+        if not meta:
+            return dict(result, status="new")
+        if meta.get("pixels_digest") == result["pixels_digest"]:
+            return dict(result, status="unchanged", ratio=0.0)
+        if not job.get("exact") and meta.get("phash") == result["phash"]:
+            return dict(result, status="unchanged", ratio=0.0, by_hash=True)
+        with Image.open(job["baseline"]) as img:
+            baseline = _rgb(img)
+        if baseline.shape != current.shape:
+            return dict(result, status="failed", ratio=100.0,
+                        reason=f"size {current.shape[1]}x{current.shape[0]} != baseline "
+                               f"{baseline.shape[1]}x{baseline.shape[0]}")
+        changed = changed_pixels(current, baseline, job.get("threshold", DEFAULT_THRESHOLD), job.get("masks") or ())
+        pixels = int(changed.sum())
+        ratio = 100.0 * pixels / changed.size
+        result.update(pixels=pixels, ratio=round(ratio, 4))
+        if ratio <= job.get("tolerance", 0.0):
+            return dict(result, status="passed")
+        Path(job["diff"]).parent.mkdir(parents=True, exist_ok=True)
+        diff_image(baseline, changed).save(job["diff"], optimize=False, compress_level=1)
+        return dict(result, status="failed", diff=job["diff"],
+                    reason=f"{pixels} pixels ({ratio:.3f}%) differ, tolerance {job.get('tolerance', 0.0):g}%")
+    except (OSError, ValueError) as e:
+        return dict(result, status="error", reason=str(e))
+
+
+def compare_all(jobs, workers: int = None):
+    """compare() every job, over worker processes once there are more than a few; results in job order."""
+    jobs = list(jobs)
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    if workers <= 1 or len(jobs) < POOL_THRESHOLD:
+        return [compare(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(compare, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
@@ -0,0 +1,25 @@
+import json
+import os
+from pathlib import Path
+
+
+def shard_id():
+    """'<i>of<N>' while the runner runs one shard of a --shard i/N split, else ''."""
+    return os.environ.get("SAUCE_SHARD", "")
+
+
+def worker_id():
+    """Return the xdist worker id (gw0, gw1, ...) or 'main' when not distributed, prefixed with the shard."""
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+    shard = shard_id()
+    return f"s{shard}-{worker}" if shard else worker
+
+
+def write_worker_stats(reports_dir: Path, name: str, data: dict):
+    """Dump per-worker stats as reports/<name>_<worker>.json for the runner summary."""
+    reports_dir.mkdir(parents=True, exist_ok=True)
+    out = reports_dir / f"{name}_{worker_id()}.json"
+    try:
+        out.write_text(json.dumps(data, indent=2))
+    except Exception as e:
+        print(f"Failed to write {out}. Reason: {e}")
@@ -0,0 +1,29 @@
+import pytest
+from playwright.async_api import expect
+from pages.aio.LoginPage import Loginpage
+
+PRODUCTS = ["Sauce Labs Backpack", "Sauce Labs Bike Light", "Sauce Labs Bolt T-Shirt", "Sauce Labs Onesie"]
+
+
+def place_order(product_name):
+    async def flow(page):
+        # same chaining as the sync flow, with one await per chain
+        cart_page = await Loginpage(page).do_login(
+            {"username": "standard_user", "password": "secret_sauce"}
+        ).click_addremove_to_cart(product_name).click_cart_btn()
+        await expect(cart_page.get_cart_page_title()).to_contain_text('Your Cart')
+        await expect(cart_page.get_cart_product_text()).to_contain_text(product_name)
+        checkout_page = await cart_page.click_on_checkout()
+        await checkout_page.enter_checkout_details(
+            "prashant", "singh", "12345678").click_checkout_continue()
+        await expect(checkout_page.get_checkout_overview()).to_contain_text("Checkout: Overview")
+        await checkout_page.click_checkout_finish_btn()
+        await expect(checkout_page.get_checkout_sucess()).to_contain_text("Thank you for your order!")
+    flow.__name__ = f"place_order[{product_name}]"
+    return flow
+
+
+@pytest.mark.sanity
+def test_placeorder_concurrently(async_runner, base_url):
+    results = async_runner.run([place_order(p) for p in PRODUCTS], base_url)
+    assert len(results) == len(PRODUCTS)
@@ -1,14 +1,12 @@
 import pytest
 from playwright.sync_api import expect
-from pages.LoginPage import Loginpage
+from pages.Inventory import Inventory
 
 
 @pytest.mark.sanity
-def test_placeorder(setup_teardown):
-    page = setup_teardown
-    login_page = Loginpage(page)
-    credentials = {"username": "standard_user", "password": "secret_sauce"}
-    inventory_page = login_page.do_login(credentials)
+def test_placeorder(authenticated_page):
+    page = authenticated_page(user="standard_user")
+    inventory_page = Inventory(page)
     product_name = "Sauce Labs Onesie"
     # testing playwright chaining by returning self
     cart_page = inventory_page.click_addremove_to_cart(
@@ -1,14 +1,12 @@
 import pytest
 from playwright.sync_api import expect
-from pages.LoginPage import Loginpage
+from pages.Inventory import Inventory
 
 
 @pytest.mark.smoke
-def test_add_to_cart(setup_teardown):
-    page = setup_teardown
-    login_page = Loginpage(page)
-    credentials = {"username": "standard_user", "password": "secret_sauce"}
-    inventory_page = login_page.do_login(credentials)
+def test_add_to_cart(authenticated_page):
+    page = authenticated_page(user="standard_user")
+    inventory_page = Inventory(page)
     expect(inventory_page.inventory_header).to_be_visible()
     expect(inventory_page.inventory_header).to_contain_text("Products")
     product_name = "Sauce Labs Backpack"
@@ -18,11 +16,9 @@ def test_add_to_cart(setup_teardown):
 
 
 @pytest.mark.sanity
-def test_remove_to_cart(setup_teardown):
-    page = setup_teardown
-    login_page = Loginpage(page)
-    credentials = {"username": "standard_user", "password": "secret_sauce"}
-    inventory_page = login_page.do_login(credentials)
+def test_remove_to_cart(authenticated_page):
+    page = authenticated_page(user="standard_user")
+    inventory_page = Inventory(page)
     product_name = "Sauce Labs Backpack"
     inventory_page.click_addremove_to_cart(product_name)
     inventory_page.click_addremove_to_cart(product_name)
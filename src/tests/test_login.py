@@ -1,4 +1,5 @@
 import pytest
+from urllib.parse import urljoin
 from playwright.sync_api import expect
 from pages.LoginPage import Loginpage
 
@@ -33,9 +34,9 @@ def test_login_no_user(setup_teardown):
 
 
 @pytest.mark.sanity
-def test_unsafe_redirects(setup_teardown):
+def test_unsafe_redirects(setup_teardown, base_url):
     page = setup_teardown
-    page.goto("https://www.saucedemo.com/inventory.html")
+    page.goto(urljoin(base_url, "inventory.html"))
     login_page = Loginpage(page)
     expect(login_page.error_msg()).to_contain_text(
         "Epic sadface: You can only access '/inventory.html' when you are logged in.")
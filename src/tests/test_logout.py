@@ -1,14 +1,14 @@
 import pytest
 from playwright.sync_api import expect
+from pages.Inventory import Inventory
 from pages.LoginPage import Loginpage
 
 
 @pytest.mark.smoke
-def test_logout_standard_user(setup_teardown) -> None:
-    page = setup_teardown
+def test_logout_standard_user(authenticated_page) -> None:
+    page = authenticated_page(user="standard_user")
     login_page = Loginpage(page)
-    credentials = {"username": "standard_user", "password": "secret_sauce"}
-    inventory_page = login_page.do_login(credentials)
+    inventory_page = Inventory(page)
     expect(inventory_page.inventory_header).to_be_visible()
     expect(inventory_page.inventory_header).to_contain_text("Products")
     inventory_page.logout()
@@ -0,0 +1,33 @@
+"""
+Offline tests of runner.py, its cli/ modules and the support modules they import: no browser, no network.
+
+They live outside src/ so the browser suite's pytest.ini (--html report) and
+conftest (output wiping, browser fixtures) never apply to them, and so runner.py
+-p src and make run/shards never collect them.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# runner.py and cli/ live at the repo root, next to this rootdir, and the support modules under src/tests
+sys.path.insert(0, str(Path(__file__).parents[1]))
+sys.path.insert(0, str(Path(__file__).parents[1] / "src" / "tests"))
+
+from report_fixtures import write_html_report, write_junit_report  # noqa: E402
+
+
+@pytest.fixture
+def html_report(tmp_path):
+    """Factory writing a pytest-html report of {nodeid: [result, ...]} under tmp_path; returns its path."""
+    def make(tests: dict, **kwargs):
+        return write_html_report(tmp_path, tests, **kwargs)
+    return make
+
+
+@pytest.fixture
+def junit_report(tmp_path):
+    """Factory writing a JUnit report of (classname, name, outcome[, attempts]) rows under tmp_path."""
+    def make(cases, **kwargs):
+        return write_junit_report(tmp_path, cases, **kwargs)
+    return make
@@ -0,0 +1,90 @@
+"""
+Small hand-made reports in pytest-html 4's and pytest's JUnit layout, and
+helpers to read them back, for the offline tests of runner.py's report handling.
+"""
+import html
+import json
+from pathlib import Path
+from xml.sax.saxutils import quoteattr
+
+LABELS = {'failed': 'Failed', 'passed': 'Passed', 'skipped': 'Skipped', 'xfailed': 'Expected failures',
+          'xpassed': 'Unexpected passes', 'error': 'Errors', 'rerun': 'Reruns'}
+
+
+def markup_escape(text: str) -> str:
+    # what jinja/markupsafe does to the blob attribute in pytest-html
+    return (text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+            .replace('"', "&#34;").replace("'", "&#39;"))
+
+
+def result(nodeid: str, outcome: str = 'Passed', log: str = 'No log output captured.'):
+    """One pytest-html result entry, with the results-table row the runner adds links to."""
+    return {'extras': [], 'result': outcome, 'testId': nodeid, 'duration': '120 ms',
+            'resultsTableRow': [f'<td class="col-result">{outcome}</td>', f'<td class="col-testId">{nodeid}</td>',
+                                '<td class="col-duration">120 ms</td>', '<td class="col-links"></td>'],
+            'log': log}
+
+
+def read_blob(html_path: Path) -> dict:
+    """The decoded data blob of a pytest-html report."""
+    text = html_path.read_text(encoding='utf-8')
+    start = text.index('data-jsonblob="') + len('data-jsonblob="')
+    return json.loads(html.unescape(text[start:text.index('"', start)]))
+
+
+def write_html_report(directory: Path, tests: dict, name: str = 'report.html', escape=markup_escape,
+                      ensure_ascii: bool = True, duration: str = '00:00:01'):
+    """Write a pytest-html report of {nodeid: [result, ...]} into directory; returns its path."""
+    counts = {outcome: 0 for outcome in LABELS}
+    for results in tests.values():
+        for r in results:
+            counts[r['result'].lower()] += 1
+    filters = ''.join(
+        f'<input checked="true" class="filter" name="filter_checkbox" type="checkbox" '
+        f'data-test-result="{outcome}" {"disabled" if n == 0 else ""}/>'
+        f'<span class="{outcome}">{n} {LABELS[outcome]}{"," if outcome != "rerun" else ""}</span>\n'
+        for outcome, n in counts.items())
+    run = sum(n for outcome, n in counts.items() if outcome not in ('skipped', 'rerun'))
+    blob = {'environment': {'Python': '3.11', 'Plugins': {'html': '4.1.1'}}, 'tests': tests,
+            'renderCollapsed': ['passed'], 'initialSort': 'result', 'title': name}
+    path = directory / name
+    path.write_text(
+        '<!DOCTYPE html>\n<html>\n  <head>\n    <meta charset="utf-8"/>\n'
+        f'    <title>{name}</title>\n    <style>body {{ font-family: sans-serif; }}</style>\n  </head>\n'
+        f'  <body>\n    <p class="run-count">{run} {"test" if run == 1 else "tests"} took {duration}.</p>\n'
+        f'    {filters}  </body>\n  <footer>\n'
+        f'    <div id="data-container" data-jsonblob="{escape(json.dumps(blob, ensure_ascii=ensure_ascii))}"></div>\n'
+        '    <script>const x = "}]\\"&#34;";</script>\n  </footer>\n</html>\n',
+        encoding='utf-8')
+    return path
+
+
+def write_junit_report(directory: Path, cases, name: str = 'junit.xml', time: float = 1.0):
+    """
+    Write a JUnit report like pytest's into directory; returns its path. cases
+    are (classname, name, outcome[, attempts]) with outcome passed, failed,
+    error or skipped, and attempts the rerun plugin's property value.
+    """
+    counts = {'failed': 0, 'error': 0, 'skipped': 0}
+    testcases = []
+    for classname, test, outcome, *attempts in cases:
+        counts[outcome] = counts.get(outcome, 0) + 1
+        body = ''
+        if attempts:
+            body += f'<properties><property name="attempts" value={quoteattr(attempts[0])} /></properties>'
+        if outcome == 'failed':
+            body += '<failure message="assert False">E   assert False</failure>'
+        elif outcome == 'error':
+            body += '<error message="failed on setup">E   fixture broke</error>'
+        elif outcome == 'skipped':
+            body += '<skipped type="pytest.skip" message="skipped">skipped</skipped>'
+        testcases.append(f'<testcase classname={quoteattr(classname)} name={quoteattr(test)} time="0.250">'
+                         f'{body}</testcase>')
+    path = directory / name
+    path.write_text(
+        '<?xml version="1.0" encoding="utf-8"?><testsuites>'
+        f'<testsuite name="pytest" errors="{counts["error"]}" failures="{counts["failed"]}" '
+        f'skipped="{counts["skipped"]}" tests="{len(testcases)}" time="{time:.3f}" hostname="ci">'
+        + ''.join(testcases) + '</testsuite></testsuites>',
+        encoding='utf-8')
+    return path
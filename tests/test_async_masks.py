@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+from support.artifacts import ArtifactStats
+from support.async_runner import AsyncBrowserRunner
+from support.contexts import ContextSetup
+from support.pipeline import ArtifactPipeline
+
+BOXES = {'.price': [{'x': 10.4, 'y': 20.6, 'width': 30, 'height': 8}], '.gone': []}
+
+
+class Locator:
+    def __init__(self, box):
+        self.box = box
+
+    async def bounding_box(self):
+        return self.box
+
+
+class Locators:
+    def __init__(self, selector):
+        self.selector = selector
+
+    async def all(self):
+        return [Locator(box) for box in BOXES[self.selector]]
+
+
+class Page:
+    async def set_viewport_size(self, size):
+        pass
+
+    async def goto(self, url):
+        pass
+
+    def locator(self, selector):
+        return Locators(selector)
+
+    async def screenshot(self):
+        return b'\x89PNG'
+
+
+class Context:
+    async def new_page(self):
+        return Page()
+
+    async def close(self):
+        pass
+
+
+class Browser:
+    async def new_context(self, **kwargs):
+        return Context()
+
+
+def test_async_flows_record_the_visual_mask_boxes(tmp_path):
+    manifest = tmp_path / 'logs' / 'artifacts.jsonl'
+    for d in ('logs', 'screenshots'):
+        (tmp_path / d).mkdir()
+    policies = {'video': 'off', 'tracing': 'off', 'screenshot': 'on'}
+    setup = ContextSetup('test_x.py::test_flow', 'src/tests/test_x.py', tmp_path, attempt=0, policies=policies,
+                         stats=ArtifactStats(), pipeline=ArtifactPipeline(workers=0), manifest=manifest,
+                         worker='gw0')
+    runner = AsyncBrowserRunner()
+    runner._browser = Browser()
+
+    async def flow(page):
+        pass
+    asyncio.run(runner._run_all([flow], 'http://x', setup, {}, mask_selectors=('.price', '.gone')))
+    setup.finish(False)
+
+    entry = json.loads(manifest.read_text())
+    assert entry['mask'] == [[10, 21, 30, 8]]
+    assert (tmp_path / entry['screenshot']).read_bytes() == b'\x89PNG'
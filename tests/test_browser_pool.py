@@ -0,0 +1,64 @@
+import pytest
+
+from support import browser_pool
+from support.browser_pool import BrowserPool
+
+
+class FakeBrowser:
+    def is_connected(self):
+        return True
+
+    def new_context(self, **kwargs):
+        return object()
+
+    def close(self):
+        pass
+
+
+class FakeBrowserType:
+    def __init__(self):
+        self.launched = []
+
+    def launch(self, **options):
+        self.launched.append(options)
+        return FakeBrowser()
+
+    def connect_over_cdp(self, endpoint):
+        return FakeBrowser()
+
+
+@pytest.fixture
+def measured(monkeypatch):
+    """The pids the pool measured; the browser's tree always reads 100MB."""
+    pids = []
+    monkeypatch.setattr(browser_pool, '_pid_launched_with', lambda arg: 4242)
+    monkeypatch.setattr(browser_pool, '_process_tree_rss_mb', lambda pid: pids.append(pid) or 100.0)
+    return pids
+
+
+def test_rss_is_measured_on_the_browser_tree_every_n_tests(measured):
+    browser_type = FakeBrowserType()
+    pool = BrowserPool(browser_type, max_rss_mb=500, rss_check_every=5, launch_options={'args': ['--foo']})
+    for _ in range(12):
+        pool.new_context()
+    # before tests 6 and 11, once 5 and 10 had been served
+    assert measured == [4242, 4242]
+    assert pool.stats['rss_checks'] == 2 and pool.stats['max_rss_mb'] == 100.0
+    assert browser_type.launched == [{'args': ['--foo', pool._marker]}]
+
+
+def test_browser_over_the_threshold_is_relaunched(measured):
+    browser_type = FakeBrowserType()
+    pool = BrowserPool(browser_type, max_rss_mb=50, rss_check_every=2)
+    for _ in range(3):
+        pool.new_context()
+    assert pool.stats['recycled']['memory'] == 1
+    assert len(browser_type.launched) == 2
+
+
+def test_connected_browser_is_never_measured(measured):
+    pool = BrowserPool(FakeBrowserType(), max_rss_mb=50, rss_check_every=1, endpoint='http://127.0.0.1:9222')
+    for _ in range(5):
+        pool.new_context()
+    assert measured == []
+    assert pool.stats['launches'] == 1
@@ -0,0 +1,42 @@
+import base64
+
+import pytest
+
+from cli import paths
+from cli.execute import run_pytest
+
+PNG = base64.b64encode(b'\x89PNG\r\n\x1a\n not really an image').decode()
+
+CONFTEST = f'''
+import pytest
+from pytest_html import extras
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    rep = (yield).get_result()
+    if rep.when == "call":
+        rep.extras = [extras.png("{PNG}")]
+'''
+
+
+@pytest.mark.parametrize('self_contained', [True, False], ids=['inline', 'external'])
+def test_media_decides_where_the_extras_go(tmp_path, self_contained):
+    suite = tmp_path / 'suite'
+    suite.mkdir()
+    (suite / 'conftest.py').write_text(CONFTEST)
+    (suite / 'test_extra.py').write_text('def test_extra():\n    pass\n')
+    html = tmp_path / 'reports' / 'report.html'
+    # the browser suite's own pytest.ini, so its addopts cannot override --media
+    rc, _ = run_pytest([str(suite), '-c', str(paths.ROOT / 'src' / 'pytest.ini'), '--rootdir', str(suite)],
+                              html, tmp_path / 'reports' / 'report.xml',
+                              extra_args=['-p', 'no:cacheprovider'], self_contained=self_contained)
+    assert rc == 0
+    written = list((tmp_path / 'reports' / 'assets').glob('*.png'))
+    if self_contained:
+        assert written == []
+        assert PNG in html.read_text(encoding='utf-8')
+    else:
+        assert len(written) == 1
+        assert written[0].read_bytes() == base64.b64decode(PNG)
+        assert PNG not in html.read_text(encoding='utf-8')
@@ -0,0 +1,138 @@
+from cli.results import iter_junit_testcases, merge_junit_results
+from cli.sharding import _junit_suite_attrs, merge_junit_files, merge_pytest_html
+from report_fixtures import read_blob, result
+
+CHECKOUT = 'tests.test_checkout'
+INVENTORY = 'tests.test_inventory'
+
+
+def _shards(junit_report):
+    first = junit_report([
+        (CHECKOUT, 'test_order', 'passed'),
+        (CHECKOUT, 'test_total', 'failed', 'failed,failed'),
+        (CHECKOUT, 'test_coupon', 'passed', 'failed,passed'),
+        (CHECKOUT, 'test_gift', 'skipped'),
+    ], name='shard1.xml', time=4.0)
+    second = junit_report([
+        (INVENTORY, 'test_sort', 'passed'),
+        (INVENTORY, 'test_filter', 'error'),
+        (INVENTORY, 'test_badge', 'passed', 'failed,failed,passed'),
+    ], name='shard2.xml', time=6.5)
+    return first, second
+
+
+def test_junit_files_are_merged_with_summed_counts(junit_report, tmp_path):
+    out = tmp_path / 'merged.xml'
+    totals = merge_junit_files(_shards(junit_report) + (tmp_path / 'missing.xml',), out)
+    assert totals == {'errors': 1, 'failures': 1, 'skipped': 1, 'tests': 7}
+
+    suite = _junit_suite_attrs(out)
+    assert {k: int(suite[k]) for k in totals} == totals
+    # shards run side by side: the merged suite took as long as the slowest one
+    assert float(suite['time']) == 6.5
+    cases = [(t['classname'], t['name'], t['status']) for t in iter_junit_testcases(out)]
+    assert cases == [
+        (CHECKOUT, 'test_order', 'passed'), (CHECKOUT, 'test_total', 'failed'),
+        (CHECKOUT, 'test_coupon', 'passed'), (CHECKOUT, 'test_gift', 'skipped'),
+        (INVENTORY, 'test_sort', 'passed'), (INVENTORY, 'test_filter', 'failed'),
+        (INVENTORY, 'test_badge', 'passed'),
+    ]
+
+
+def test_flaky_tests_come_from_the_attempts_property(junit_report, tmp_path):
+    out = tmp_path / 'merged.xml'
+    merge_junit_files(_shards(junit_report), out)
+    final = merge_junit_results(out)
+
+    assert {k: final[k] for k in ('passed', 'failed', 'flaky', 'skipped')} == \
+        {'passed': 2, 'failed': 2, 'flaky': 2, 'skipped': 1}
+    assert final['duration'] == 7 * 0.25
+    verdicts = {key: (v['status'], v['attempts']) for key, v in final['verdicts'].items()}
+    assert verdicts == {
+        f'{CHECKOUT}::test_total': ('failed', ['failed', 'failed']),
+        f'{CHECKOUT}::test_coupon': ('flaky', ['failed', 'passed']),
+        f'{CHECKOUT}::test_gift': ('skipped', ['skipped']),
+        f'{INVENTORY}::test_filter': ('failed', ['failed']),
+        f'{INVENTORY}::test_badge': ('flaky', ['failed', 'failed', 'passed']),
+    }
+
+
+def test_tests_repeated_across_shards_get_one_verdict(junit_report, tmp_path):
+    first = junit_report([
+        (CHECKOUT, 'test_order', 'passed'),
+        (CHECKOUT, 'test_total', 'failed'),
+        (CHECKOUT, 'test_coupon', 'failed'),
+        (CHECKOUT, 'test_gift', 'passed'),
+    ], name='shard1.xml')
+    second = junit_report([
+        (CHECKOUT, 'test_order', 'passed'),
+        (CHECKOUT, 'test_total', 'failed', 'failed,failed'),
+        (CHECKOUT, 'test_coupon', 'passed'),
+        (INVENTORY, 'test_sort', 'passed'),
+    ], name='shard2.xml')
+    third = junit_report([(CHECKOUT, 'test_gift', 'failed')], name='shard3.xml')
+    out = tmp_path / 'merged.xml'
+
+    # the merged JUnit keeps every testcase as it ran
+    assert merge_junit_files([first, second, third], out)['tests'] == 9
+    final = merge_junit_results(out)
+
+    assert {k: final[k] for k in ('passed', 'failed', 'flaky', 'skipped')} == \
+        {'passed': 2, 'failed': 1, 'flaky': 2, 'skipped': 0}
+    verdicts = {key: (v['status'], v['attempts']) for key, v in final['verdicts'].items()}
+    assert verdicts == {
+        f'{CHECKOUT}::test_total': ('failed', ['failed', 'failed', 'failed']),
+        f'{CHECKOUT}::test_coupon': ('flaky', ['failed', 'passed']),
+        f'{CHECKOUT}::test_gift': ('flaky', ['passed', 'failed']),
+    }
+
+
+def test_html_reports_are_merged_with_summed_counts(html_report, tmp_path):
+    first = html_report({
+        'tests/test_checkout.py::test_order': [result('tests/test_checkout.py::test_order')],
+        'tests/test_checkout.py::test_total': [result('tests/test_checkout.py::test_total', 'Rerun'),
+                                               result('tests/test_checkout.py::test_total', 'Failed')],
+    }, name='shard1.html')
+    second = html_report({
+        'tests/test_inventory.py::test_sort': [result('tests/test_inventory.py::test_sort')],
+        'tests/test_inventory.py::test_gift': [result('tests/test_inventory.py::test_gift', 'Skipped')],
+    }, name='shard2.html')
+    out = tmp_path / 'merged.html'
+
+    assert merge_pytest_html([first, tmp_path / 'missing.html', second], out, duration=75) == 3
+
+    text = out.read_text(encoding='utf-8')
+    assert '<p class="run-count">3 tests took 00:01:15.</p>' in text
+    for outcome, n in (('passed', 2), ('failed', 1), ('skipped', 1), ('rerun', 1), ('error', 0)):
+        assert f'<span class="{outcome}">{n} ' in text
+    # the filter of an outcome only the second shard had is enabled
+    assert 'data-test-result="skipped" disabled' not in text
+    assert 'data-test-result="error" disabled' in text
+    blob = read_blob(out)
+    assert list(blob['tests']) == ['tests/test_checkout.py::test_order', 'tests/test_checkout.py::test_total',
+                                   'tests/test_inventory.py::test_sort', 'tests/test_inventory.py::test_gift']
+    assert blob['tests']['tests/test_inventory.py::test_gift'] == read_blob(second)['tests'][
+        'tests/test_inventory.py::test_gift']
+    assert blob['title'] == 'shard1.html'
+    assert not out.with_name(out.name + '.spool').exists()
+
+
+def test_html_tests_repeated_across_shards_keep_every_result(html_report, tmp_path):
+    order, total, sort = ('tests/test_checkout.py::test_order', 'tests/test_checkout.py::test_total',
+                          'tests/test_inventory.py::test_sort')
+    first = html_report({order: [result(order, 'Failed')], total: [result(total)]}, name='shard1.html')
+    second = html_report({sort: [result(sort, 'Failed')], order: [result(order)]}, name='shard2.html')
+    third = html_report({sort: [result(sort)], order: [result(order, 'Skipped')]}, name='shard3.html')
+    out = tmp_path / 'merged.html'
+
+    merge_pytest_html([first, second, third], out, duration=0.5)
+
+    text = out.read_text(encoding='utf-8')
+    assert '<p class="run-count">5 tests took 500 ms.</p>' in text
+    # every key once, so the page's JSON.parse drops nothing
+    assert text.count(f'{order}&#34;: [') == 1
+    blob = read_blob(out)
+    assert list(blob['tests']) == [order, total, sort]
+    assert [r['result'] for r in blob['tests'][order]] == ['Failed', 'Passed', 'Skipped']
+    assert [r['result'] for r in blob['tests'][sort]] == ['Failed', 'Passed']
+    assert blob['tests'][total] == [result(total)]
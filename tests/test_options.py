@@ -0,0 +1,40 @@
+import click
+from click.testing import CliRunner
+
+import runner
+from cli import options
+
+
+def _command(seen):
+    @click.group(cls=options.FeatureGroup, invoke_without_command=True)
+    @options.sharding
+    @options.perf
+    @options.visual
+    def command(sharding, perf, visual):
+        seen.update(sharding=vars(sharding), perf=vars(perf), visual=vars(visual))
+    return command
+
+
+def test_groups_arrive_as_namespaces_without_their_prefix():
+    seen = {}
+    result = CliRunner().invoke(_command(seen), ['--perf', '--perf-budget', '5', '--visual-update-baseline',
+                                                 '--shard', '2/3'])
+    assert result.exit_code == 0, result.output
+    assert seen['perf'] == {'enabled': True, 'budget': 5.0, 'update_baseline': False}
+    assert seen['visual'] == {'enabled': False, 'tolerance': 0.1, 'exact': False, 'update_baseline': True}
+    assert seen['sharding'] == {'shard': '2/3', 'durations_file': None}
+
+
+def test_help_lists_each_group_under_its_title():
+    result = CliRunner().invoke(_command({}), ['--help'])
+    out = result.output
+    assert out.index('Sharding:') < out.index('--shard') < out.index('Performance:') < out.index('--perf-budget')
+    assert out.index('Visual regression:') < out.index('--visual-exact') < out.index('Options:') < out.index('--help')
+
+
+def test_every_run_option_belongs_to_a_feature():
+    ctx = click.Context(runner.main)
+    params = [p for p in runner.main.get_params(ctx) if p.name != 'help']
+    assert params and all(getattr(p, 'feature', None) for p in params)
+    assert len({p.name for p in params}) == len(params)
+    assert set(runner.main.commands) == {'load', 'daemon', 'watch', 'dashboard', 'merge'}
@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from cli import paths
+from cli.summaries import summarize_browser_pool
+
+
+@pytest.fixture
+def dirs(tmp_path, monkeypatch):
+    monkeypatch.setattr(paths, 'REPORTS', tmp_path / 'reports')
+    monkeypatch.setattr(paths, 'SESSION_DIR', tmp_path / 'session')
+    monkeypatch.delenv('SAUCE_SHARD', raising=False)
+    (tmp_path / 'reports').mkdir()
+    (tmp_path / 'session').mkdir()
+    return tmp_path
+
+
+def _pool_stats(dirs, recycle_after, tests, launches, launch_time, close_time=0.0):
+    (dirs / 'reports' / 'pool_stats_gw0.json').write_text(json.dumps({
+        'recycle_after': recycle_after, 'tests': tests, 'launches': launches,
+        'launch_time': launch_time, 'close_time': close_time, 'recycled': {'limit': 0, 'crash': 0, 'memory': 0},
+    }))
+
+
+def test_without_a_baseline_run_before_is_labelled_an_estimate(dirs):
+    _pool_stats(dirs, 50, tests=100, launches=2, launch_time=1.0)
+    summary = summarize_browser_pool()
+    assert summary['before_source'] == 'estimate'
+    assert summary['browser_time_before'] == 50.0
+
+
+def test_a_recycle_after_1_session_is_the_measured_baseline(dirs):
+    _pool_stats(dirs, 1, tests=10, launches=10, launch_time=6.0, close_time=2.0)
+    baseline = summarize_browser_pool()
+    assert baseline['launch_per_test'] and baseline['before_source'] == 'this run'
+    assert baseline['saved'] == 0
+    (dirs / 'session' / 'session_base1.json').write_text(json.dumps({'browser_pool': baseline}))
+
+    _pool_stats(dirs, 50, tests=100, launches=2, launch_time=3.0)
+    summary = summarize_browser_pool()
+    assert summary['before_source'] == 'session base1'
+    # 0.8s per test measured, not this run's 1.5s per pooled launch
+    assert summary['browser_time_before'] == 80.0
+    assert summary['saved'] == 77.0
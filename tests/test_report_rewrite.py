@@ -0,0 +1,120 @@
+import html
+
+import pytest
+
+from cli import paths
+from cli.reporting import inject_videos_into_pytest_html, rewrite_pytest_html_tests
+from report_fixtures import markup_escape, read_blob, result
+
+# parametrized ids with everything the blob escapes or the scanner treats specially
+TRICKY = [
+    'tests/test_checkout.py::test_order[say "hi"]',
+    "tests/test_checkout.py::test_order[it's]",
+    'tests/test_checkout.py::test_order[a&b]',
+    'tests/test_checkout.py::test_order[<b>x</b>]',
+    'tests/test_checkout.py::test_order[C:\\path\\]',
+    'tests/test_checkout.py::test_order[\\"]',
+    'tests/test_checkout.py::test_order[&#34;]',
+    'tests/test_checkout.py::test_order[{a: [1, 2]}]',
+    'tests/test_checkout.py::test_order[crème brûlée ☃]',
+]
+PLAIN = [f'tests/test_inventory.py::test_{i}' for i in range(5)]
+CHUNK_SIZES = [7, 8, 9, 11, 13, 16, 31, 64, 257, 4096, 1 << 20]
+ESCAPES = {'markupsafe': markup_escape, 'stdlib': lambda s: html.escape(s, quote=True)}
+
+
+def _tests():
+    tests = {}
+    for i, nodeid in enumerate(TRICKY + PLAIN):
+        outcome = 'Failed' if i % 2 == 0 else 'Passed'
+        log = f'E   assert \'{nodeid}\' == "x" & <y>\n\\n' if outcome == 'Failed' else 'No log output captured.'
+        tests[nodeid] = [result(nodeid, outcome, log)]
+    return tests
+
+
+@pytest.fixture(params=sorted(ESCAPES))
+def report(request, html_report):
+    return html_report(_tests(), escape=ESCAPES[request.param], ensure_ascii=request.param == 'markupsafe')
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_untouched_report_is_copied_byte_for_byte(report, tmp_path, chunk_size):
+    out = tmp_path / 'out.html'
+    seen = []
+
+    def wanted(nodeid):
+        seen.append(nodeid)
+        return True
+
+    changed = rewrite_pytest_html_tests(report, out, wanted, lambda k, r: None, chunk_size=chunk_size)
+    assert changed == 0
+    assert out.read_bytes() == report.read_bytes()
+    # keys reach wanted() decoded, whatever chunk boundary split their entities
+    assert seen == TRICKY + PLAIN
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_only_selected_tests_are_rewritten(report, tmp_path, chunk_size):
+    out = tmp_path / 'out.html'
+    selected = set(TRICKY[::2]) | {PLAIN[-1]}
+
+    def transform(nodeid, results):
+        assert results == _tests()[nodeid]
+        results[0]['tableHtml'] = [f'<p title="{nodeid}">seen</p>']
+        return results
+
+    changed = rewrite_pytest_html_tests(report, out, selected.__contains__, transform, chunk_size=chunk_size)
+    assert changed == len(selected)
+    blob, original = read_blob(out), read_blob(report)
+    assert list(blob['tests']) == list(original['tests'])
+    for nodeid, results in blob['tests'].items():
+        if nodeid in selected:
+            assert results[0].pop('tableHtml') == [f'<p title="{nodeid}">seen</p>']
+        assert results == original['tests'][nodeid]
+    assert blob['title'] == original['title']
+    # the page around the blob is untouched
+    text, before = out.read_text(encoding='utf-8'), report.read_text(encoding='utf-8')
+    assert text[:text.index('data-jsonblob="')] == before[:before.index('data-jsonblob="')]
+    assert text.endswith(before[before.rindex('"></div>'):])
+
+
+@pytest.mark.parametrize('chunk_size', [7, 13, 1 << 20])
+def test_head_and_extra_tests(report, tmp_path, chunk_size):
+    out = tmp_path / 'out.html'
+    extra = [(TRICKY[0] + '[again]', [result(TRICKY[0] + '[again]', 'Failed')])]
+    rewrite_pytest_html_tests(report, out, lambda k: False, lambda k, r: None, chunk_size=chunk_size,
+                                     head=lambda text: text.replace('<title>', '<title>merged '),
+                                     extra_tests=iter(extra))
+    blob = read_blob(out)
+    assert list(blob['tests']) == TRICKY + PLAIN + [extra[0][0]]
+    assert blob['tests'][extra[0][0]] == extra[0][1]
+    assert '<title>merged report.html</title>' in out.read_text(encoding='utf-8')
+
+
+def test_report_without_blob_is_copied(tmp_path):
+    page = tmp_path / 'plain.html'
+    page.write_text('<html><body>no data here "}]</body></html>\n' * 50, encoding='utf-8')
+    out = tmp_path / 'out.html'
+    assert rewrite_pytest_html_tests(page, out, lambda k: True, lambda k, r: [], chunk_size=7) == 0
+    assert out.read_bytes() == page.read_bytes()
+
+
+def test_videos_are_injected_into_failed_results_only(report):
+    failed = TRICKY[::2]
+    videos = {nodeid: [str(paths.VIDEOS / f'v{i}' / 'video.webm')] for i, nodeid in enumerate(TRICKY)}
+    original = read_blob(report)
+
+    inject_videos_into_pytest_html(report, videos, failed)
+
+    blob = read_blob(report)
+    for i, nodeid in enumerate(TRICKY):
+        res = blob['tests'][nodeid][0]
+        if nodeid in failed:
+            src = f'../videos/v{i}/video.webm'
+            assert f'<source src="{src}"' in res['tableHtml'][0]
+            assert f'href="{src}"' in res['resultsTableRow'][3]
+        else:
+            assert res == original['tests'][nodeid][0]
+    for nodeid in PLAIN:
+        assert blob['tests'][nodeid] == original['tests'][nodeid]
+    assert not report.with_name(report.name + '.tmp').exists()
@@ -0,0 +1,138 @@
+import os
+
+import pytest
+
+from cli import paths
+from cli.selection import select_changed
+from support.impact import ImportGraph
+
+
+@pytest.fixture(scope='module')
+def graph():
+    return ImportGraph(paths.TESTS).build()
+
+
+@pytest.fixture(scope='module')
+def test_paths():
+    return sorted(paths.TESTS.glob('test_*.py'))
+
+
+@pytest.mark.parametrize('name', ['runner.py', 'cli/options.py', 'requirements.txt', 'src/pytest.ini'])
+def test_inputs_outside_the_graph_select_everything(graph, test_paths, name):
+    selected, reason = select_changed(test_paths, [paths.ROOT / name], graph)
+    assert selected == test_paths
+    assert reason == f'{name} can affect every test'
+
+
+def test_files_no_test_reaches_select_nothing(graph, test_paths):
+    assert select_changed(test_paths, [paths.ROOT / 'README.md'], graph) == ([], None)
+
+
+@pytest.mark.parametrize('name', ['src/tests/conftest.py', 'requirements-dev.txt'])
+def test_the_suite_conftest_and_any_requirements_file_select_everything(graph, test_paths, name):
+    selected, reason = select_changed(test_paths, [paths.ROOT / name], graph)
+    assert selected == test_paths
+    assert reason == f'{name} can affect every test'
+
+
+def test_the_stand_in_site_selects_everything(graph, test_paths):
+    selected, reason = select_changed(test_paths, [paths.TESTS / 'support' / 'site' / 'cart.html'], graph)
+    assert selected == test_paths
+    assert reason == 'src/tests/support/site/cart.html serves the site under test'
+
+
+def test_other_files_under_src_no_longer_select_everything(graph, test_paths):
+    assert select_changed(test_paths, [paths.ROOT / 'src' / 'assets' / 'style.css'], graph) == ([], None)
+
+
+def test_sync_and_async_page_objects_select_their_own_tests(graph, test_paths):
+    def selected(page):
+        return [p.stem for p in select_changed(test_paths, [paths.TESTS / 'pages' / page], graph)[0]]
+    # every sync test logs in through Loginpage, which chains on to Checkout
+    assert selected('Checkout.py') == ['test_checkout', 'test_inventory', 'test_login', 'test_logout']
+    assert selected('aio/Checkout.py') == ['test_async_checkout']
+
+
+# a suite of its own: page objects chained Loginpage -> Inventory -> Cart -> Checkout,
+# a conftest whose logged_in fixture builds a Loginpage through a helper
+SUITE = {
+    'pages/__init__.py': '',
+    'pages/LoginPage.py': 'from pages.Inventory import Inventory\n',
+    'pages/Inventory.py': 'from pages.Cart import Cart\n',
+    'pages/Cart.py': 'from pages.Checkout import Checkout\n',
+    'pages/Checkout.py': '',
+    'support/__init__.py': '',
+    'support/auth.py': '',
+    'conftest.py': (
+        'import pytest\n'
+        'from pages.LoginPage import Loginpage\n'
+        'from support.auth import USERS\n\n'
+        'def _login(page):\n'
+        '    return Loginpage(page)\n\n'
+        '@pytest.fixture\n'
+        'def logged_in(page):\n'
+        '    return _login(page)\n\n'
+        '@pytest.fixture\n'
+        'def page():\n'
+        '    return None\n'
+    ),
+    'test_login.py': 'from pages.LoginPage import Loginpage\n\ndef test_login(page):\n    pass\n',
+    'test_cart.py': 'from pages.Cart import Cart\n\ndef test_cart(page):\n    pass\n',
+    'test_checkout.py': 'from pages.Checkout import Checkout\n\ndef test_checkout(page):\n    pass\n',
+    'test_fixture.py': 'def test_uses_fixture(logged_in):\n    pass\n',
+    'test_plain.py': 'def test_plain(page):\n    pass\n',
+}
+
+
+@pytest.fixture
+def suite(tmp_path):
+    root = tmp_path / 'tests'
+    for rel, source in SUITE.items():
+        (root / rel).parent.mkdir(parents=True, exist_ok=True)
+        (root / rel).write_text(source)
+    return root
+
+
+def _affected(root, *changed, cache_file=None):
+    graph = ImportGraph(root, cache_file).build()
+    return sorted(p.stem for p in graph.affected_tests([root / c for c in changed]))
+
+
+@pytest.mark.parametrize('page, tests', [
+    ('Checkout', ['test_cart', 'test_checkout', 'test_fixture', 'test_login']),
+    ('Cart', ['test_cart', 'test_fixture', 'test_login']),
+    ('Inventory', ['test_fixture', 'test_login']),
+    ('LoginPage', ['test_fixture', 'test_login']),
+])
+def test_a_page_object_selects_the_tests_reaching_it(suite, page, tests):
+    assert _affected(suite, f'pages/{page}.py') == tests
+
+
+def test_page_objects_of_a_conftest_go_only_to_tests_using_its_fixture(suite):
+    # test_plain requests page, which reaches no page object; test_fixture's logged_in does through _login
+    assert 'test_plain' not in _affected(suite, 'pages/LoginPage.py')
+    assert 'test_fixture' in _affected(suite, 'pages/LoginPage.py')
+
+
+def test_the_conftest_and_modules_it_imports_select_every_test_below_it(suite):
+    everything = ['test_cart', 'test_checkout', 'test_fixture', 'test_login', 'test_plain']
+    assert _affected(suite, 'conftest.py') == everything
+    assert _affected(suite, 'support/auth.py') == everything
+
+
+def test_only_files_whose_mtime_changed_are_parsed_again(suite, tmp_path):
+    cache = tmp_path / 'import_graph.json'
+    graph = ImportGraph(suite, cache).build()
+    assert graph.stats == {'files': len(SUITE), 'parsed': len(SUITE)}
+
+    graph = ImportGraph(suite, cache).build()
+    assert graph.stats['parsed'] == 0
+
+    # Cart stops chaining to Checkout; only Cart.py is parsed again
+    cart = suite / 'pages' / 'Cart.py'
+    cart.write_text('')
+    stat = cart.stat()
+    os.utime(cart, (stat.st_atime, stat.st_mtime + 10))
+    graph = ImportGraph(suite, cache).build()
+    assert graph.stats['parsed'] == 1
+    assert sorted(p.stem for p in graph.affected_tests([suite / 'pages' / 'Checkout.py'])) == ['test_checkout']
@@ -0,0 +1,59 @@
+import hashlib
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from support.visual import compare
+
+
+@pytest.fixture
+def shot(tmp_path):
+    """Factory saving an RGB screenshot of height x width, with an optional white box, as a PNG."""
+    def make(name, box=None, size=(40, 60)):
+        pixels = np.zeros(size + (3,), dtype=np.uint8)
+        if box:
+            x, y, w, h = box
+            pixels[y:y + h, x:x + w] = 255
+        path = tmp_path / f'{name}.png'
+        Image.fromarray(pixels).save(path)
+        return path
+    return make
+
+
+def _job(current, baseline, **kwargs):
+    meta = None
+    if baseline.exists():
+        meta = {'digest': hashlib.sha256(baseline.read_bytes()).hexdigest(), 'phash': None}
+    return dict({'nodeid': 'test_x.py::test_a', 'key': 'k', 'current': str(current), 'baseline': str(baseline),
+                 'meta': meta, 'diff': str(baseline.with_name('diff.png')), 'exact': True}, **kwargs)
+
+
+def test_same_bytes_as_the_baseline_are_identical(shot):
+    baseline = shot('baseline')
+    assert compare(_job(shot('current'), baseline))['status'] == 'identical'
+
+
+def test_a_deleted_baseline_is_new_even_when_the_index_still_matches(shot):
+    current, baseline = shot('current'), shot('baseline')
+    job = _job(current, baseline)
+    baseline.unlink()
+    result = compare(job)
+    assert result['status'] == 'new'
+    # decoded, so the runner can index the new baseline
+    assert result['size'] == [60, 40] and result['pixels_digest'] and result['phash']
+
+
+def test_changes_inside_a_mask_are_ignored(shot):
+    baseline = shot('baseline')
+    current = shot('current', box=(5, 5, 10, 10))
+    assert compare(_job(current, baseline))['status'] == 'failed'
+    assert compare(_job(current, baseline, masks=[[4, 4, 12, 12]]))['status'] == 'passed'
+
+
+def test_a_diff_image_is_written_for_a_failure(shot):
+    baseline = shot('baseline')
+    result = compare(_job(shot('current', box=(0, 0, 60, 40)), baseline))
+    assert result['status'] == 'failed' and result['ratio'] == 100.0
+    with Image.open(result['diff']) as img:
+        assert img.size == (60, 40)